@@ -1,39 +1,195 @@
+import multiprocessing
+import os
 import sys
+import time
+import numpy as np
 import pandas as pd
 from PyQt6.QtWidgets import QApplication, QMessageBox
-from csv_viewer import CSVViewer
+from PyQt6.QtCore import QTimer
+from csv_cache import get_default_cache
+from csv_source import ENGINE_AUTO, open_source, read_frame
+from schema_profiler import SchemaProfiler, NUMERIC, DATETIME, TEXT, CONFIRM_THRESHOLD
+from perf_trace import span
+
+# In compact mode, string columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
 class CSVReader:
     """A class for reading and validating CSV files specifically for landmark data"""
     
     @staticmethod
-    def read_csv(file_path, parent_widget=None):
+    def read_csv(file_path, parent_widget=None, use_cache=True, compact=False, engine=ENGINE_AUTO):
         """
         Read a CSV file and validate it
         
         Args:
-            file_path (str): Path to the CSV file
+            file_path (str): Path to the CSV file, optionally .gz, .bz2 or .zst
             parent_widget: Parent widget for showing error dialogs
+            use_cache (bool): Reuse the columnar cache when it is still valid
+            compact (bool): Shrink the data with compact() after reading it
+            engine (str): Parse engine, one of csv_source.PARSE_ENGINES
             
         Returns:
             pandas.DataFrame or None: The CSV data if valid, None otherwise
         """
         try:
-            # Read the CSV file
-            data = pd.read_csv(file_path)
-            
-            # Validate the CSV file
-            if len(data.columns) < 2:
-                if parent_widget:
-                    QMessageBox.critical(parent_widget, "Error", "CSV must have at least 2 columns.")
-                return None
+            with span('read_csv', file=os.path.basename(file_path)):
+                cache = get_default_cache() if use_cache else None
+                key = cache.key_for(file_path) if cache else None
+                with span('cache.load'):
+                    data = cache.load(file_path, key) if cache else None
+                
+                if data is None:
+                    # Read the CSV file
+                    data, report = read_frame(file_path, engine)
+                    parse_seconds = report['seconds']
                 
-            return data
+                    # Validate the CSV file
+                    error = CSVReader.validate(data)
+                    if error:
+                        if parent_widget:
+                            QMessageBox.critical(parent_widget, "Error", error)
+                        return None
+                    
+                    if cache:
+                        with span('cache.store'):
+                            cache.store(file_path, data, parse_seconds, key)
+                
+                if compact:
+                    data, _ = CSVReader.compact(data)
+                return data
             
         except Exception as e:
             if parent_widget:
                 QMessageBox.critical(parent_widget, "Error", f"Failed to open CSV file: {str(e)}")
             return None
+
+    @staticmethod
+    def validate(data):
+        """
+        Check that parsed CSV data can be graphed
+        
+        Args:
+            data (pandas.DataFrame): The CSV data (or its first chunk)
+            
+        Returns:
+            str or None: An error message if the data is invalid, None otherwise
+        """
+        if len(data.columns) < 2:
+            return "CSV must have at least 2 columns."
+        return None
+
+    @staticmethod
+    def compact(data, schema=None, release_unused=True):
+        """
+        Shrink the memory a DataFrame takes
+        
+        - Integers are downcast to the smallest type that holds their range
+        - Floats become float32 where that loses nothing
+        - Strings with few distinct values become categoricals
+        - Datetime columns are parsed to datetime64, an int64 count of
+          nanoseconds since the epoch instead of a string object per row
+        - Free-text columns, which no graph can plot, are released
+        
+        Args:
+            data (pandas.DataFrame): The CSV data
+            schema (DatasetSchema): Its column kinds, profiled here if not given
+            release_unused (bool): Drop the free-text columns
+            
+        Returns:
+            tuple: (compacted DataFrame, report dict with bytes_before,
+            bytes_after, seconds and the released columns)
+        """
+        with span('compact', columns=len(data.columns)):
+            bytes_before = int(data.memory_usage(deep=True, index=False).sum())
+            start = time.perf_counter()
+            if schema is None:
+                schema = SchemaProfiler.profile(data)
+            
+            # Sampled kinds; confirming them would parse columns against the
+            # schema's own data, which may be just the first chunk
+            released = []
+            if release_unused and schema.columns_of_kind(NUMERIC):
+                # Free text is only released if there is something else to plot
+                released = [col for col in data.columns if schema.profile(col).kind == TEXT]
+                if len(data.columns) - len(released) < 2:
+                    released = []
+            columns = {col: CSVReader.compact_column(data[col], schema.profile(col))
+                       for col in data.columns if col not in released}
+            compacted = pd.DataFrame(columns, columns=list(columns))
+            seconds = time.perf_counter() - start
+            
+            report = {
+                'bytes_before': bytes_before,
+                'bytes_after': int(compacted.memory_usage(deep=True, index=False).sum()),
+                'seconds': seconds,
+                'released': released,
+            }
+            return compacted, report
+    
+    @staticmethod
+    def compact_column(series, profile):
+        """The smallest representation of one column that keeps its values"""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return series
+        if pd.api.types.is_integer_dtype(dtype):
+            if series.empty:
+                return series
+            return pd.to_numeric(series, downcast='unsigned' if series.min() >= 0 else 'integer')
+        if pd.api.types.is_float_dtype(dtype):
+            values = series.to_numpy()
+            narrow = values.astype(np.float32)
+            if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+                return pd.Series(narrow, name=series.name, index=series.index)
+            return series
+        if pd.api.types.is_datetime64_any_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            return series
+        
+        if profile.kind == DATETIME:
+            parsed = pd.to_datetime(series, format=profile.datetime_format or 'mixed', errors='coerce')
+            non_null = series.notna().sum()
+            # Keep the strings if too many don't parse, as the schema would when confirming
+            if not non_null or parsed.notna().sum() / non_null >= CONFIRM_THRESHOLD:
+                if parsed.dt.tz is not None:
+                    parsed = parsed.dt.tz_convert(None)
+                return parsed.astype('datetime64[ns]')
+            return series
+        
+        if len(series) and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+            return series.astype('category')
+        return series
+    
+    @staticmethod
+    def read_csv_chunks(file_path, chunk_size=100000, usecols=None):
+        """
+        Read a CSV file in chunks, reporting how far through the file we are
+        
+        Compressed files are decompressed as they are read; progress is
+        through the compressed file on disk.
+        
+        Args:
+            file_path (str): Path to the CSV file, optionally .gz, .bz2 or .zst
+            chunk_size (int): Number of rows per chunk
+            usecols (list): Parse only these columns (default: all)
+            
+        Yields:
+            tuple: (chunk DataFrame, bytes read so far, total bytes in the file)
+        """
+        total_bytes = os.path.getsize(file_path)
+        
+        # Open in binary mode so tell() gives a real byte offset; the C parser
+        # reads ahead in blocks, so this is approximate but monotonic
+        stream, handle = open_source(file_path)
+        with handle, stream:
+            reader = pd.read_csv(stream, chunksize=chunk_size, usecols=usecols)
+            while True:
+                # The span closes before yielding so it times only the parse
+                with span('parse_chunk'):
+                    chunk = next(reader, None)
+                if chunk is None:
+                    return
+                yield chunk, min(handle.tell(), total_bytes), total_bytes
     
     @staticmethod
     def detect_datetime_columns(data):
@@ -72,13 +228,43 @@ class CSVReader:
         return data.select_dtypes(include=['number']).columns.tolist()
 
 
+def show_main_window():
+    """
+    Create and show the viewer window
+    
+    Only the modules the empty window needs are imported first. matplotlib
+    is preloaded on a background thread once the window has been painted,
+    and SciPy isn't loaded until a curve is smoothed. NumPy and pandas are
+    still imported before the window: the reader, the table model and the
+    loader are written against them at module level, and every file opened
+    needs them anyway. Together they take about a quarter of a second, well
+    inside benchmark.DEFAULT_STARTUP_BUDGET.
+    
+    Returns:
+        CSVViewer: The window
+    """
+    with span('startup.window'):
+        # Imported here so csv_viewer and graph_view can import CSVReader from
+        # this module without a circular import
+        from csv_viewer import CSVViewer, start_preload
+        
+        viewer = CSVViewer()
+        viewer.setWindowTitle("Landmark CSV Viewer")
+        viewer.show()
+    # Started from the event loop, after the first paint of the window
+    QTimer.singleShot(0, start_preload)
+    return viewer
+
+
 def main():
     """Launch the CSV Viewer application"""
+    # Opening several files loads them in spawned worker processes, which
+    # must not start another viewer, including from a frozen build
+    multiprocessing.freeze_support()
+    
     app = QApplication(sys.argv)
     app.setApplicationName("Landmark CSV Viewer")
-    viewer = CSVViewer()
-    viewer.setWindowTitle("Landmark CSV Viewer")
-    viewer.show()
+    viewer = show_main_window()
     sys.exit(app.exec())
 
 
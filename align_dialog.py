@@ -0,0 +1,49 @@
+from PyQt6.QtWidgets import (QDialog, QFormLayout, QVBoxLayout, QLabel, QComboBox, QDoubleSpinBox,
+                             QDialogButtonBox)
+
+from multi_dataset import DEFAULT_TOLERANCE, default_time_column
+
+
+class AlignDialog(QDialog):
+    """Choose the time column of each loaded file and how closely rows must match"""
+
+    def __init__(self, datasets, parent=None):
+        """
+        Args:
+            datasets (list): (name, DatasetSchema) for each file, the first being the base
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Align CSV Files")
+        self.combos = []
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Rows of the first file are kept; each other file adds its row\n"
+                                "nearest in time, if within the tolerance."))
+
+        form = QFormLayout()
+        for name, schema in datasets:
+            combo = QComboBox()
+            combo.addItems(schema.plottable_x_columns())
+            combo.setCurrentText(default_time_column(schema))
+            form.addRow(f"{name}:", combo)
+            self.combos.append(combo)
+
+        self.tolerance_spin = QDoubleSpinBox()
+        self.tolerance_spin.setDecimals(3)
+        self.tolerance_spin.setRange(0, 1e9)
+        self.tolerance_spin.setValue(DEFAULT_TOLERANCE)
+        self.tolerance_spin.setToolTip("Largest time difference matched: seconds for date columns, "
+                                       "the column's own units otherwise")
+        form.addRow("Tolerance:", self.tolerance_spin)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def time_columns(self):
+        return [combo.currentText() for combo in self.combos]
+
+    def tolerance(self):
+        return self.tolerance_spin.value()
@@ -0,0 +1,230 @@
+"""
+Render graphs from CSV files without a display
+
+Example:
+    python batch_render.py data/*.csv --plot Time:Speed --plot Time:Altitude -o reports --format pdf
+
+Each file is loaded once in a worker process and every requested plot is
+drawn from it with the Agg backend, using the same conversion, smoothing and
+decimation as the viewer's graphs.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')  # No display needed, and safe in worker processes
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import plot_pipeline
+from column_cache import ColumnConversionCache
+from multi_dataset import load_data, unique_stems
+from csv_source import CSV_SUFFIXES, ENGINE_AUTO, PARSE_ENGINES
+from decimation import DECIMATION_METHODS
+from figure_render import VECTOR_FORMATS, draw_prepared
+from smoothing import SMOOTHING_METHODS, DEFAULT_WINDOW
+
+
+OUTPUT_FORMATS = ['png', 'jpg', 'pdf', 'svg']
+
+
+def draw_plot(prepared, output_path, options):
+    """
+    Draw a prepared plot the way GraphView does and save it
+
+    Args:
+        prepared (dict): Result of plot_pipeline.prepare_plot()
+        output_path (str): Image file to write
+        options (dict): figsize, dpi, decimation and format
+    """
+    figure = Figure(figsize=options['figsize'], dpi=options['dpi'])
+    FigureCanvasAgg(figure)
+    draw_prepared(figure, prepared, {'decimation': options['decimation'],
+                                     'vector': options['format'] in VECTOR_FORMATS})
+    figure.savefig(output_path, dpi=options['dpi'], bbox_inches='tight')
+
+
+def output_name(stem, x_col, y_col, fmt):
+    name = f"{stem}__{y_col}_vs_{x_col}"
+    return re.sub(r'[^\w.-]+', '_', name) + '.' + fmt
+
+
+def render_file(file_path, stem, plots, options):
+    """
+    Render every plot for one file; runs in a worker process
+
+    Args:
+        file_path (str): CSV file
+        stem (str): Prefix for the output file names
+        plots (list): (x column, y column) pairs, or None for the viewer's default graph
+        options (dict): Rendering options from the command line
+
+    Returns:
+        dict: Per-file report with timings, written outputs and errors
+    """
+    report = {'file': file_path, 'outputs': [], 'errors': [],
+              'load_seconds': 0.0, 'render_seconds': 0.0}
+    start = time.perf_counter()
+    try:
+        data = load_data(file_path, options['use_cache'], options['engine'])
+    except Exception as e:
+        report['errors'].append(f"Failed to open CSV file: {str(e)}")
+        report['load_seconds'] = time.perf_counter() - start
+        return report
+    report['rows'] = len(data)
+    report['load_seconds'] = time.perf_counter() - start
+
+    # Plots of the same file share converted columns
+    column_cache = ColumnConversionCache(data)
+    if plots is None:
+        plots = [plot_pipeline.default_columns(column_cache.schema)]
+
+    start = time.perf_counter()
+    for x_col, y_col in plots:
+        try:
+            missing = [col for col in (x_col, y_col) if col not in data.columns]
+            if missing:
+                raise ValueError(f"No column named {', '.join(missing)}")
+            prepared = plot_pipeline.prepare_plot({
+                'data': data,
+                'column_cache': column_cache,
+                'x_col': x_col,
+                'y_col': y_col,
+                'treat_as_numeric': options['treat_as_numeric'],
+                'smooth': options['smooth'],
+                'smooth_method': options['smooth_method'],
+                'smooth_window': options['smooth_window'],
+            })
+            output_path = os.path.join(options['output_dir'], output_name(stem, x_col, y_col, options['format']))
+            draw_plot(prepared, output_path, options)
+            report['outputs'].append(output_path)
+        except Exception as e:
+            report['errors'].append(f"{y_col} vs {x_col}: {str(e)}")
+    report['render_seconds'] = time.perf_counter() - start
+    return report
+
+
+def expand_inputs(inputs):
+    """Expand directories and glob patterns (not expanded by every shell) into CSV files"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            # Plain and compressed CSV files
+            files.extend(sorted(path for suffix in CSV_SUFFIXES
+                                for path in glob.glob(os.path.join(item, '*' + suffix))))
+        elif glob.has_magic(item):
+            files.extend(sorted(glob.glob(item)))
+        else:
+            files.append(item)
+    return files
+
+
+def parse_plot(value):
+    """Parse an X:Y plot spec"""
+    x_col, sep, y_col = value.partition(':')
+    if not sep or not x_col or not y_col:
+        raise argparse.ArgumentTypeError(f"expected X:Y, got {value!r}")
+    return x_col, y_col
+
+
+def parse_size(value):
+    """Parse a WIDTHxHEIGHT figure size in inches"""
+    try:
+        width, height = (float(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Render graphs from CSV files without a display")
+    parser.add_argument('inputs', nargs='+', help="CSV files, folders or glob patterns")
+    parser.add_argument('-p', '--plot', action='append', type=parse_plot, metavar='X:Y',
+                        help="Columns to plot; repeat for several graphs per file "
+                             "(default: the first graph the viewer would show)")
+    parser.add_argument('-o', '--output-dir', default='.', help="Folder for the rendered graphs")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='png')
+    parser.add_argument('--dates', choices=['numeric', 'axis'], default='numeric',
+                        help="Plot datetime X columns as epoch seconds (like \"Treat as Numeric\") "
+                             "or on a date axis")
+    parser.add_argument('--smooth', action='store_true', help="Add a smoothed curve")
+    parser.add_argument('--smooth-method', choices=SMOOTHING_METHODS, default=SMOOTHING_METHODS[0])
+    parser.add_argument('--smooth-window', type=int, default=DEFAULT_WINDOW,
+                        help="Smoothing window in points (default: %(default)s)")
+    parser.add_argument('--decimation', choices=DECIMATION_METHODS, default=DECIMATION_METHODS[0])
+    parser.add_argument('--size', type=parse_size, default=(10, 5), metavar='WxH',
+                        help="Figure size in inches (default: 10x5)")
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the parsed-file cache")
+    parser.add_argument('--engine', choices=PARSE_ENGINES, default=ENGINE_AUTO,
+                        help="CSV parser; Arrow needs pyarrow, and Auto uses it when installed (default: %(default)s)")
+    parser.add_argument('--report', help="Also write the per-file report to this JSON file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("No CSV files found")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {
+        'output_dir': args.output_dir,
+        'format': args.format,
+        'treat_as_numeric': args.dates == 'numeric',
+        'smooth': args.smooth,
+        'smooth_method': args.smooth_method,
+        'smooth_window': args.smooth_window,
+        'decimation': args.decimation,
+        'figsize': args.size,
+        'dpi': args.dpi,
+        'use_cache': not args.no_cache,
+        'engine': args.engine,
+    }
+
+    start = time.perf_counter()
+    reports = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(render_file, file_path, stem, args.plot, options): file_path
+                   for file_path, stem in zip(files, unique_stems(files))}
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as e:
+                # The worker process itself died, e.g. out of memory
+                report = {'file': futures[future], 'outputs': [], 'errors': [str(e)],
+                          'load_seconds': 0.0, 'render_seconds': 0.0}
+            reports.append(report)
+
+            status = "FAILED" if report['errors'] else "ok"
+            print(f"{status:6} {report['file']}: {len(report['outputs'])} graphs, "
+                  f"load {report['load_seconds']:.2f}s, render {report['render_seconds']:.2f}s")
+            for error in report['errors']:
+                print(f"       {error}")
+    elapsed = time.perf_counter() - start
+
+    failed = [report for report in reports if report['errors']]
+    graphs = sum(len(report['outputs']) for report in reports)
+    print(f"Rendered {graphs} graphs from {len(files)} files in {elapsed:.1f}s, {len(failed)} with errors")
+
+    if args.report:
+        reports.sort(key=lambda report: report['file'])
+        with open(args.report, 'w') as f:
+            json.dump({'elapsed_seconds': elapsed, 'files': reports}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,455 @@
+"""
+Benchmarks for loading, parsing, datetime detection, smoothing and rendering
+
+Example:
+    python benchmark.py --output results.json
+    python benchmark.py --baseline results.json     # flags anything slower than the saved run
+    python benchmark.py --startup     # fails if the window takes longer than the startup budget to appear
+
+Synthetic CSV files are generated from a fixed seed, so runs on the same
+machine are comparable. Each benchmark is timed over several repeats and then
+run once more under tracemalloc for its peak memory. Parsing is timed with
+each installed engine and from a gzip copy, and reported in MB/s of the file
+on disk.
+
+Startup is measured in fresh interpreters: the time until the main window is
+shown, and an import-time report (from python -X importtime) of what is
+loaded before the window and what is deferred to first use.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Render offscreen; must be set before Qt is imported
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+
+# Datetime column formats the generator can write
+DATETIME_FORMATS = {
+    'iso': '%Y-%m-%d %H:%M:%S',
+    'iso_ms': '%Y-%m-%d %H:%M:%S.%f',
+    'us': '%m/%d/%Y %H:%M:%S',
+    'eu': '%d.%m.%Y %H:%M:%S',
+    'mixed': None,   # Alternates between iso and us rows
+    'none': None,    # No datetime column
+}
+
+# The default suite: (name, rows, value columns, datetime format, NaN density)
+SCENARIOS = [
+    ('small', 10000, 4, 'iso', 0.0),
+    ('large', 500000, 4, 'iso', 0.0),
+    ('wide', 50000, 100, 'iso', 0.0),
+    ('sparse', 200000, 4, 'iso', 0.3),
+    ('us_dates', 200000, 4, 'us', 0.0),
+    ('mixed_dates', 50000, 4, 'mixed', 0.0),
+    ('numeric_only', 500000, 4, 'none', 0.0),
+]
+
+# Slowdown over the baseline median that counts as a regression
+DEFAULT_THRESHOLD = 0.15
+
+# Seconds from a fresh interpreter to the main window being shown, above
+# which a startup check fails; tests/test_startup.py checks it on every run
+DEFAULT_STARTUP_BUDGET = 1.5
+
+# Run in a fresh interpreter to time startup: prints the seconds until the
+# main window is shown and which heavy modules were imported by then
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+import LandMarkCSVReader
+app = QApplication(sys.argv)
+viewer = LandMarkCSVReader.show_main_window()
+loaded = [name for name in ('matplotlib', 'scipy', 'graph_view') if name in sys.modules]
+app.processEvents()
+print(json.dumps({'window_shown_s': time.perf_counter() - start, 'loaded': loaded}))
+"""
+
+# What the window imports, then what is imported later: graphs on first use
+# and SciPy once a curve is smoothed
+STARTUP_IMPORTS = ('LandMarkCSVReader', 'csv_viewer')
+DEFERRED_IMPORTS = ('graph_view', 'scipy.signal', 'scipy.interpolate')
+
+# Packages listed per phase in the import-time report
+IMPORT_REPORT_TOP = 8
+
+
+def generate_csv(path, rows, columns, datetime_format='iso', nan_density=0.0, seed=0):
+    """
+    Write a synthetic CSV file
+
+    Args:
+        path (str): File to write
+        rows (int): Number of data rows
+        columns (int): Number of random-walk value columns
+        datetime_format (str): Key of DATETIME_FORMATS for the time column
+        nan_density (float): Share of value cells left empty
+        seed (int): Random seed, so the same arguments give the same file
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    if datetime_format != 'none':
+        times = pd.date_range('2024-01-01', periods=rows, freq='250ms')
+        if datetime_format == 'mixed':
+            iso = times.strftime(DATETIME_FORMATS['iso'])
+            us = times.strftime(DATETIME_FORMATS['us'])
+            data['time'] = np.where(np.arange(rows) % 2 == 0, iso, us)
+        else:
+            data['time'] = times.strftime(DATETIME_FORMATS[datetime_format])
+
+    data['x'] = np.arange(rows, dtype=np.float64) * 0.25
+    for i in range(columns):
+        values = rng.standard_normal(rows).cumsum()
+        if nan_density:
+            values[rng.random(rows) < nan_density] = np.nan
+        data[f'v{i}'] = values
+
+    pd.DataFrame(data).to_csv(path, index=False, float_format='%.6g')
+
+
+def measure(func, repeat):
+    """
+    Time a function, then run it once more to record its peak memory
+
+    Returns:
+        dict: Median and minimum seconds over the repeats and peak traced MB,
+        or the error if the function raised
+    """
+    times = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        # Traced separately because tracemalloc slows allocation-heavy code
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        return {'error': f"{type(e).__name__}: {e}"}
+
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'repeat': repeat,
+        'peak_mb': peak / 1024 ** 2,
+    }
+
+
+def measure_parse(path, engine, repeat):
+    """Time parsing a file with one engine, adding the engine and its throughput"""
+    from csv_source import read_frame, resolve_engine
+
+    result = measure(lambda: read_frame(path, engine), repeat)
+    if 'error' not in result:
+        result['engine'] = resolve_engine(engine)
+        result['mb_per_s'] = os.path.getsize(path) / 1024 ** 2 / result['median_s']
+    return result
+
+
+def run_scenario(name, path, repeat, app):
+    """Run every benchmark against one generated file"""
+    from LandMarkCSVReader import CSVReader
+    from csv_source import ENGINE_ARROW, ENGINE_AUTO, ENGINE_C, resolve_engine
+    from graph_view import GraphView
+
+    results = {}
+    print(f"{name}: read_csv", flush=True)
+    results['read_csv'] = measure(lambda: CSVReader.read_csv(path, use_cache=False), repeat)
+
+    for engine in (ENGINE_C, ENGINE_ARROW):
+        # Arrow only where pyarrow is installed
+        if resolve_engine(engine) == engine:
+            print(f"{name}: parse_{engine.lower()}", flush=True)
+            results[f'parse_{engine.lower()}'] = measure_parse(path, engine, repeat)
+
+    gzip_path = path + '.gz'
+    if not os.path.exists(gzip_path):
+        with open(path, 'rb') as source, gzip.open(gzip_path, 'wb', compresslevel=6) as target:
+            target.writelines(source)
+    print(f"{name}: parse_gzip", flush=True)
+    results['parse_gzip'] = measure_parse(gzip_path, ENGINE_AUTO, repeat)
+
+    data = CSVReader.read_csv(path, use_cache=False)
+
+    print(f"{name}: detect_datetime_columns", flush=True)
+    results['detect_datetime_columns'] = measure(lambda: CSVReader.detect_datetime_columns(data), repeat)
+
+    view = GraphView(data)
+    view.resize(1000, 500)
+
+    print(f"{name}: smooth_data", flush=True)
+    results['smooth_data'] = measure(lambda: view.smooth_data(data['x'], data['v0']), repeat)
+
+    def update_graph():
+        # Start cold: no converted columns and no artists to reuse
+        view.column_cache.reset(data, view.schema)
+        view.plot_kind = None
+        view.update_graph()
+        view.canvas.draw()
+
+    print(f"{name}: update_graph", flush=True)
+    results['update_graph'] = measure(update_graph, repeat)
+
+    view.deleteLater()
+    app.processEvents()
+    return results
+
+
+def run_python(code, *options):
+    """Run code in a fresh interpreter from this folder, offscreen; returns the finished process"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=here, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def measure_startup(repeat):
+    """
+    Time from interpreter start-up to the main window being shown
+
+    Returns:
+        dict: Median and minimum seconds, as measure() reports them, plus the
+        heavy modules that were already imported when the window appeared
+    """
+    times = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            probe = json.loads(run_python(STARTUP_PROBE).stdout.strip().splitlines()[-1])
+            times.append(time.perf_counter() - start)
+    except (subprocess.CalledProcessError, ValueError, IndexError) as e:
+        print(f"Error running benchmark: {e}")
+        return {'error': f"{type(e).__name__}: {e}"}
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'repeat': repeat,
+        'loaded_before_window': probe['loaded'],
+    }
+
+
+def import_report():
+    """
+    Import times of the modules loaded before the window and of those deferred
+
+    Self times from python -X importtime are summed per top-level package.
+    Modules finish importing before the module that imported them, so every
+    line up to the last startup import belongs to startup.
+
+    Returns:
+        dict: {'startup': {package: seconds}, 'deferred': {package: seconds}},
+        each ordered from slowest
+    """
+    code = "; ".join(f"import {name}" for name in STARTUP_IMPORTS + DEFERRED_IMPORTS)
+    lines = run_python(code, '-X', 'importtime').stderr.splitlines()
+
+    phases = {'startup': {}, 'deferred': {}}
+    phase = 'startup'
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals = phases[phase]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1e6
+        # A top-level import is the one not indented beyond the single space
+        if name.startswith(' ') and not name.startswith('  ') and name.strip() == STARTUP_IMPORTS[-1]:
+            phase = 'deferred'
+    return {name: dict(sorted(totals.items(), key=lambda item: -item[1])) for name, totals in phases.items()}
+
+
+def print_import_report(report):
+    titles = {'startup': "Imported before the window is shown",
+              'deferred': "Imported in the background or on first use"}
+    for phase, totals in report.items():
+        print(f"\n{titles[phase]}: {sum(totals.values()):.3f} s")
+        for package, seconds in list(totals.items())[:IMPORT_REPORT_TOP]:
+            print(f"    {package:30} {seconds:8.3f}")
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare median times against a baseline
+
+    Returns:
+        list: (name, baseline seconds, current seconds, ratio, flag) rows
+    """
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if 'error' in result:
+            rows.append((name, previous.get('median_s') if previous else None, None, None, 'ERROR'))
+            continue
+        if previous is None or 'error' in previous:
+            rows.append((name, None, result['median_s'], None, 'new'))
+            continue
+        ratio = result['median_s'] / previous['median_s'] if previous['median_s'] else float('inf')
+        if ratio > 1 + threshold:
+            flag = 'REGRESSION'
+        elif ratio < 1 - threshold:
+            flag = 'faster'
+        else:
+            flag = ''
+        rows.append((name, previous['median_s'], result['median_s'], ratio, flag))
+    return rows
+
+
+def environment():
+    import matplotlib
+    import scipy
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'scipy': scipy.__version__,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark loading, datetime detection, smoothing and rendering")
+    parser.add_argument('-s', '--scenario', action='append', choices=[s[0] for s in SCENARIOS],
+                        help="Run only these scenarios (default: all)")
+    parser.add_argument('--rows', type=int, help="Run a single custom scenario with this many rows")
+    parser.add_argument('--columns', type=int, default=4, help="Value columns for --rows")
+    parser.add_argument('--datetime-format', choices=list(DATETIME_FORMATS), default='iso',
+                        help="Time column format for --rows")
+    parser.add_argument('--nan-density', type=float, default=0.0, help="Share of empty value cells for --rows")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply every scenario's row count, e.g. 0.1 for a quick run")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="Write the results to this JSON file")
+    parser.add_argument('-b', '--baseline', help="Compare against results saved with --output")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown that counts as a regression (default: 0.15 = 15%%)")
+    parser.add_argument('--data-dir', help="Keep the generated CSV files here instead of a temporary folder")
+    parser.add_argument('--startup', action='store_true',
+                        help="Only measure startup: time to the main window and an import-time report")
+    parser.add_argument('--startup-budget', type=float, default=DEFAULT_STARTUP_BUDGET,
+                        help="With --startup, fail if the window takes longer than this many seconds to appear "
+                             f"(default: {DEFAULT_STARTUP_BUDGET})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.rows:
+        scenarios = [('custom', args.rows, args.columns, args.datetime_format, args.nan_density)]
+    else:
+        scenarios = [s for s in SCENARIOS if not args.scenario or s[0] in args.scenario]
+
+    if args.startup:
+        scenarios = []
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {}
+    configs = {}
+    imports = None
+    if args.startup:
+        print("startup: window_shown", flush=True)
+        results['startup/window_shown'] = measure_startup(args.repeat)
+        imports = import_report()
+
+    with tempfile.TemporaryDirectory(prefix="landmark-bench-") as temp_dir:
+        data_dir = args.data_dir or temp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for name, rows, columns, datetime_format, nan_density in scenarios:
+            rows = max(10, int(rows * args.scale))
+            configs[name] = {'rows': rows, 'columns': columns, 'datetime_format': datetime_format,
+                             'nan_density': nan_density, 'seed': args.seed}
+
+            path = os.path.join(data_dir, f"{name}_{rows}x{columns}_{datetime_format}_{nan_density}_{args.seed}.csv")
+            if not os.path.exists(path):
+                print(f"{name}: generating {rows} rows x {columns} columns", flush=True)
+                generate_csv(path, rows, columns, datetime_format, nan_density, args.seed)
+
+            for bench, result in run_scenario(name, path, args.repeat, app).items():
+                results[f"{name}/{bench}"] = result
+
+    print()
+    print(f"{'benchmark':40} {'median':>10} {'min':>10} {'peak MB':>10} {'MB/s':>8}")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:40} {'ERROR':>10}  {result['error']}")
+        else:
+            peak = f"{result['peak_mb']:10.1f}" if 'peak_mb' in result else f"{'-':>10}"
+            throughput = f" {result['mb_per_s']:8.1f} ({result['engine']})" if 'mb_per_s' in result else ""
+            print(f"{name:40} {result['median_s']:10.4f} {result['min_s']:10.4f} {peak}{throughput}")
+
+    if imports is not None:
+        print_import_report(imports)
+        loaded = results['startup/window_shown'].get('loaded_before_window')
+        if loaded:
+            print(f"\nWarning: {', '.join(loaded)} imported before the window was shown")
+
+    if args.output:
+        saved = {'environment': environment(), 'scenarios': configs, 'results': results}
+        if imports is not None:
+            saved['imports'] = imports
+        with open(args.output, 'w') as f:
+            json.dump(saved, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    regressions = 0
+    if args.startup:
+        startup = results['startup/window_shown']
+        if startup.get('loaded_before_window'):
+            # Deferred modules loaded early make startup slower on slower machines
+            regressions += 1
+        if 'error' in startup or startup.get('median_s', 0) > args.startup_budget:
+            print(f"\nStartup over budget: {startup.get('median_s', float('nan')):.3f} s "
+                  f"(budget {args.startup_budget:.3f} s)")
+            regressions += 1
+        else:
+            print(f"\nStartup within budget: {startup['median_s']:.3f} s (budget {args.startup_budget:.3f} s)")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        previous_configs = baseline.get('scenarios', {})
+        if any(name in previous_configs and previous_configs[name] != config for name, config in configs.items()):
+            print("\nWarning: baseline was generated with different scenario settings")
+
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%})")
+        print(f"{'benchmark':40} {'baseline':>10} {'current':>10} {'ratio':>8}")
+        for name, before, after, ratio, flag in compare(results, baseline['results'], args.threshold):
+            before_text = f"{before:10.4f}" if before is not None else f"{'-':>10}"
+            after_text = f"{after:10.4f}" if after is not None else f"{'-':>10}"
+            ratio_text = f"{ratio:8.2f}" if ratio is not None else f"{'-':>8}"
+            print(f"{name:40} {before_text} {after_text} {ratio_text}  {flag}")
+            if flag in ('REGRESSION', 'ERROR'):
+                regressions += 1
+        print(f"\n{regressions} regressions or errors")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from schema_profiler import SchemaProfiler, DATETIME as DATETIME_KIND
+from perf_trace import span
+
+
+# Conversion types held by the cache
+NUMERIC = 'numeric'              # float64, NaN where the value isn't a number
+DATETIME = 'datetime'            # datetime64[ns], NaT where the value isn't a date
+EPOCH_SECONDS = 'epoch_seconds'  # float64 seconds since 1970-01-01
+DATE_NUMBER = 'date_number'      # float64 days since 1970-01-01, matplotlib's default date epoch
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+SECONDS_PER_DAY = 86400.0
+
+
+def nbytes_of(value):
+    """Bytes held by an array or a tuple containing arrays"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sum(item.nbytes for item in value if isinstance(item, np.ndarray))
+
+
+class ColumnConversionCache:
+    """Converted column arrays for one dataset, shared by all graph views"""
+
+    def __init__(self, data=None, schema=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # (column, conversion) -> [buffer, length], oldest first
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Graph views prepare renders on pool threads; re-entrant because
+        # derived conversions fetch their source conversion through get()
+        self.lock = threading.RLock()
+        self.reset(data, schema)
+
+    def reset(self, data, schema=None):
+        """
+        Drop every cached conversion and switch to a newly loaded dataset
+
+        Args:
+            data (pandas.DataFrame): The CSV data
+            schema (DatasetSchema): Its profiled schema, profiled here if not given
+        """
+        if schema is None and data is not None:
+            schema = SchemaProfiler.profile(data)
+        with self.lock:
+            self.data = data
+            self.schema = schema
+            self.entries.clear()
+            self.nbytes = 0
+
+    def get(self, column, conversion):
+        """
+        Get a column converted to a NumPy array, converting it on first use
+
+        If the dataset has grown since the column was converted (follow mode),
+        only the new rows are converted and appended.
+
+        Args:
+            column (str): Column name
+            conversion (str): NUMERIC, DATETIME, EPOCH_SECONDS or DATE_NUMBER
+
+        Returns:
+            numpy.ndarray: Read-only converted values, shared with other callers
+        """
+        key = (column, conversion)
+        with self.lock:
+            rows = len(self.data)
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == rows:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.view(entry)
+
+            # Converting under the lock means views asking for the same column
+            # at the same time wait for one parse instead of each doing their own
+            self.misses += 1
+            if entry is not None and entry[1] < rows:
+                self.entries.move_to_end(key)
+                with span('convert', column=column, conversion=conversion, start=entry[1]):
+                    self.append(key, entry, self.convert(column, conversion, entry[1]))
+            else:
+                with span('convert', column=column, conversion=conversion):
+                    values = self.convert(column, conversion)
+                    entry = self.store(key, values, len(values))
+            return self.view(entry)
+
+    def get_derived(self, key, compute):
+        """
+        Get a value derived from converted columns, such as a cleaned or
+        smoothed column pair, computing it on first use
+        
+        Derived values share the cache's memory budget and are recomputed
+        once the dataset has grown.
+        
+        Args:
+            key (tuple): Identifies the value; must not clash with (column, conversion) keys
+            compute: Called with no arguments to make the value, a tuple of arrays
+        
+        Returns:
+            tuple: The cached value, shared with other callers
+        """
+        with self.lock:
+            data = self.data
+            rows = len(data)
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == rows:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+        
+        # Computed outside the lock: smoothing a long series can take a while
+        # and shouldn't hold up column conversions for other views
+        value = compute()
+        with self.lock:
+            if self.data is data:
+                self.store(key, value, rows)
+        return value
+
+    def peek_derived(self, key):
+        """
+        Get a derived value only if it is already cached and current
+
+        Returns:
+            tuple or None: The cached value, or None; it is never computed here
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] != len(self.data):
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    @staticmethod
+    def view(entry):
+        """The filled part of an entry's buffer, read-only so callers can't modify it"""
+        values = entry[0][:entry[1]]
+        values.flags.writeable = False
+        return values
+
+    def convert(self, column, conversion, start=0):
+        """Convert rows start onwards of a column"""
+        if conversion == NUMERIC:
+            series = self.data[column]
+            if start:
+                series = series.iloc[start:]
+            return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if conversion == DATETIME:
+            parsed = self.schema.to_datetime(column, start)
+            if parsed.dt.tz is not None:
+                parsed = parsed.dt.tz_convert(None)
+            return parsed.to_numpy(dtype='datetime64[ns]')
+        if conversion == EPOCH_SECONDS:
+            # Derived from the cached datetime array rather than parsing again
+            parsed = self.get(column, DATETIME)[start:]
+            seconds = parsed.view(np.int64) / 1e9
+            seconds[np.isnat(parsed)] = np.nan
+            return seconds
+        if conversion == DATE_NUMBER:
+            return self.get(column, EPOCH_SECONDS)[start:] / SECONDS_PER_DAY
+        raise ValueError(f"Unknown column conversion: {conversion}")
+
+    def store(self, key, value, length):
+        """
+        Cache a value; entries are [converted column buffer, filled length]
+        or [derived value, dataset length]
+        """
+        entry = [value, length]
+        nbytes = nbytes_of(value)
+        if nbytes > self.max_bytes:
+            # Too big to cache at all, the caller still gets its array
+            return entry
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= nbytes_of(old[0])
+        self.entries[key] = entry
+        self.nbytes += nbytes
+        self.evict()
+        return entry
+
+    def append(self, key, entry, values):
+        """Append newly converted rows, growing the buffer geometrically"""
+        buffer, length = entry
+        needed = length + len(values)
+        if needed > len(buffer):
+            grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+            grown[:length] = buffer[:length]
+            self.nbytes += grown.nbytes - buffer.nbytes
+            entry[0] = buffer = grown
+        buffer[length:needed] = values
+        entry[1] = needed
+        self.evict()
+
+    def evict(self):
+        while self.nbytes > self.max_bytes and self.entries:
+            _, (evicted, _) = self.entries.popitem(last=False)
+            self.nbytes -= nbytes_of(evicted)
+            self.evictions += 1
+
+    def is_datetime(self, column):
+        """
+        Check whether a column holds dates, confirming the sampled schema
+        against the full column with the cached parse
+        """
+        with self.lock:
+            profile = self.schema.profile(column)
+            if profile.kind == DATETIME_KIND and not profile.confirmed:
+                self.schema.confirm(column, parsed=self.get(column, DATETIME))
+            return self.schema.kind(column) == DATETIME_KIND
+
+    def summary(self):
+        return (f"{self.hits} hits / {self.misses} misses, "
+                f"{self.nbytes / 1024 ** 2:.0f} MB in {len(self.entries)} arrays")
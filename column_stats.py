@@ -0,0 +1,232 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from LandMarkCSVReader import CSVReader
+from csv_cache import get_default_cache
+from csv_source import ENGINE_C, read_frame
+from perf_trace import span
+
+
+# Centroids kept by a quantile sketch; quantiles are accurate to about 1/SKETCH_SIZE in rank
+SKETCH_SIZE = 1024
+
+# Quantiles reported for each column
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+HISTOGRAM_BINS = 50
+
+# Rows read to choose which columns are numeric
+SAMPLE_ROWS = 1000
+
+# Bump when the stored statistics change shape, so old files are recomputed
+STATS_FORMAT_VERSION = 1
+
+
+class QuantileSketch:
+    """
+    Approximate distribution of a column as weighted centroids
+
+    Values are kept sorted and merged into at most `size` centroids of about
+    equal weight, so two sketches merge by concatenating and compressing
+    again. Memory stays at `size` centroids however many rows are added.
+    """
+
+    def __init__(self, size=SKETCH_SIZE):
+        self.size = size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def add(self, values):
+        """Add finite values"""
+        self.compress(np.concatenate((self.means, values)),
+                      np.concatenate((self.weights, np.ones(len(values)))))
+
+    def merge(self, other):
+        self.compress(np.concatenate((self.means, other.means)),
+                      np.concatenate((self.weights, other.weights)))
+
+    def compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means = means[order]
+        weights = weights[order]
+        if len(means) > self.size:
+            # Assign each centroid to one of `size` equal-weight groups by its
+            # cumulative weight, then replace every group by its weighted mean
+            cumulative = np.cumsum(weights)
+            groups = ((cumulative - weights / 2) * (self.size / cumulative[-1])).astype(np.int64)
+            starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+            grouped_weights = np.add.reduceat(weights, starts)
+            means = np.add.reduceat(means * weights, starts) / grouped_weights
+            weights = grouped_weights
+        self.means = means
+        self.weights = weights
+
+    def quantiles(self, qs):
+        if not len(self.means):
+            return [math.nan] * len(qs)
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(qs) * self.weights.sum(), positions, self.means).tolist()
+
+    def histogram(self, lo, hi, bins=HISTOGRAM_BINS):
+        """Approximate counts in `bins` equal-width bins between lo and hi"""
+        counts, edges = np.histogram(self.means, bins=bins, range=(lo, hi), weights=self.weights)
+        return counts.round().astype(np.int64).tolist(), edges.tolist()
+
+
+class ColumnAccumulator:
+    """
+    Streaming summary of one numeric column
+
+    Each chunk's count, mean and sum of squared deviations are combined with
+    the running ones (Chan et al.'s pairwise update), so chunks, or whole
+    accumulators built on other workers, can be merged in any order.
+    """
+
+    def __init__(self, sketch_size=SKETCH_SIZE):
+        self.count = 0
+        self.missing = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(sketch_size)
+
+    def add(self, values):
+        """
+        Add a chunk of values
+
+        Args:
+            values (numpy.ndarray): float64 values; NaN and infinities count as missing
+        """
+        finite = values[np.isfinite(values)]
+        self.missing += len(values) - len(finite)
+        if not len(finite):
+            return
+        mean = finite.mean()
+        self.combine(len(finite), mean, ((finite - mean) ** 2).sum(), finite.min(), finite.max())
+        self.sketch.add(finite)
+
+    def merge(self, other):
+        self.missing += other.missing
+        if other.count:
+            self.combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+            self.sketch.merge(other.sketch)
+
+    def combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, float(minimum))
+        self.maximum = max(self.maximum, float(maximum))
+
+    def result(self):
+        """The summary as plain numbers, ready to be stored as JSON"""
+        if not self.count:
+            return {'count': 0, 'missing': self.missing, 'min': None, 'max': None, 'mean': None,
+                    'std': None, 'quantiles': {}, 'histogram': None}
+        counts, edges = self.sketch.histogram(self.minimum, self.maximum)
+        return {
+            'count': self.count,
+            'missing': self.missing,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': float(self.mean),
+            'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+            'quantiles': {str(q): value for q, value in zip(QUANTILES, self.sketch.quantiles(QUANTILES))},
+            'histogram': {'counts': counts, 'edges': edges},
+        }
+
+
+def compute_file_stats(file_path, chunk_size=100000, progress=None, is_cancelled=None):
+    """
+    Summarise every numeric column of a CSV file in one streaming pass
+
+    Only the numeric columns are parsed, a chunk at a time, so memory use
+    doesn't grow with the file. Values in those columns that aren't numbers
+    count as missing.
+
+    Args:
+        file_path (str): CSV file
+        chunk_size (int): Rows per chunk
+        progress: Called with (bytes read, total bytes) after each chunk
+        is_cancelled: Called after each chunk; stop if it returns True
+
+    Returns:
+        dict or None: Column name -> summary from ColumnAccumulator.result(),
+        in file order, or None if cancelled
+    """
+    with span('column_stats', file=os.path.basename(file_path)):
+        sample, _ = read_frame(file_path, ENGINE_C, nrows=SAMPLE_ROWS)
+        columns = CSVReader.get_numeric_columns(sample)
+        accumulators = {col: ColumnAccumulator() for col in columns}
+        if not columns:
+            return {}
+
+        for chunk, bytes_read, total_bytes in CSVReader.read_csv_chunks(file_path, chunk_size, usecols=columns):
+            with span('accumulate', rows=len(chunk)):
+                for col in columns:
+                    values = pd.to_numeric(chunk[col], errors='coerce')
+                    accumulators[col].add(values.to_numpy(dtype=np.float64, na_value=np.nan))
+            if progress:
+                progress(bytes_read, total_bytes)
+            if is_cancelled and is_cancelled():
+                return None
+
+        return {col: accumulators[col].result() for col in columns}
+
+
+class StatsCache:
+    """
+    Column statistics saved per source file, so reopening a file skips the pass
+
+    Stored as one JSON file per source path inside the parsed-file cache's
+    folder, and recomputed once the file's cache key (size, mtime and content
+    hash) changes.
+    """
+
+    def __init__(self, csv_cache=None):
+        self.csv_cache = csv_cache or get_default_cache()
+        self.stats_dir = os.path.join(self.csv_cache.cache_dir, '.stats')
+
+    def path_for(self, file_path):
+        name = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.stats_dir, name + '.json')
+
+    def load(self, file_path):
+        """
+        Returns:
+            dict or None: Statistics from compute_file_stats(), or None if not cached or stale
+        """
+        try:
+            with open(self.path_for(file_path), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if (stored.get('version') != STATS_FORMAT_VERSION
+                    or stored.get('key') != self.csv_cache.key_for(file_path)):
+                return None
+            return stored['columns']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, file_path, stats):
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            stored = {
+                'version': STATS_FORMAT_VERSION,
+                'source': os.path.abspath(file_path),
+                'key': self.csv_cache.key_for(file_path),
+                'columns': stats,
+            }
+            # Write then rename, so a reader never sees half a file
+            path = self.path_for(file_path)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"Error writing statistics cache: {e}")
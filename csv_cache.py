@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+# Sidecar cache of parsed CSVs, stored as one .npy file per column
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".landmark_csv_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# How much of the head and tail of a file goes into its content hash
+HASH_SAMPLE_BYTES = 1024 ** 2
+
+META_FILE = "meta.json"
+CACHE_FORMAT_VERSION = 1
+
+
+class CacheStats:
+    """Hit/miss counters for a CSVCache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0   # Seconds of parsing avoided by cache hits
+        self.last_hit = False
+        self.last_time_saved = 0.0
+
+    def record_hit(self, time_saved):
+        self.hits += 1
+        self.time_saved += time_saved
+        self.last_hit = True
+        self.last_time_saved = time_saved
+
+    def record_miss(self):
+        self.misses += 1
+        self.last_hit = False
+        self.last_time_saved = 0.0
+
+    def summary(self):
+        """One-line description for the status label"""
+        if self.last_hit:
+            last = f"cache hit, saved {self.last_time_saved:.1f}s"
+        else:
+            last = "cache miss"
+        return (f"{last} ({self.hits} hits / {self.misses} misses, "
+                f"{self.time_saved:.1f}s saved)")
+
+
+class CSVCache:
+    """A size-bounded, LRU-evicted columnar cache of parsed CSV files"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+
+    @staticmethod
+    def content_hash(file_path):
+        """Hash the head and tail of a file, cheap even for multi-GB files"""
+        digest = hashlib.sha1()
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            digest.update(f.read(HASH_SAMPLE_BYTES))
+            if size > HASH_SAMPLE_BYTES:
+                f.seek(max(HASH_SAMPLE_BYTES, size - HASH_SAMPLE_BYTES))
+                digest.update(f.read(HASH_SAMPLE_BYTES))
+        return digest.hexdigest()
+
+    def key_for(self, file_path):
+        """
+        Build the cache key for a file from its path, size, mtime and content
+
+        Args:
+            file_path (str): Path to the CSV file
+
+        Returns:
+            str: Hex key that changes whenever the file does
+        """
+        stat = os.stat(file_path)
+        parts = [
+            os.path.abspath(file_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            self.content_hash(file_path),
+            str(CACHE_FORMAT_VERSION),
+        ]
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, file_path, key=None):
+        """
+        Load a cached copy of a CSV file if one is still valid
+
+        Args:
+            file_path (str): Path to the CSV file
+            key (str): The file's key_for(), if already computed
+
+        Returns:
+            pandas.DataFrame or None: The cached data, or None on a cache miss
+        """
+        start = time.perf_counter()
+        try:
+            entry = self.entry_dir(key or self.key_for(file_path))
+            with open(os.path.join(entry, META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            columns = {}
+            for column in meta['columns']:
+                values = np.load(os.path.join(entry, column['file']), allow_pickle=column['pickled'])
+                series = pd.Series(values, name=column['name'])
+                if column['pickled']:
+                    # Restore str/category dtypes that were saved as object arrays
+                    try:
+                        series = series.astype(column['dtype'])
+                    except (TypeError, ValueError):
+                        pass
+                columns[column['name']] = series
+            data = pd.DataFrame(columns, columns=[c['name'] for c in meta['columns']])
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+            # Missing, stale or damaged entries are all misses; the file is parsed instead
+            self.stats.record_miss()
+            return None
+
+        # Mark as recently used for LRU eviction
+        os.utime(entry)
+
+        load_seconds = time.perf_counter() - start
+        self.stats.record_hit(max(0.0, meta.get('parse_seconds', 0.0) - load_seconds))
+        return data
+
+    def store(self, file_path, data, parse_seconds, key):
+        """
+        Save parsed CSV data to the cache
+
+        Args:
+            file_path (str): Path to the CSV file the data came from
+            data (pandas.DataFrame): The parsed data
+            parse_seconds (float): How long parsing took, used for time-saved stats
+            key (str): The file's key_for(), taken before it was parsed. A file
+                that grows while it is parsed then gets a new key, rather than
+                the shorter data being stored under it
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # Write into a temporary directory and rename, so a crash mid-write
+            # never leaves a half-written entry that looks valid
+            tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+            columns = []
+            for i, name in enumerate(data.columns):
+                series = data[name]
+                # Numeric, bool and naive datetime columns are plain arrays;
+                # anything else is stored as a pickled object array
+                pickled = not (pd.api.types.is_numeric_dtype(series.dtype)
+                               or pd.api.types.is_datetime64_dtype(series.dtype))
+                if pickled:
+                    values = series.to_numpy(dtype=object)
+                else:
+                    values = series.to_numpy()
+                file_name = f"col_{i:05d}.npy"
+                np.save(os.path.join(tmp_dir, file_name), values, allow_pickle=pickled)
+                columns.append({
+                    'name': str(name),
+                    'file': file_name,
+                    'dtype': str(series.dtype),
+                    'pickled': pickled,
+                })
+
+            meta = {
+                'source': os.path.abspath(file_path),
+                'rows': len(data),
+                'parse_seconds': parse_seconds,
+                'columns': columns,
+            }
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+            entry = self.entry_dir(key)
+            if os.path.exists(entry):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.rename(tmp_dir, entry)
+
+            self.remove_stale(meta['source'], keep=key)
+            self.evict()
+        except OSError as e:
+            # The cache is an optimisation, never fail a load because of it
+            print(f"Error writing CSV cache: {e}")
+
+    def entries(self):
+        """List (path, size in bytes, last used time) for every cache entry"""
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            result.append((path, size, os.path.getmtime(path)))
+        return result
+
+    def remove_stale(self, source, keep):
+        """Drop entries for older versions of the same source file"""
+        for path, _, _ in self.entries():
+            if os.path.basename(path) == keep:
+                continue
+            try:
+                with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+                    if json.load(f).get('source') == source:
+                        shutil.rmtree(path, ignore_errors=True)
+            except (OSError, ValueError):
+                pass
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """The application-wide cache shared by CSVReader and the loader"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CSVCache()
+    return _default_cache
@@ -0,0 +1,206 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from lazy_dataset import LineScanner
+
+
+# Rows are read at most this often even if the file watcher is silent,
+# since change notifications are unreliable on network drives
+POLL_INTERVAL_MS = 1000
+
+# Upper bound on bytes parsed per read. Reads run on the GUI thread, so a
+# burst of rows is taken in pieces of a few milliseconds each, with the event
+# loop running in between
+MAX_READ_BYTES = 256 * 1024
+
+# Block size for scanning the file for the end of the rows already loaded
+SCAN_BLOCK_BYTES = 32 * 1024 ** 2
+
+
+class GrowingFrame:
+    """
+    Column arrays that can have rows appended without copying the whole frame
+
+    Each column lives in a NumPy buffer with spare capacity that doubles when
+    full, so appending is amortised O(rows appended). Like LazyCSVDataset it
+    supports the DataFrame subset the viewer uses: columns, len(), [column]
+    and head().
+    """
+
+    def __init__(self, data):
+        self.columns = pd.Index(data.columns)
+        self.length = len(data)
+        self.buffers = {}
+        for col in self.columns:
+            series = data[col]
+            if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+                self.buffers[col] = series.to_numpy().copy()
+            else:
+                self.buffers[col] = series.to_numpy(dtype=object)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, col):
+        return pd.Series(self.buffers[col][:self.length], name=col, copy=False)
+
+    def head(self, n=5):
+        return pd.DataFrame({col: self[col].iloc[:n] for col in self.columns})
+
+    def append(self, chunk):
+        """
+        Append the rows of a DataFrame with the same columns
+
+        Args:
+            chunk (pandas.DataFrame): New rows
+        """
+        added = len(chunk)
+        if not added:
+            return
+        needed = self.length + added
+        for col in self.columns:
+            buffer = self.buffers[col]
+            values = chunk[col].to_numpy()
+
+            # Widen the column if the new rows don't fit its type, e.g. NaNs
+            # arriving in an int column or text in a numeric one
+            dtype = buffer.dtype
+            if dtype != object:
+                if values.dtype.kind not in 'biuf':
+                    dtype = np.dtype(object)
+                elif dtype.kind in 'biu' and values.dtype.kind == 'f':
+                    dtype = np.dtype(np.float64)
+
+            if needed > len(buffer) or dtype != buffer.dtype:
+                grown = np.empty(max(needed, 2 * len(buffer)), dtype=dtype)
+                grown[:self.length] = buffer[:self.length]
+                self.buffers[col] = buffer = grown
+            buffer[self.length:needed] = values
+        self.length = needed
+
+
+def find_rows_end(file_path, rows):
+    """
+    Find the byte offset just past the header and the first rows rows
+
+    Rows are counted the way pandas parsed them, skipping blank lines and
+    keeping newlines inside quoted fields.
+
+    Args:
+        file_path (str): Path to the CSV file
+        rows (int): Number of data rows already parsed
+
+    Returns:
+        int: Offset where the next unparsed row starts
+    """
+    lines_wanted = rows + 2  # Header, the parsed rows, then the first unparsed row
+    scanner = LineScanner()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                # Every line has been parsed, the last perhaps without a newline after it
+                return scanner.position
+            starts = scanner.feed(block)
+            if len(starts) >= lines_wanted:
+                return int(starts[lines_wanted - 1])
+            lines_wanted -= len(starts)
+
+
+class CSVFollower(QObject):
+    """Watches a growing CSV file and appends new rows to a GrowingFrame"""
+
+    rows_appended = pyqtSignal(int)   # Rows added since the last notification
+    truncated = pyqtSignal()          # The file shrank, e.g. the logger restarted it
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, frame, offset, max_refresh_hz=2.0, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.frame = frame
+        self.offset = offset
+        self.pending_rows = 0
+
+        self.watcher = QFileSystemWatcher([file_path], self)
+        self.watcher.fileChanged.connect(self.read_new_rows)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.read_new_rows)
+
+        # Graph updates are throttled separately from reading, so a fast
+        # writer costs at most max_refresh_hz redraws per second
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.notify)
+        self.set_max_refresh_hz(max_refresh_hz)
+
+    def set_max_refresh_hz(self, hz):
+        self.refresh_timer.setInterval(int(1000 / max(hz, 0.1)))
+
+    def start(self):
+        self.poll_timer.start()
+        self.read_new_rows()
+
+    def stop(self):
+        self.poll_timer.stop()
+        self.refresh_timer.stop()
+        self.watcher.removePaths(self.watcher.files())
+
+    def read_new_rows(self):
+        try:
+            size = os.path.getsize(self.file_path)
+            if size < self.offset:
+                self.stop()
+                self.truncated.emit()
+                return
+            if size == self.offset:
+                return
+
+            with open(self.file_path, 'rb') as f:
+                f.seek(self.offset)
+                scanner = LineScanner(self.offset)
+                block = f.read(min(size - self.offset, MAX_READ_BYTES))
+                rows = len(scanner.feed(block))
+                while scanner.open_start == self.offset and scanner.position < size:
+                    # A single row longer than one read; take it whole
+                    more = f.read(min(size - scanner.position, MAX_READ_BYTES))
+                    rows += len(scanner.feed(more))
+                    block += more
+
+            # Only parse complete lines, cut at a newline outside quotes; a
+            # row still being written waits for next time
+            end = scanner.open_start - self.offset
+            if end == 0:
+                return
+            if not rows:
+                # Nothing but blank lines
+                self.offset += end
+                return
+            chunk = pd.read_csv(io.BytesIO(block[:end]), header=None, names=list(self.frame.columns))
+            self.offset += end
+
+            self.frame.append(chunk)
+            self.pending_rows += len(chunk)
+            if not self.refresh_timer.isActive():
+                self.refresh_timer.start()
+
+            # Some platforms drop the watch when a file is replaced
+            if self.file_path not in self.watcher.files():
+                self.watcher.addPath(self.file_path)
+
+            if len(block) >= MAX_READ_BYTES and self.offset < size:
+                # More was written than one read takes; continue on the next event loop pass
+                QTimer.singleShot(0, self.read_new_rows)
+
+        except Exception as e:
+            self.stop()
+            self.failed.emit(f"Failed to read new rows: {str(e)}")
+
+    def notify(self):
+        rows, self.pending_rows = self.pending_rows, 0
+        if rows:
+            self.rows_appended.emit(rows)
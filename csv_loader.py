@@ -0,0 +1,344 @@
+import os
+import threading
+import time
+import pandas as pd
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from LandMarkCSVReader import CSVReader
+from csv_source import ENGINE_AUTO, ENGINE_ARROW, ENGINE_C, is_compressed, parse_report, read_frame, resolve_engine
+from schema_profiler import SchemaProfiler
+from lazy_dataset import LazyCSVDataset
+from multi_dataset import load_files
+from perf_trace import span
+
+
+class CSVLoadWorker(QObject):
+    """Reads a CSV file in chunks on a worker thread"""
+
+    progress = pyqtSignal(int)          # Percent of the file's bytes read
+    schema_ready = pyqtSignal(object)   # DatasetSchema profiled from the first rows
+    preview_ready = pyqtSignal(object)  # DataFrame with the rows parsed so far
+    compacted = pyqtSignal(object)      # Report from CSVReader.compact(), before finished
+    parsed = pyqtSignal(object)         # Engine and throughput from csv_source.parse_report(), before finished
+    finished = pyqtSignal(object)       # Complete DataFrame
+    failed = pyqtSignal(str)            # Error message
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, chunk_size=100000, cache=None, lazy=False, compact=False, engine=ENGINE_AUTO):
+        super().__init__()
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.cache_key = None
+        # Row offsets can't be found without decompressing, so compressed files load in full
+        self.lazy = lazy and not is_compressed(file_path)
+        self.compact = compact
+        # Auto streams with the C parser; Arrow only when chosen explicitly
+        self.engine = resolve_engine(engine, streaming=True)
+        self._cancel_requested = False
+
+    def cancel(self):
+        """Ask the worker to stop after the chunk it is currently parsing"""
+        self._cancel_requested = True
+
+    def run(self):
+        # Name the Qt thread so timing traces can tell it apart
+        threading.current_thread().name = "CSV loader"
+        with span('open_csv', file=os.path.basename(self.file_path), lazy=self.lazy, engine=self.engine):
+            self.load()
+
+    def load(self):
+        chunks = []
+        last_percent = -1
+
+        try:
+            if self.lazy:
+                self.run_lazy()
+                return
+
+            if self.cache is not None:
+                start = time.perf_counter()
+                # Keyed before parsing, so rows written meanwhile aren't cached as missing
+                self.cache_key = self.cache.key_for(self.file_path)
+                with span('cache.load'):
+                    data = self.cache.load(self.file_path, self.cache_key)
+                if data is not None:
+                    with span('profile_schema'):
+                        schema = SchemaProfiler.profile(data)
+                    if self.compact:
+                        data = self.compact_data(data, schema, time.perf_counter() - start)
+                    self.schema_ready.emit(schema)
+                    self.progress.emit(100)
+                    self.finished.emit(data)
+                    return
+
+            if self.engine == ENGINE_ARROW:
+                self.load_whole()
+                return
+
+            start = time.perf_counter()
+            for chunk, bytes_read, total_bytes in CSVReader.read_csv_chunks(self.file_path, self.chunk_size):
+                if self._cancel_requested:
+                    self.cancelled.emit()
+                    return
+
+                if not chunks:
+                    # Validate on the first chunk so bad files fail fast
+                    error = CSVReader.validate(chunk)
+                    if error:
+                        self.failed.emit(error)
+                        return
+                    # Profile once per load, then let the first graph render
+                    # while the rest streams in
+                    with span('profile_schema'):
+                        schema = SchemaProfiler.profile(chunk)
+                    self.schema_ready.emit(schema)
+                    self.preview_ready.emit(chunk)
+
+                chunks.append(chunk)
+
+                # Only emit when the percentage changes to avoid flooding the GUI thread
+                percent = int(100 * bytes_read / total_bytes) if total_bytes else 100
+                if percent != last_percent:
+                    last_percent = percent
+                    self.progress.emit(percent)
+
+            if not chunks:
+                self.failed.emit("CSV file contains no data.")
+                return
+
+            with span('concat', chunks=len(chunks)):
+                data = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+            parse_seconds = time.perf_counter() - start
+            self.progress.emit(100)
+            self.parsed.emit(parse_report(self.file_path, ENGINE_C, parse_seconds))
+            self.hand_over(data, schema, parse_seconds)
+
+        except Exception as e:
+            self.failed.emit(f"Failed to open CSV file: {str(e)}")
+
+    def load_whole(self):
+        """
+        Parse the file in one call with the Arrow engine, which splits it into
+        blocks parsed on several threads; there are no chunks to preview or
+        cancel between, and it falls back to the C parser if Arrow can't read
+        the file
+        """
+        data, report = read_frame(self.file_path, self.engine)
+        if self._cancel_requested:
+            self.cancelled.emit()
+            return
+        error = CSVReader.validate(data)
+        if error:
+            self.failed.emit(error)
+            return
+        if data.empty:
+            self.failed.emit("CSV file contains no data.")
+            return
+        with span('profile_schema'):
+            schema = SchemaProfiler.profile(data)
+        self.schema_ready.emit(schema)
+        self.progress.emit(100)
+        self.parsed.emit(report)
+        self.hand_over(data, schema, report['seconds'])
+
+    def hand_over(self, data, schema, parse_seconds):
+        """Emit the parsed data, compacting it if asked, then cache it"""
+        if self.compact:
+            self.finished.emit(self.compact_data(data, schema, parse_seconds))
+        else:
+            self.finished.emit(data)
+
+        # Write the cache after handing the data over so the graphs don't wait for it.
+        # It keeps the full data, so a later load that isn't compact can use it too
+        if self.cache is not None:
+            with span('cache.store'):
+                self.cache.store(self.file_path, data, parse_seconds, self.cache_key)
+
+
+    def compact_data(self, data, schema, load_seconds):
+        """Compact the loaded data and report how much it saved"""
+        data, report = CSVReader.compact(data, schema)
+        report['load_seconds'] = load_seconds
+        self.compacted.emit(report)
+        return data
+
+    def run_lazy(self):
+        """Scan row offsets only; columns are parsed when a graph first needs them"""
+        dataset = LazyCSVDataset(self.file_path)
+        error = CSVReader.validate(dataset)
+        if error:
+            self.failed.emit(error)
+            return
+
+        last_percent = [-1]
+
+        def report(bytes_read, total_bytes):
+            percent = int(100 * bytes_read / total_bytes) if total_bytes else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.progress.emit(percent)
+
+        with span('scan_rows'):
+            scanned = dataset.scan(report, lambda: self._cancel_requested)
+        if not scanned:
+            dataset.close()
+            self.cancelled.emit()
+            return
+
+        with span('profile_schema'):
+            schema = SchemaProfiler.profile(dataset)
+        self.schema_ready.emit(schema)
+        self.progress.emit(100)
+        self.finished.emit(dataset)
+
+
+class CSVLoader(QObject):
+    """Owns the worker thread for a single background CSV load"""
+
+    progress = pyqtSignal(int)
+    schema_ready = pyqtSignal(object)
+    preview_ready = pyqtSignal(object)
+    compacted = pyqtSignal(object)
+    parsed = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, chunk_size=100000, cache=None, lazy=False, compact=False, engine=ENGINE_AUTO,
+                 parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+        # Parent the thread so Qt, not the garbage collector, decides when it dies
+        self.thread = QThread(self)
+        self.worker = CSVLoadWorker(file_path, chunk_size, cache, lazy, compact, engine)
+        self.worker.moveToThread(self.thread)
+
+        # Forward worker signals; they are queued onto the GUI thread
+        self.worker.progress.connect(self.progress)
+        self.worker.schema_ready.connect(self.schema_ready)
+        self.worker.preview_ready.connect(self.preview_ready)
+        self.worker.compacted.connect(self.compacted)
+        self.worker.parsed.connect(self.parsed)
+        self.worker.finished.connect(self.finished)
+        self.worker.failed.connect(self.failed)
+        self.worker.cancelled.connect(self.cancelled)
+
+        # Stop the thread once the worker is done, whatever the outcome
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.worker.cancelled.connect(self.thread.quit)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.deleteLater)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.worker.cancel()
+
+    def detach(self):
+        """Disconnect all listeners, e.g. when a newer load replaces this one"""
+        for sig in (self.progress, self.schema_ready, self.preview_ready, self.compacted, self.parsed,
+                    self.finished, self.failed, self.cancelled):
+            try:
+                sig.disconnect()
+            except TypeError:
+                # Nothing was connected
+                pass
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def wait(self):
+        """Block until the worker thread has exited"""
+        self.thread.wait()
+
+
+class MultiCSVLoadWorker(QObject):
+    """Loads several CSV files in a process pool, waiting for it on a worker thread"""
+
+    progress = pyqtSignal(int)            # Percent of the files finished
+    finished = pyqtSignal(object, object) # {path: DataFrame}, {path: error message}
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_paths, use_cache=True, engine=ENGINE_AUTO):
+        super().__init__()
+        self.file_paths = file_paths
+        self.use_cache = use_cache
+        self.engine = engine
+        self._cancel_requested = False
+        self.done = 0
+
+    def cancel(self):
+        """Discard the results and skip files not yet started; files already being parsed still finish"""
+        self._cancel_requested = True
+
+    def run(self):
+        threading.current_thread().name = "CSV loader"
+        try:
+            with span('open_csvs', files=len(self.file_paths)):
+                frames, errors = load_files(self.file_paths, self.use_cache, engine=self.engine,
+                                            on_loaded=self.report, is_cancelled=lambda: self._cancel_requested)
+        except Exception as e:
+            self.failed.emit(f"Failed to open CSV files: {str(e)}")
+            return
+        if self._cancel_requested:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(frames, errors)
+
+    def report(self, file_path):
+        self.done += 1
+        self.progress.emit(int(100 * self.done / len(self.file_paths)))
+
+
+class MultiCSVLoader(QObject):
+    """Owns the worker thread for loading several files at once; used like CSVLoader"""
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_paths, use_cache=True, engine=ENGINE_AUTO, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+
+        self.thread = QThread(self)
+        self.worker = MultiCSVLoadWorker(file_paths, use_cache, engine)
+        self.worker.moveToThread(self.thread)
+
+        self.worker.progress.connect(self.progress)
+        self.worker.finished.connect(self.finished)
+        self.worker.failed.connect(self.failed)
+        self.worker.cancelled.connect(self.cancelled)
+
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.worker.cancelled.connect(self.thread.quit)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.deleteLater)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.worker.cancel()
+
+    def detach(self):
+        for sig in (self.progress, self.finished, self.failed, self.cancelled):
+            try:
+                sig.disconnect()
+            except TypeError:
+                pass
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def wait(self):
+        self.thread.wait()
@@ -0,0 +1,165 @@
+import bz2
+import gzip
+import importlib.util
+import os
+import time
+
+import pandas as pd
+
+from perf_trace import span
+
+
+# Parse engines. Arrow (pyarrow, when installed) parses blocks of the file on
+# several threads at once; C is pandas' own single-threaded parser and is
+# always available
+ENGINE_AUTO = 'Auto'
+ENGINE_C = 'C'
+ENGINE_ARROW = 'Arrow'
+PARSE_ENGINES = [ENGINE_AUTO, ENGINE_C, ENGINE_ARROW]
+PANDAS_ENGINES = {ENGINE_C: 'c', ENGINE_ARROW: 'pyarrow'}
+
+# Compressed files are decompressed as they are parsed, never to disk or whole into memory
+COMPRESSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.zst': 'zstd'}
+CSV_SUFFIXES = ['.csv'] + ['.csv' + suffix for suffix in COMPRESSIONS]
+CSV_FILE_FILTER = f"CSV Files ({' '.join('*' + suffix for suffix in CSV_SUFFIXES)})"
+
+_arrow_available = None
+
+
+def arrow_available():
+    """Whether pyarrow is installed; checked without importing it"""
+    global _arrow_available
+    if _arrow_available is None:
+        _arrow_available = importlib.util.find_spec('pyarrow') is not None
+    return _arrow_available
+
+
+def resolve_engine(engine=ENGINE_AUTO, streaming=False):
+    """
+    The engine a file is parsed with: Arrow if chosen or automatic and
+    installed, C otherwise
+
+    Args:
+        engine (str): One of PARSE_ENGINES
+        streaming (bool): Whether the file is read in chunks, with progress,
+            a preview and cancelling between chunks, which only the C parser
+            gives; Auto then means C
+    """
+    if engine == ENGINE_AUTO and streaming:
+        return ENGINE_C
+    if engine in (ENGINE_AUTO, ENGINE_ARROW) and arrow_available():
+        return ENGINE_ARROW
+    return ENGINE_C
+
+
+def compression_of(file_path):
+    """'gzip', 'bz2' or 'zstd' from the file's extension, None if it isn't compressed"""
+    return COMPRESSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def is_compressed(file_path):
+    return compression_of(file_path) is not None
+
+
+def file_stem(file_path):
+    """File name without its .csv and compression extensions"""
+    name = os.path.basename(file_path)
+    if is_compressed(name):
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def open_source(file_path):
+    """
+    Open a CSV file for reading, decompressing it as it is read
+
+    Returns:
+        tuple: (binary stream of the CSV text, the underlying file, whose
+        tell() is how far through the file on disk the stream has read)
+    """
+    raw = open(file_path, 'rb')
+    try:
+        compression = compression_of(file_path)
+        if compression == 'gzip':
+            return gzip.GzipFile(fileobj=raw), raw
+        if compression == 'bz2':
+            return bz2.BZ2File(raw), raw
+        if compression == 'zstd':
+            return zstd_reader(raw), raw
+        return raw, raw
+    except Exception:
+        raw.close()
+        raise
+
+
+def zstd_reader(raw):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Reading .zst files needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+
+
+def parse_report(file_path, engine, seconds, fallback=None):
+    """
+    How a file was parsed
+
+    Returns:
+        dict: engine, compression, bytes (the file's size on disk), seconds,
+        mb_per_s, and fallback, why Arrow wasn't used when it was chosen
+    """
+    size = os.path.getsize(file_path)
+    return {
+        'engine': engine,
+        'compression': compression_of(file_path),
+        'bytes': size,
+        'seconds': seconds,
+        'mb_per_s': size / 1024 ** 2 / seconds if seconds > 0 else 0.0,
+        'fallback': fallback,
+    }
+
+
+def parse_summary(report):
+    """One-line description of a parse report for the status label"""
+    summary = f"parsed with {report['engine']} at {report['mb_per_s']:.0f} MB/s"
+    if report['compression']:
+        summary += f" from {report['compression']}"
+    if report['fallback']:
+        summary += " (Arrow failed)"
+    return summary
+
+
+def read_frame(file_path, engine=ENGINE_AUTO, **kwargs):
+    """
+    Parse a whole CSV file, decompressing it as it is read
+
+    Falls back to the C parser if the chosen engine isn't installed, or if
+    Arrow can't parse the file: it is stricter about ragged rows and doesn't
+    support every read_csv option.
+
+    Args:
+        file_path (str): CSV file, optionally .gz, .bz2 or .zst
+        engine (str): One of PARSE_ENGINES
+        **kwargs: Passed on to pandas.read_csv()
+
+    Returns:
+        tuple: (pandas.DataFrame, report from parse_report())
+    """
+    fallback = None
+    if resolve_engine(engine) == ENGINE_ARROW:
+        try:
+            return parse(file_path, ENGINE_ARROW, kwargs)
+        except Exception as e:
+            fallback = str(e)
+    data, report = parse(file_path, ENGINE_C, kwargs)
+    report['fallback'] = fallback
+    return data, report
+
+
+def parse(file_path, engine, kwargs):
+    start = time.perf_counter()
+    with span('parse', engine=engine, compression=compression_of(file_path) or 'none'):
+        stream, raw = open_source(file_path)
+        with raw, stream:
+            data = pd.read_csv(stream, engine=PANDAS_ENGINES[engine], **kwargs)
+    return data, parse_report(file_path, engine, time.perf_counter() - start)
@@ -1,12 +1,27 @@
 import sys
 import os
-import pandas as pd
+import importlib
+import threading
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QFileDialog, QVBoxLayout, 
-                           QHBoxLayout, QWidget, QPushButton, QMessageBox, QLabel)
+                           QHBoxLayout, QWidget, QPushButton, QMessageBox, QLabel, QProgressBar,
+                           QCheckBox, QSpinBox, QTabWidget, QToolButton, QMenu, QInputDialog, QComboBox)
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtWidgets import QSizePolicy
-from graph_view import GraphView
 from scrollable_layout import ScrollableGraphContainer
+from csv_loader import CSVLoader, MultiCSVLoader
+from csv_cache import get_default_cache
+from csv_source import (CSV_FILE_FILTER, ENGINE_ARROW, ENGINE_AUTO, PARSE_ENGINES, arrow_available,
+                        is_compressed, parse_summary)
+from column_cache import ColumnConversionCache
+from lazy_dataset import LazyCSVDataset
+from csv_follower import CSVFollower, GrowingFrame, find_rows_end
+from perf_panel import PerfPanel
+from data_table import DataTablePanel
+from stats_panel import StatsPanel
+from align_dialog import AlignDialog
+from multi_dataset import align_datasets, unique_stems
+from schema_profiler import SchemaProfiler
+from perf_trace import span
 
 # Import CSVReader if it exists in the same module, otherwise create a backup import plan
 try:
@@ -14,11 +29,41 @@ try:
 except ImportError:
     CSVReader = None
 
+# Imported in the background once the window is on screen, so neither the
+# window nor the first graph waits for them. graph_view itself is imported on
+# first use, on the GUI thread, as it sets up matplotlib's Qt backend
+PRELOAD_MODULES = ('matplotlib', 'matplotlib.figure', 'matplotlib.collections', 'matplotlib.lines',
+                   'matplotlib.backends.backend_agg', 'plot_pipeline')
+
+def preload_modules():
+    """Import the plotting modules ahead of their first use; runs on a background thread"""
+    with span('startup.preload'):
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                # Imported again, and the error reported, where it is used
+                print(f"Error preloading {name}: {e}")
+
+def start_preload():
+    thread = threading.Thread(target=preload_modules, name="Preload", daemon=True)
+    thread.start()
+    return thread
+
 class CSVViewer(QMainWindow):
     def __init__(self):
         super().__init__()
         self.csv_data = None
+        self.schema = None
+        self.column_cache = ColumnConversionCache()
         self.graph_views = []
+        self.loader = None
+        self.follower = None
+        self.data_file = None
+        self.compact_report = None
+        self.parse_report = None
+        self.exporter = None
+        self.csv_cache = get_default_cache()
         self.initUI()
         
     def initUI(self):
@@ -43,9 +88,80 @@ class CSVViewer(QMainWindow):
         self.add_graph_btn.setEnabled(False)
         button_layout.addWidget(self.add_graph_btn)
         
+        # Export every graph at once, rendered in the background
+        self.export_btn = QToolButton(self)
+        self.export_btn.setText('Export All Graphs')
+        self.export_btn.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        export_menu = QMenu(self.export_btn)
+        export_menu.addAction("To Folder...", self.export_to_folder)
+        export_menu.addAction("To Multipage PDF...", self.export_to_pdf)
+        self.export_btn.setMenu(export_menu)
+        self.export_btn.setEnabled(False)
+        button_layout.addWidget(self.export_btn)
+        
+        # Lazy mode parses only the columns the graphs actually use
+        self.lazy_checkbox = QCheckBox('Lazy Columns', self)
+        self.lazy_checkbox.setToolTip("Scan only the header and row offsets, and parse each column "
+                                      "when a graph first selects it")
+        button_layout.addWidget(self.lazy_checkbox)
+        
+        # Compact mode shrinks the loaded data's column types
+        self.compact_checkbox = QCheckBox('Compact', self)
+        self.compact_checkbox.setToolTip("Downcast numbers, store repeated strings as categories and dates "
+                                         "as timestamps, and drop free-text columns, to use less memory")
+        button_layout.addWidget(self.compact_checkbox)
+        
+        # Parser for the next file opened; Arrow parses blocks of the file on several threads
+        self.engine_combo = QComboBox(self)
+        self.engine_combo.addItems(PARSE_ENGINES)
+        self.engine_combo.setCurrentText(ENGINE_AUTO)
+        if arrow_available():
+            self.engine_combo.setToolTip("CSV parser: Arrow is multi-threaded but shows no progress or preview "
+                                         "and can't be cancelled mid-file; C (and Auto) streams the file "
+                                         "in chunks")
+        else:
+            self.engine_combo.setToolTip("CSV parser: install pyarrow for the multi-threaded Arrow parser; "
+                                         "until then every file is parsed with C")
+            self.engine_combo.model().item(PARSE_ENGINES.index(ENGINE_ARROW)).setEnabled(False)
+        button_layout.addWidget(self.engine_combo)
+        
+        # Follow mode appends rows as they are written to the file
+        self.follow_checkbox = QCheckBox('Follow', self)
+        self.follow_checkbox.setToolTip("Watch the file and add rows as they are appended")
+        self.follow_checkbox.setEnabled(False)
+        self.follow_checkbox.toggled.connect(self.toggle_follow)
+        button_layout.addWidget(self.follow_checkbox)
+        
+        self.refresh_rate_spin = QSpinBox(self)
+        self.refresh_rate_spin.setRange(1, 30)
+        self.refresh_rate_spin.setValue(2)
+        self.refresh_rate_spin.setSuffix(" Hz")
+        self.refresh_rate_spin.setToolTip("Maximum graph refresh rate while following")
+        self.refresh_rate_spin.valueChanged.connect(self.set_follow_refresh_rate)
+        button_layout.addWidget(self.refresh_rate_spin)
+        
         # Add spacer to push buttons to the left
         button_layout.addStretch()
         
+        # Timing panel; recording is only on while it is open
+        self.perf_btn = QPushButton('Performance', self)
+        self.perf_btn.setCheckable(True)
+        self.perf_btn.setToolTip("Show per-phase timings of recent operations")
+        self.perf_btn.toggled.connect(self.toggle_perf_panel)
+        button_layout.addWidget(self.perf_btn)
+        
+        # Load progress, only visible while a file is streaming in
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(250)
+        self.progress_bar.setVisible(False)
+        button_layout.addWidget(self.progress_bar)
+        
+        self.cancel_load_btn = QPushButton('Cancel', self)
+        self.cancel_load_btn.clicked.connect(self.cancel_load)
+        self.cancel_load_btn.setVisible(False)
+        button_layout.addWidget(self.cancel_load_btn)
+        
         # Add button layout to main layout
         main_layout.addLayout(button_layout)
         
@@ -55,51 +171,386 @@ class CSVViewer(QMainWindow):
         
         # Use our custom ScrollableGraphContainer
         self.scroll_container = ScrollableGraphContainer()
-        main_layout.addWidget(self.scroll_container)
+        
+        # The rows behind the graphs; selecting rows highlights them in every graph
+        self.table_panel = DataTablePanel(self)
+        self.table_panel.rows_selected.connect(self.highlight_rows)
+        
+        self.tabs = QTabWidget(self)
+        self.tabs.addTab(self.scroll_container, "Graphs")
+        self.tabs.addTab(self.table_panel, "Table")
+        
+        # Column summaries, computed in the background the first time the tab is shown
+        self.stats_panel = StatsPanel(self)
+        self.tabs.addTab(self.stats_panel, "Statistics")
+        main_layout.addWidget(self.tabs)
+        
+        self.perf_panel = PerfPanel(self)
+        self.perf_panel.setVisible(False)
+        main_layout.addWidget(self.perf_panel)
         
         self.setCentralWidget(main_widget)
         
     def open_csv(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open CSV File", "", "CSV Files (*.csv)")
-        if file_path:
-            try:
-                # Use CSVReader if available, otherwise fall back to pandas directly
-                if CSVReader:
-                    self.csv_data = CSVReader.read_csv(file_path, self)
-                    if self.csv_data is None:
-                        return
-                else:
-                    # Read the CSV file
-                    self.csv_data = pd.read_csv(file_path)
-                    
-                    # Check if there are at least 2 columns
-                    if len(self.csv_data.columns) < 2:
-                        QMessageBox.critical(self, "Error", "CSV must have at least 2 columns.")
-                        self.csv_data = None
-                        return
-                
-                # Enable add graph button and clear any existing graphs
-                self.add_graph_btn.setEnabled(True)
-                self.clear_graphs()
-                
-                # Add an initial graph
-                self.add_graph_view()
-                
-                # Update status
-                self.status_label.setText(f"Loaded: {os.path.basename(file_path)} with {len(self.csv_data)} rows and {len(self.csv_data.columns)} columns")
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to open CSV file: {str(e)}")
+        # Selecting several files overlays them on a common time axis
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Open CSV Files", "", CSV_FILE_FILTER)
+        if len(file_paths) == 1:
+            self.load_csv(file_paths[0])
+        elif file_paths:
+            self.load_csvs(file_paths)
+    
+    def stop_loading(self):
+        """Abandon a load in progress and stop following the current file"""
+        # Only one load at a time; a new file replaces one still streaming in.
+        # Not waited for: it stops at its next chunk and deletes itself
+        if self.loader is not None:
+            self.loader.detach()
+            self.loader.cancel()
+            self.loader = None
+        
+        # Following belongs to the file being replaced
+        self.follow_checkbox.setChecked(False)
+        self.follow_checkbox.setEnabled(False)
+    
+    def load_csv(self, file_path):
+        """Start loading a CSV file on a background thread"""
+        self.stop_loading()
+        
+        self.loading_file = file_path
+        self.preview_shown = False
+        self.compact_report = None
+        self.parse_report = None
+        
+        self.loader = CSVLoader(file_path, cache=self.csv_cache, lazy=self.lazy_checkbox.isChecked(),
+                                compact=self.compact_checkbox.isChecked(),
+                                engine=self.engine_combo.currentText(), parent=self)
+        self.loader.progress.connect(self.progress_bar.setValue)
+        self.loader.compacted.connect(self.on_load_compacted)
+        self.loader.parsed.connect(self.on_load_parsed)
+        self.loader.schema_ready.connect(self.on_schema_ready)
+        self.loader.preview_ready.connect(self.on_load_preview)
+        self.loader.finished.connect(self.on_load_finished)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.cancelled.connect(self.on_load_cancelled)
+        
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_load_btn.setVisible(True)
+        self.status_label.setText(f"Loading: {os.path.basename(file_path)}...")
+        
+        self.loader.start()
+    
+    def load_csvs(self, file_paths):
+        """Start loading several CSV files at once, to be aligned when they are all in"""
+        self.stop_loading()
+        
+        self.loading_files = file_paths
+        self.compact_report = None
+        self.loader = MultiCSVLoader(file_paths, self.csv_cache is not None, self.engine_combo.currentText(), self)
+        self.loader.progress.connect(self.progress_bar.setValue)
+        self.loader.finished.connect(self.on_csvs_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.cancelled.connect(self.on_load_cancelled)
+        
+        # Nothing is shown until every file is in, so there is no preview to fall back on
+        self.preview_shown = False
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_load_btn.setVisible(True)
+        self.status_label.setText(f"Loading {len(file_paths)} files...")
+        
+        self.loader.start()
+    
+    def on_csvs_loaded(self, frames, errors):
+        """Align the loaded files on their time columns and show the result"""
+        self.finish_load()
+        if errors:
+            QMessageBox.warning(self, "Warning", "\n".join(f"{os.path.basename(path)}: {message}"
+                                                           for path, message in errors.items()))
+        
+        file_paths = [path for path in self.loading_files if path in frames]
+        if not file_paths:
+            self.status_label.setText("Please open a CSV file to start.")
+            return
+        if len(file_paths) == 1:
+            self.loading_file = file_paths[0]
+            self.schema = SchemaProfiler.profile(frames[self.loading_file])
+            self.show_initial_graph(frames[self.loading_file])
+            self.finish_load()
+            self.stats_panel.set_file(self.data_file)
+            self.status_label.setText(f"Loaded: {os.path.basename(self.loading_file)} with "
+                                      f"{len(self.csv_data)} rows and {len(self.csv_data.columns)} columns")
+            return
+        
+        names = unique_stems(file_paths)
+        schemas = [SchemaProfiler.profile(frames[path]) for path in file_paths]
+        dialog = AlignDialog(list(zip(names, schemas)), self)
+        if not dialog.exec():
+            self.status_label.setText("Alignment cancelled.")
+            return
+        
+        try:
+            data = align_datasets([(name, frames[path], time_col) for name, path, time_col
+                                   in zip(names, file_paths, dialog.time_columns())], dialog.tolerance())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to align CSV files: {str(e)}")
+            return
+        
+        # The aligned data isn't backed by one file, so it can't be followed or summarised
+        self.loading_file = None
+        self.schema = SchemaProfiler.profile(data)
+        self.show_initial_graph(data)
+        self.follow_checkbox.setEnabled(False)
+        self.stats_panel.set_file(None)
+        self.status_label.setText(f"Aligned {len(file_paths)} files on {', '.join(dialog.time_columns())}: "
+                                  f"{len(data)} rows and {len(data.columns)} columns")
+    
+    def cancel_load(self):
+        if self.loader is not None:
+            self.loader.cancel()
+    
+    def on_schema_ready(self, schema):
+        self.schema = schema
+    
+    def on_load_preview(self, data):
+        """Show the first chunk while the rest of the file is still loading"""
+        self.show_initial_graph(data)
+        self.preview_shown = True
+        
+        self.status_label.setText(f"Loading: {os.path.basename(self.loading_file)} "
+                                  f"(previewing first {len(data)} rows)...")
+    
+    def on_load_compacted(self, report):
+        self.compact_report = report
+    
+    def on_load_parsed(self, report):
+        self.parse_report = report
+    
+    def on_load_finished(self, data):
+        self.finish_load()
+        
+        if self.preview_shown:
+            # Swap the full data into the graphs that were showing the preview
+            with span('swap_data', views=len(self.graph_views)):
+                self.csv_data = data
+                self.schema.set_data(data)
+                self.column_cache.reset(data, self.schema)
+                for graph_view in self.graph_views:
+                    graph_view.set_data(self.csv_data)
+                self.table_panel.set_data(self.csv_data, self.column_cache)
+        else:
+            # Cache hits arrive in one piece without a preview
+            self.show_initial_graph(data)
+        self.stats_panel.set_file(self.data_file)
+        
+        # Update status
+        if isinstance(self.csv_data, LazyCSVDataset):
+            detail = self.csv_data.summary()
+        else:
+            detail = self.csv_cache.stats.summary()
+        if self.parse_report is not None:
+            detail = f"{detail} - {parse_summary(self.parse_report)}"
+        if self.compact_report is not None:
+            detail = f"{detail} - {self.compact_summary(self.compact_report)}"
+        self.status_label.setText(f"Loaded: {os.path.basename(self.loading_file)} with {len(self.csv_data)} rows and {len(self.csv_data.columns)} columns"
+                                  f" - {detail}")
+    
+    @staticmethod
+    def compact_summary(report):
+        """Memory before and after compacting, and what it added to the load time"""
+        megabytes = 1024 ** 2
+        summary = (f"compact: {report['bytes_before'] / megabytes:.0f} MB -> "
+                   f"{report['bytes_after'] / megabytes:.0f} MB in {report['seconds']:.1f}s")
+        if report['load_seconds']:
+            summary += f" (+{report['seconds'] / report['load_seconds']:.0%} load time)"
+        if report['released']:
+            summary += f", {len(report['released'])} text columns released"
+        return summary
+    
+    def on_load_failed(self, message):
+        self.finish_load()
+        if self.preview_shown:
+            # The preview was of a file we can't fully read, don't leave it on screen
+            self.csv_data = None
+            self.schema = None
+            self.column_cache.reset(None)
+            self.add_graph_btn.setEnabled(False)
+            self.export_btn.setEnabled(False)
+            self.clear_graphs()
+            self.table_panel.set_data(None, self.column_cache)
+            self.stats_panel.set_file(None)
+        QMessageBox.critical(self, "Error", message)
+        self.status_label.setText("Please open a CSV file to start.")
+    
+    def on_load_cancelled(self):
+        self.finish_load()
+        if self.preview_shown:
+            self.status_label.setText(f"Loading cancelled: showing first {len(self.csv_data)} rows of "
+                                      f"{os.path.basename(self.loading_file)}")
+        else:
+            self.status_label.setText("Loading cancelled.")
+    
+    def show_initial_graph(self, data):
+        """Replace any existing graphs with a single graph of new data"""
+        self.csv_data = data
+        self.data_file = self.loading_file
+        self.column_cache.reset(data, self.schema)
+        self.table_panel.set_data(data, self.column_cache)
+        
+        # Enable add graph button and clear any existing graphs
+        self.add_graph_btn.setEnabled(True)
+        self.export_btn.setEnabled(self.exporter is None)
+        self.clear_graphs()
+        
+        # Add an initial graph
+        self.add_graph_view()
+    
+    def finish_load(self):
+        # Lazy datasets read columns straight from the file, and compacted columns
+        # may be too narrow for new rows, so neither can follow it; nor can a
+        # compressed file, which can only be read from the start
+        self.follow_checkbox.setEnabled(self.csv_data is not None
+                                        and not isinstance(self.csv_data, LazyCSVDataset)
+                                        and self.compact_report is None
+                                        and not is_compressed(self.loading_file or ''))
+        self.progress_bar.setVisible(False)
+        self.cancel_load_btn.setVisible(False)
+        self.loader = None
+    
+    def toggle_follow(self, checked):
+        """Start or stop appending rows written to the file after it was loaded"""
+        if not checked:
+            if self.follower is not None:
+                self.follower.stop()
+                self.follower.deleteLater()
+                self.follower = None
+            return
+        
+        if self.csv_data is None or self.data_file is None:
+            return
+        
+        try:
+            # Switch to column buffers that can grow without copying the frame
+            if not isinstance(self.csv_data, GrowingFrame):
+                self.csv_data = GrowingFrame(self.csv_data)
+                self.schema.set_data(self.csv_data)
+                self.column_cache.reset(self.csv_data, self.schema)
+                for graph_view in self.graph_views:
+                    graph_view.set_data(self.csv_data)
+                self.table_panel.set_data(self.csv_data, self.column_cache)
+            
+            offset = find_rows_end(self.data_file, len(self.csv_data))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to follow CSV file: {str(e)}")
+            self.follow_checkbox.setChecked(False)
+            return
+        
+        self.follower = CSVFollower(self.data_file, self.csv_data, offset,
+                                    self.refresh_rate_spin.value(), self)
+        self.follower.rows_appended.connect(self.on_rows_appended)
+        self.follower.truncated.connect(self.on_follow_truncated)
+        self.follower.failed.connect(self.on_follow_failed)
+        self.follower.start()
+        self.status_label.setText(f"Following: {os.path.basename(self.data_file)} with {len(self.csv_data)} rows")
+    
+    def set_follow_refresh_rate(self, hz):
+        if self.follower is not None:
+            self.follower.set_max_refresh_hz(hz)
+    
+    def on_rows_appended(self, rows):
+        # The column cache converts just the new rows on the next render
+        for graph_view in self.graph_views:
+            graph_view.request_update()
+        self.table_panel.rows_appended()
+        self.status_label.setText(f"Following: {os.path.basename(self.data_file)} with "
+                                  f"{len(self.csv_data)} rows (+{rows})")
+    
+    def on_follow_truncated(self):
+        self.follow_checkbox.setChecked(False)
+        self.status_label.setText(f"Stopped following: {os.path.basename(self.data_file)} "
+                                  f"shrank, reopen it to start over")
+    
+    def on_follow_failed(self, message):
+        self.follow_checkbox.setChecked(False)
+        QMessageBox.critical(self, "Error", message)
+    
+    def toggle_perf_panel(self, checked):
+        self.perf_panel.setVisible(checked)
+        self.perf_panel.record_checkbox.setChecked(checked)
+    
+    def highlight_rows(self, rows):
+        for graph_view in self.graph_views:
+            graph_view.set_highlighted_rows(rows)
     
     def add_graph_view(self):
         if self.csv_data is not None:
+            # Imported on first use to keep matplotlib out of startup
+            from graph_view import GraphView
+            
             # Create new graph view
-            graph_view = GraphView(self.csv_data)
+            graph_view = GraphView(self.csv_data, self.schema, self.column_cache)
+            graph_view.set_highlighted_rows(self.table_panel.selected_rows())
+            # Graphs can remove themselves, so stop updating them once they're gone
+            graph_view.destroyed.connect(lambda _=None, view=graph_view: self.forget_graph_view(view))
             
             # Add to custom scrollable container
             self.scroll_container.add_widget(graph_view)
             self.graph_views.append(graph_view)
     
+    def forget_graph_view(self, graph_view):
+        if graph_view in self.graph_views:
+            self.graph_views.remove(graph_view)
+    
+    def export_to_folder(self):
+        if not self.graph_views:
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Export All Graphs")
+        if not folder:
+            return
+        from graph_export import EXPORT_FORMATS
+        fmt, ok = QInputDialog.getItem(self, "Export All Graphs", "File format:", EXPORT_FORMATS, 0, False)
+        if ok:
+            self.export_graphs(folder, fmt, to_folder=True)
+    
+    def export_to_pdf(self):
+        if not self.graph_views:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export All Graphs", "", "PDF (*.pdf)")
+        if file_path:
+            if not file_path.lower().endswith('.pdf'):
+                file_path += '.pdf'
+            self.export_graphs(file_path, 'pdf', multipage=True)
+    
+    def export_graphs(self, output_path, fmt, multipage=False, to_folder=False):
+        """
+        Render every graph to files on a worker thread, from a snapshot of
+        each graph's settings and view, so the window stays responsive
+        """
+        if self.exporter is not None:
+            return
+        from graph_export import GraphExporter
+        
+        specs = [graph_view.export_spec() for graph_view in self.graph_views]
+        self.exporter = GraphExporter(specs, output_path, fmt, multipage, to_folder, parent=self)
+        self.exporter.progress.connect(self.on_export_progress)
+        self.exporter.finished.connect(self.on_export_finished)
+        self.export_btn.setEnabled(False)
+        self.on_export_progress(0, len(specs))
+        self.exporter.start()
+    
+    def on_export_progress(self, done, total):
+        self.export_btn.setText(f"Exporting {done}/{total}...")
+    
+    def on_export_finished(self, written, errors):
+        self.exporter = None
+        self.export_btn.setText('Export All Graphs')
+        self.export_btn.setEnabled(self.csv_data is not None)
+        if errors:
+            QMessageBox.critical(self, "Error", "Failed to export graphs:\n" + "\n".join(errors))
+        if written:
+            self.statusBar().showMessage(f"Exported {len(written)} file(s) to "
+                                         f"{os.path.dirname(written[0]) or '.'}", 10000)
+    
     def clear_graphs(self):
         # Use our custom clear method
         self.scroll_container.clear_widgets()
@@ -0,0 +1,418 @@
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLineEdit, QPushButton,
+                             QLabel, QTableView, QHeaderView, QAbstractItemView, QMessageBox)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+
+from column_cache import NUMERIC, EPOCH_SECONDS
+from sorted_index import get_sorted_index
+from schema_profiler import NUMERIC as NUMERIC_KIND, DATETIME as DATETIME_KIND
+from perf_trace import span
+
+
+# Cells are fetched and formatted this many rows of one column at a time
+BLOCK_ROWS = 128
+
+# Formatted blocks kept; the least recently shown are dropped first
+MAX_CACHED_BLOCKS = 512
+
+# Comparison filters on numeric and datetime columns, e.g. ">= 10", as the
+# range of values each keeps: (has a lower bound, has an upper bound, bounds included)
+COMPARISONS = {
+    '>=': (True, False, True),
+    '<=': (False, True, True),
+    '==': (True, True, True),
+    '>': (True, False, False),
+    '<': (False, True, False),
+    '=': (True, True, True),
+}
+COMPARISON_PATTERN = re.compile(r'^\s*(>=|<=|!=|==|>|<|=)\s*(.+?)\s*$')
+
+# Shown in the cells of a lazily loaded column until it has been parsed
+LOADING_TEXT = '\u2026'
+
+
+def format_values(values):
+    """Format a block of cell values as display strings, with missing values left blank"""
+    if values.dtype.kind == 'f':
+        return ['' if v != v else f"{v:.10g}" for v in values.tolist()]
+    return ['' if pd.isna(v) else str(v) for v in values.tolist()]
+
+
+class _ColumnLoadSignals(QObject):
+    """Carries a parsed lazy column from the thread pool back to the GUI thread"""
+
+    done = pyqtSignal(object, object, object)  # (dataset, column, exception or None)
+
+
+class _ColumnLoadTask(QRunnable):
+    """Parses one column of a LazyCSVDataset on a pool thread"""
+
+    def __init__(self, data, col, signals):
+        super().__init__()
+        self.data = data
+        self.col = col
+        self.signals = signals
+
+    def run(self):
+        threading.current_thread().name = "Table column loader"
+        try:
+            self.data[self.col]
+            error = None
+        except Exception as e:
+            error = e
+        try:
+            self.signals.done.emit(self.data, self.col, error)
+        except RuntimeError:
+            # The table was deleted while we were working
+            pass
+
+
+class DataTableModel(QAbstractTableModel):
+    """
+    Table model over a loaded dataset that formats only the rows on screen
+
+    Works with any dataset the graphs accept (DataFrame, LazyCSVDataset or
+    GrowingFrame), so nothing is copied into the view. Sorting and filtering
+    build a permutation of source row numbers with vectorised NumPy operations
+    instead of reordering the data. Columns of a LazyCSVDataset that haven't
+    been parsed yet are parsed on the thread pool, with placeholder cells
+    shown until they arrive.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_source = None
+        self.column_cache = None
+        self.columns = []
+        self.row_count = 0
+
+        # Source row of each displayed row, or None while showing every row in file order
+        self.order = None
+        self.filter_rows = None
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        self.blocks = OrderedDict()   # (column, block) -> formatted strings
+
+        # Lazy columns being parsed on the pool, and those that failed to parse
+        self.loading = set()
+        self.failed = set()
+        self.load_signals = _ColumnLoadSignals(self)
+        self.load_signals.done.connect(self.on_column_loaded)
+
+    def set_data(self, data, column_cache):
+        """Show a newly loaded dataset, clearing any sort and filter"""
+        self.beginResetModel()
+        self.data_source = data
+        self.column_cache = column_cache
+        self.columns = list(data.columns) if data is not None else []
+        self.row_count = len(data) if data is not None else 0
+        self.order = None
+        self.filter_rows = None
+        self.sort_column = -1
+        self.blocks.clear()
+        self.loading.clear()
+        self.failed.clear()
+        self.endResetModel()
+
+    def rows_appended(self):
+        """
+        Show rows added to the dataset in follow mode
+
+        While sorted or filtered the new rows are left out until the table is
+        sorted or filtered again, so the rows on screen don't jump around.
+        """
+        rows = len(self.data_source)
+        if self.order is not None or rows <= self.row_count:
+            return
+        # The old last block may have been formatted while it was partly filled
+        last_block = self.row_count // BLOCK_ROWS
+        for column in range(len(self.columns)):
+            self.blocks.pop((column, last_block), None)
+        self.beginInsertRows(QModelIndex(), self.row_count, rows - 1)
+        self.row_count = rows
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.order) if self.order is not None else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def source_rows(self, rows):
+        """Map displayed row numbers (an int array) to source row numbers"""
+        return self.order[rows] if self.order is not None else rows
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            block = index.row() // BLOCK_ROWS
+            key = (index.column(), block)
+            cells = self.blocks.get(key)
+            if cells is None:
+                col = self.columns[index.column()]
+                if not self.column_ready(col):
+                    return None if col in self.failed else LOADING_TEXT
+                cells = self.format_block(index.column(), block)
+                self.blocks[key] = cells
+                if len(self.blocks) > MAX_CACHED_BLOCKS:
+                    self.blocks.popitem(last=False)
+            else:
+                self.blocks.move_to_end(key)
+            return cells[index.row() - block * BLOCK_ROWS]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            # The sampled kind, since confirming it would parse the whole column
+            if (self.column_cache is not None
+                    and self.column_cache.schema.profile(self.columns[index.column()]).kind == NUMERIC_KIND):
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def column_ready(self, col):
+        """
+        Whether a column can be read without parsing it on the GUI thread
+
+        Starts parsing an unparsed lazy column on the thread pool.
+        """
+        is_loaded = getattr(self.data_source, 'is_loaded', None)
+        if is_loaded is None or is_loaded(col):
+            return True
+        if col not in self.loading and col not in self.failed:
+            self.loading.add(col)
+            QThreadPool.globalInstance().start(_ColumnLoadTask(self.data_source, col, self.load_signals))
+        return False
+
+    def on_column_loaded(self, data, col, error):
+        if data is not self.data_source:
+            # Loaded for a dataset that has since been replaced
+            return
+        self.loading.discard(col)
+        if error is not None:
+            print(f"Error loading column {col}: {str(error)}")
+            self.failed.add(col)
+            return
+        column = self.columns.index(col)
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, column), self.index(self.rowCount() - 1, column),
+                                  [Qt.ItemDataRole.DisplayRole])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section] if section < len(self.columns) else None
+        # Rows are labelled with their position in the file, like the DataFrame index
+        if self.order is not None:
+            return str(int(self.order[section]))
+        return str(section)
+
+    def format_block(self, column, block):
+        """Fetch one block of a column in display order and format it"""
+        start = block * BLOCK_ROWS
+        stop = min(start + BLOCK_ROWS, self.rowCount())
+        series = self.data_source[self.columns[column]]
+        if self.order is None:
+            values = series.iloc[start:stop]
+        else:
+            values = series.iloc[self.order[start:stop]]
+        return format_values(values.to_numpy())
+
+    def kind(self, col):
+        return self.column_cache.schema.kind(col) if self.column_cache is not None else None
+
+    def sort_keys(self, col):
+        """
+        Float sort keys for a column, NaN where the value is missing
+
+        Numeric and datetime columns reuse the graphs' converted arrays; other
+        columns are ranked by their sorted unique values.
+        """
+        kind = self.kind(col)
+        if kind == NUMERIC_KIND:
+            return self.column_cache.get(col, NUMERIC)
+        if kind == DATETIME_KIND:
+            return self.column_cache.get(col, EPOCH_SECONDS)
+        values = self.data_source[col]
+        try:
+            codes, _ = pd.factorize(values, sort=True)
+        except TypeError:
+            # Mixed types that can't be compared with each other sort as text
+            codes, _ = pd.factorize(values.astype(str), sort=True)
+        keys = codes.astype(np.float64)
+        keys[codes < 0] = np.nan
+        return keys
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort by a column; column -1 restores file order"""
+        self.sort_column = column
+        self.sort_order = order
+        self.reorder()
+
+    def set_filter(self, col, text):
+        """
+        Keep only the rows where a column matches the filter text
+
+        Numeric and datetime columns take a comparison such as "> 10" or
+        ">= 2024-01-01"; anything else is a case-insensitive substring match.
+        An empty text clears the filter.
+
+        Raises:
+            ValueError: If a comparison value can't be read for the column
+        """
+        if not text.strip():
+            self.filter_rows = None
+        else:
+            with span('table.filter', column=col):
+                self.filter_rows = self.matching_rows(col, text)
+        self.reorder()
+
+    def matching_rows(self, col, text):
+        """
+        Source rows where a column matches the filter text, in file order
+
+        Comparisons are answered from the column's sorted index by binary
+        search, so after the first filter on a column each one costs
+        O(log n + k) for k matching rows rather than a pass over the column.
+        """
+        kind = self.kind(col)
+        match = COMPARISON_PATTERN.match(text)
+        if match and kind in (NUMERIC_KIND, DATETIME_KIND):
+            if kind == NUMERIC_KIND:
+                conversion = NUMERIC
+                target = float(match.group(2))
+            else:
+                conversion = EPOCH_SECONDS
+                target = pd.Timestamp(match.group(2)).timestamp()
+            index = get_sorted_index(self.column_cache, (col, conversion),
+                                     self.column_cache.get(col, conversion))
+            if match.group(1) == '!=':
+                below = index.rows_between(None, target, include_hi=False)
+                above = index.rows_between(target, None, include_lo=False)
+                return np.sort(np.concatenate((below, above)))
+            has_lo, has_hi, inclusive = COMPARISONS[match.group(1)]
+            return index.rows_between(target if has_lo else None, target if has_hi else None,
+                                      inclusive, inclusive)
+        series = self.data_source[col]
+        matches = series.astype(str).str.contains(text.strip(), case=False, regex=False)
+        return np.flatnonzero(matches.to_numpy(dtype=bool))
+
+    def reorder(self):
+        """Rebuild the displayed row permutation from the current filter and sort"""
+        self.beginResetModel()
+        self.row_count = len(self.data_source) if self.data_source is not None else 0
+        rows = self.filter_rows
+        if self.data_source is not None and 0 <= self.sort_column < len(self.columns):
+            with span('table.sort', column=self.columns[self.sort_column], rows=self.row_count):
+                keys = self.sort_keys(self.columns[self.sort_column])[:self.row_count]
+                if rows is not None:
+                    keys = keys[rows]
+                if self.sort_order == Qt.SortOrder.DescendingOrder:
+                    # Negated rather than reversed, so ties keep file order and missing values stay last
+                    keys = -keys
+                permutation = np.argsort(keys, kind='stable')
+                rows = rows[permutation] if rows is not None else permutation
+        self.order = rows
+        self.blocks.clear()
+        self.endResetModel()
+
+
+class DataTablePanel(QWidget):
+    """The table tab: the loaded rows with a column filter"""
+
+    # Source row numbers of the selected rows, as an int64 array
+    rows_selected = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = DataTableModel(self)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Filter:"))
+        self.filter_column_combo = QComboBox()
+        controls.addWidget(self.filter_column_combo)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Text to find, or a comparison such as >= 10")
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        controls.addWidget(self.filter_edit)
+
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self.apply_filter)
+        controls.addWidget(apply_button)
+
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_filter)
+        controls.addWidget(clear_button)
+
+        self.count_label = QLabel()
+        controls.addWidget(self.count_label)
+        layout.addLayout(controls)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        # Fixed row heights let the view lay out millions of rows without measuring them
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        # A reset (sorting or filtering) clears the selection without signalling it
+        self.model.modelReset.connect(self.on_selection_changed)
+        self.model.modelReset.connect(self.update_count)
+        self.model.rowsInserted.connect(self.update_count)
+        layout.addWidget(self.table)
+
+    def set_data(self, data, column_cache):
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.model.set_data(data, column_cache)
+        self.filter_column_combo.clear()
+        if data is not None:
+            self.filter_column_combo.addItems([str(col) for col in data.columns])
+        self.filter_edit.clear()
+        self.rows_selected.emit(np.empty(0, dtype=np.int64))
+
+    def rows_appended(self):
+        self.model.rows_appended()
+
+    def apply_filter(self):
+        if self.model.data_source is None:
+            return
+        try:
+            self.model.set_filter(self.filter_column_combo.currentText(), self.filter_edit.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Invalid filter: {str(e)}")
+
+    def clear_filter(self):
+        self.filter_edit.clear()
+        self.apply_filter()
+
+    def update_count(self):
+        total = self.model.row_count
+        shown = self.model.rowCount()
+        self.count_label.setText(f"{shown} rows" if shown == total else f"{shown} of {total} rows")
+
+    def selected_rows(self):
+        """Source row numbers of the selection, built from its ranges rather than per-index"""
+        ranges = [np.arange(r.top(), r.bottom() + 1) for r in self.table.selectionModel().selection()]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(ranges))
+        return self.model.source_rows(rows)
+
+    def on_selection_changed(self, *_):
+        self.rows_selected.emit(self.selected_rows())
@@ -0,0 +1,151 @@
+import numpy as np
+
+
+# Decimation methods offered in the GraphView combo
+DECIMATION_METHODS = ['Min/Max', 'LTTB', 'Off']
+
+
+def is_sorted(x):
+    """Check whether an array is in non-decreasing order"""
+    return len(x) < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+
+def bucket_starts(x, n_buckets, x_sorted=None):
+    """
+    Split the points into buckets for decimation
+
+    When x is sorted the buckets are equal-width ranges of x, which maps them
+    onto screen pixels. Otherwise they are equal-count runs of rows, which
+    keeps the drawing order of the line intact.
+
+    Args:
+        x (numpy.ndarray): X values
+        n_buckets (int): Maximum number of buckets
+        x_sorted (bool): Whether x is sorted, checked if not given
+
+    Returns:
+        numpy.ndarray: Start index of each non-empty bucket
+    """
+    n = len(x)
+    if x_sorted is None:
+        x_sorted = is_sorted(x)
+
+    if x_sorted and n and x[-1] > x[0]:
+        edges = np.linspace(x[0], x[-1], n_buckets + 1)[:-1]
+        starts = np.searchsorted(x, edges, side='left')
+    else:
+        starts = np.linspace(0, n, n_buckets + 1)[:-1].astype(np.int64)
+
+    # Empty buckets share a start index with the next bucket
+    return np.unique(starts)
+
+
+def minmax_indices(x, y, n_buckets, x_sorted=None):
+    """
+    Pick the minimum and maximum y point from each bucket
+
+    This keeps every spike visible, so the decimated line looks the same as
+    the full line at the given pixel resolution.
+
+    Args:
+        x (numpy.ndarray): X values
+        y (numpy.ndarray): Y values, all finite
+        n_buckets (int): Number of buckets, usually the axes width in pixels
+        x_sorted (bool): Whether x is sorted, checked if not given
+
+    Returns:
+        numpy.ndarray: Sorted indices of the points to keep
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    starts = bucket_starts(x, n_buckets, x_sorted)
+    counts = np.diff(np.append(starts, n))
+    bucket_of = np.repeat(np.arange(len(starts)), counts)
+
+    # Index of the first min and first max in each bucket
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    min_hits = np.flatnonzero(y == mins[bucket_of])
+    max_hits = np.flatnonzero(y == maxs[bucket_of])
+    _, first_min = np.unique(bucket_of[min_hits], return_index=True)
+    _, first_max = np.unique(bucket_of[max_hits], return_index=True)
+
+    indices = np.concatenate(([0, n - 1], min_hits[first_min], max_hits[first_max]))
+    return np.unique(indices)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Picks from each bucket the point forming the largest triangle with the
+    previously selected point and the average of the next bucket, which
+    preserves the visual shape of the line with few points.
+
+    Args:
+        x (numpy.ndarray): X values
+        y (numpy.ndarray): Y values, all finite
+        n_out (int): Number of points to keep
+
+    Returns:
+        numpy.ndarray: Sorted indices of the points to keep
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept, the rest go into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Averages of every bucket, used as the third triangle vertex
+    starts = edges[:-1]
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / np.diff(edges)
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / np.diff(edges)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 1 < n_out - 2:
+            next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((x[prev] - next_x) * (y[lo:hi] - y[prev])
+                      - (x[prev] - x[lo:hi]) * (next_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        indices[i + 1] = prev
+
+    return indices
+
+
+def decimate(x, y, target_points, method='Min/Max', x_sorted=None):
+    """
+    Reduce a series to roughly target_points points
+
+    Args:
+        x (numpy.ndarray): X values
+        y (numpy.ndarray): Y values, all finite
+        target_points (int): Approximate number of points to keep
+        method (str): One of DECIMATION_METHODS
+        x_sorted (bool): Whether x is sorted, checked if not given
+
+    Returns:
+        tuple: (x, y) arrays of the points to draw
+    """
+    if method == 'Off' or len(y) <= target_points:
+        return x, y
+
+    if method == 'LTTB':
+        indices = lttb_indices(x, y, target_points)
+    else:
+        indices = minmax_indices(x, y, max(1, target_points // 2), x_sorted)
+    return x[indices], y[indices]
@@ -0,0 +1,194 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+
+from decimation import decimate
+from plot_pipeline import MARKER_LIMIT, SECONDARY_AXIS, SMALL_MULTIPLES
+from resampling import axis_label
+from perf_trace import span
+
+
+# Draws a prepared plot onto a figure for an output file, the way GraphView
+# shows it on screen. Backend-neutral: the batch renderer and the graph
+# export worker both use it with an Agg canvas.
+
+# Formats whose dense data artists are rasterized, so files stay small and
+# quick to write however many points a graph has
+VECTOR_FORMATS = ('pdf', 'svg')
+
+# Data artists with more points than this are rasterized in vector formats
+RASTERIZE_POINTS = 5000
+
+
+def layout_axes(figure, layout, count):
+    """
+    Create the axes of a graph with several Y columns
+
+    Returns:
+        tuple: (list of axes, list of the series indices each axes draws)
+    """
+    if layout == SMALL_MULTIPLES:
+        # One axes per column, stacked, all sharing the X-axis
+        axes = [figure.add_subplot(count, 1, 1)]
+        for i in range(1, count):
+            axes.append(figure.add_subplot(count, 1, i + 1, sharex=axes[0]))
+        return axes, [[i] for i in range(count)]
+    if layout == SECONDARY_AXIS:
+        # The first column on the left axis, the others on the right
+        axes = [figure.add_subplot(111)]
+        axes.append(axes[0].twinx())
+        return axes, [[0], list(range(1, count))]
+    return [figure.add_subplot(111)], [list(range(count))]
+
+
+def visible_points(x, y, x_sorted, lo, hi):
+    """The points of a series between lo and hi, with one either side when x is sorted"""
+    if lo is None:
+        return x, y
+    if x_sorted:
+        start = max(0, np.searchsorted(x, lo, side='left') - 1)
+        stop = min(len(x), np.searchsorted(x, hi, side='right') + 1)
+        return x[start:stop], y[start:stop]
+    visible = (x >= lo) & (x <= hi)
+    return x[visible], y[visible]
+
+
+def draw_prepared(figure, prepared, options):
+    """
+    Draw a prepared plot onto an empty figure
+
+    Args:
+        figure (matplotlib.figure.Figure): Figure with a canvas attached
+        prepared (dict): Result of plot_pipeline.prepare_plot()
+        options (dict): decimation, and optionally vector (rasterize dense
+            artists) and limits, (xmin, xmax, ymin, ymax) for each axes as
+            shown in the view being exported
+    """
+    with span('draw_prepared', style=prepared['style']):
+        if prepared['style'] == 'multi':
+            axes = draw_series(figure, prepared, options)
+        else:
+            axes = [draw_single(figure, prepared, options)]
+
+        for ax, limits in zip(axes, options.get('limits') or []):
+            ax.set_xlim(limits[:2])
+            ax.set_ylim(limits[2:])
+        if prepared['is_datetime']:
+            figure.autofmt_xdate()
+
+
+def dense(points, options):
+    """Whether an artist with this many points is rasterized"""
+    return options.get('vector', False) and points > RASTERIZE_POINTS
+
+
+def view_range(options, index=0):
+    """The X range the exported view shows, (None, None) for all of it"""
+    limits = options.get('limits')
+    return tuple(limits[index][:2]) if limits else (None, None)
+
+
+def draw_single(figure, prepared, options):
+    ax = figure.add_subplot(111)
+    if prepared['is_datetime']:
+        ax.xaxis_date()
+
+    style = prepared['style']
+    x_col = prepared['x_col']
+    y_col = prepared['y_col']
+    y_label = y_col
+    if style == 'categorical':
+        ax.plot(prepared['x_data'], prepared['y_data'], '-o', markersize=4)
+    else:
+        # About two points per output pixel, as on screen
+        target = max(200, 2 * int(ax.bbox.width))
+        method = options['decimation']
+        lo, hi = view_range(options)
+        full_x = prepared['full_x']
+        if prepared.get('resample'):
+            resampler = prepared['resampler']
+            size = prepared['bucket_ns']
+            if size is None:
+                span_lo, span_hi = (lo, hi) if lo is not None else prepared['bounds'][:2]
+                size = resampler.auto_size(span_lo, span_hi, max(1, target // 2))
+            x, y, band = resampler.points(prepared['resample'], size, lo, hi)
+            if band is not None:
+                ax.fill_between(x, *band, color='C0', alpha=0.3, linewidth=0, rasterized=dense(len(x), options))
+            ax.plot(x, y, '-', rasterized=dense(len(x), options))
+            y_label = axis_label(y_col, prepared['resample'])
+        else:
+            x, y = visible_points(full_x, prepared['full_y'], prepared['x_sorted'], lo, hi)
+            x, y = decimate(x, y, target, method, prepared['x_sorted'])
+            if style == 'line':
+                marker = 'o' if len(full_x) <= MARKER_LIMIT else 'None'
+                ax.plot(x, y, '-', marker=marker, markersize=4, rasterized=dense(len(x), options))
+            else:
+                ax.scatter(x, y, s=15, alpha=0.5, label='Original Data', rasterized=dense(len(x), options))
+                smooth_x, smooth_y = visible_points(prepared['smooth_x'], prepared['smooth_y'], True, lo, hi)
+                smooth_x, smooth_y = decimate(smooth_x, smooth_y, target, method, True)
+                ax.plot(smooth_x, smooth_y, '-', lw=2, label='Smoothed', rasterized=dense(len(smooth_x), options))
+                ax.legend()
+
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_xlabel(x_col)
+    ax.set_ylabel(y_label)
+    ax.set_title(f"{y_col} vs {x_col}")
+    return ax
+
+
+def draw_series(figure, prepared, options):
+    series = prepared['series']
+    layout = prepared['layout']
+    smooth = prepared['smooth']
+    y_cols = [s['y_col'] for s in series]
+    axes, groups = layout_axes(figure, layout, len(series))
+    target = max(200, 2 * int(axes[0].bbox.width))
+    method = options['decimation']
+    lo, hi = view_range(options)
+    all_bounds = [s['bounds'] for s in series if s['bounds'] is not None]
+
+    for ax, indices in zip(axes, groups):
+        colors = [f'C{i % 10}' for i in indices]
+        segments = []
+        smooth_segments = []
+        for i in indices:
+            s = series[i]
+            x, y = visible_points(s['full_x'], s['full_y'], s['x_sorted'], lo, hi)
+            segments.append(np.column_stack(decimate(x, y, target, method, s['x_sorted'])))
+            if smooth:
+                x, y = visible_points(s['smooth_x'], s['smooth_y'], True, lo, hi)
+                smooth_segments.append(np.column_stack(decimate(x, y, target, method, True)))
+        points = sum(len(segment) for segment in segments)
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=1, alpha=0.35 if smooth else 1.0,
+                                         rasterized=dense(points, options)))
+        if smooth:
+            ax.add_collection(LineCollection(smooth_segments, colors=colors, linewidths=2,
+                                             rasterized=dense(points, options)))
+        # Each axes autoscales to its own series, and to the X extent of all of them
+        group_bounds = [series[i]['bounds'] for i in indices if series[i]['bounds'] is not None]
+        if group_bounds:
+            ax.update_datalim([(min(b[0] for b in all_bounds), min(b[2] for b in group_bounds)),
+                               (max(b[1] for b in all_bounds), max(b[3] for b in group_bounds))])
+            ax.autoscale_view()
+
+        if prepared['is_datetime']:
+            ax.xaxis_date()
+        if ax is axes[0] or layout == SMALL_MULTIPLES:
+            ax.grid(True, linestyle='--', alpha=0.7)
+        if layout == SMALL_MULTIPLES:
+            ax.label_outer()
+
+    x_col = prepared['x_col']
+    axes[-1 if layout == SMALL_MULTIPLES else 0].set_xlabel(x_col)
+    if layout == SMALL_MULTIPLES:
+        for ax, y_col in zip(axes, y_cols):
+            ax.set_ylabel(y_col)
+    else:
+        if layout == SECONDARY_AXIS:
+            axes[0].set_ylabel(y_cols[0])
+            axes[1].set_ylabel(", ".join(y_cols[1:]))
+        else:
+            axes[0].set_ylabel(", ".join(y_cols))
+        axes[0].legend(handles=[Line2D([], [], color=f'C{i % 10}', label=col) for i, col in enumerate(y_cols)])
+    axes[0].set_title(f"{', '.join(y_cols)} vs {x_col}")
+    return axes
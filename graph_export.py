@@ -0,0 +1,163 @@
+import os
+import re
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import plot_pipeline
+from figure_render import VECTOR_FORMATS, draw_prepared
+from perf_trace import span
+
+
+EXPORT_FORMATS = ['png', 'jpg', 'pdf', 'svg']
+
+# Resolution of exported images, and of rasterized artists in PDF and SVG files
+EXPORT_DPI = 300
+
+
+def export_name(index, spec, fmt):
+    """File name of one graph in a folder export, numbered in the order the graphs are shown"""
+    y_cols = [spec['y_col']] + [col for col in spec.get('extra_y_cols', ()) if col != spec['y_col']]
+    name = f"{index + 1:02d}_{'_'.join(y_cols)}_vs_{spec['x_col']}"
+    return re.sub(r'[^\w.-]+', '_', name) + '.' + fmt
+
+
+def render_figure(spec, vector):
+    """
+    Prepare and draw one graph onto a new Agg figure
+
+    Safe off the GUI thread: the figure has no Qt canvas, and the data work
+    is the same thread-safe pipeline the graphs render with.
+
+    Args:
+        spec (dict): GraphView.export_spec() of the graph
+        vector (bool): Whether the output is PDF or SVG, so dense artists are rasterized
+
+    Returns:
+        matplotlib.figure.Figure: The drawn figure
+    """
+    prepared = plot_pipeline.prepare_plot(spec)
+    figure = Figure(figsize=spec['figsize'], dpi=EXPORT_DPI)
+    FigureCanvasAgg(figure)
+    draw_prepared(figure, prepared, {'decimation': spec['decimation'], 'limits': spec['limits'],
+                                     'vector': vector})
+    return figure
+
+
+class ExportWorker(QObject):
+    """Renders and writes graphs on a worker thread"""
+
+    progress = pyqtSignal(int, int)         # Graphs written, total
+    finished = pyqtSignal(object, object)   # Files written, error messages
+    cancelled = pyqtSignal()
+
+    def __init__(self, specs, output_path, fmt, multipage=False, to_folder=False):
+        """
+        Args:
+            specs (list): GraphView.export_spec() of each graph
+            output_path (str): Image file for one graph, folder when to_folder,
+                or PDF file when multipage
+            fmt (str): One of EXPORT_FORMATS
+            multipage (bool): Write every graph as a page of one PDF file
+            to_folder (bool): Write each graph to its own file in the output_path folder
+        """
+        super().__init__()
+        self.specs = specs
+        self.output_path = output_path
+        self.fmt = fmt
+        self.multipage = multipage
+        self.to_folder = to_folder
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def run(self):
+        threading.current_thread().name = "Graph export"
+        written = []
+        errors = []
+        vector = self.fmt in VECTOR_FORMATS
+        with span('export_graphs', graphs=len(self.specs), format=self.fmt):
+            pdf = None
+            try:
+                if self.multipage:
+                    from matplotlib.backends.backend_pdf import PdfPages
+                    pdf = PdfPages(self.output_path)
+                for index, spec in enumerate(self.specs):
+                    if self._cancel_requested:
+                        break
+                    try:
+                        with span('export_graph', x=spec['x_col'], y=spec['y_col']):
+                            figure = render_figure(spec, vector)
+                            if pdf is not None:
+                                pdf.savefig(figure, bbox_inches='tight')
+                            else:
+                                path = self.output_path
+                                if self.to_folder:
+                                    path = os.path.join(self.output_path, export_name(index, spec, self.fmt))
+                                figure.savefig(path, dpi=EXPORT_DPI, bbox_inches='tight')
+                                written.append(path)
+                    except Exception as e:
+                        errors.append(f"{spec['y_col']} vs {spec['x_col']}: {str(e)}")
+                    self.progress.emit(index + 1, len(self.specs))
+            except Exception as e:
+                errors.append(f"Failed to export graphs: {str(e)}")
+            finally:
+                if pdf is not None:
+                    try:
+                        pdf.close()
+                        written.append(self.output_path)
+                    except Exception as e:
+                        errors.append(f"Failed to write {self.output_path}: {str(e)}")
+
+        if self._cancel_requested:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(written, errors)
+
+
+class GraphExporter(QObject):
+    """Owns the worker thread for exporting graphs; used like CSVLoader"""
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object, object)
+    cancelled = pyqtSignal()
+
+    def __init__(self, specs, output_path, fmt, multipage=False, to_folder=False, parent=None):
+        super().__init__(parent)
+        self.output_path = output_path
+
+        self.thread = QThread(self)
+        self.worker = ExportWorker(specs, output_path, fmt, multipage, to_folder)
+        self.worker.moveToThread(self.thread)
+
+        self.worker.progress.connect(self.progress)
+        self.worker.finished.connect(self.finished)
+        self.worker.cancelled.connect(self.cancelled)
+
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.cancelled.connect(self.thread.quit)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.deleteLater)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.worker.cancel()
+
+    def detach(self):
+        for sig in (self.progress, self.finished, self.cancelled):
+            try:
+                sig.disconnect()
+            except TypeError:
+                pass
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def wait(self):
+        self.thread.wait()
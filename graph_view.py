@@ -1,11 +1,15 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
-                           QPushButton, QLabel, QFileDialog, QSizePolicy, QFrame, QCheckBox)
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
+                           QPushButton, QLabel, QFileDialog, QSizePolicy, QFrame, QCheckBox, QSpinBox,
+                           QToolButton, QMenu, QLineEdit, QMessageBox)
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QResizeEvent
 
 # Update matplotlib backend for PyQt6
 import matplotlib
 matplotlib.use('QtAgg')  # Using QtAgg backend for PyQt6
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
 
 # Import matplotlib Qt6 specific backends
 try:
@@ -16,30 +20,155 @@ except ImportError:
     from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
     from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
+import os
 import pandas as pd
 import numpy as np
 import re
-from scipy import signal, interpolate
+import plot_pipeline
+from decimation import DECIMATION_METHODS, decimate
+from render_scheduler import RenderScheduler
+from column_cache import ColumnConversionCache, NUMERIC
+from plot_pipeline import MARKER_LIMIT, MULTI_SERIES_LAYOUTS, SECONDARY_AXIS, SMALL_MULTIPLES
+from schema_profiler import DATETIME as DATETIME_KIND
+from sorted_index import get_sorted_index
+from figure_render import layout_axes
+from graph_export import EXPORT_FORMATS, GraphExporter
+from smoothing import SMOOTHING_METHODS, DEFAULT_WINDOW
+from resampling import RESAMPLE_METHODS, RESAMPLE_OFF, AUTO_BUCKET, BUCKET_SIZES, axis_label, bucket_name
+from perf_trace import span
 
-# Try to import CSVReader for additional functionality
-try:
-    from LandMarkCSVReader import CSVReader
-    has_csv_reader = True
-except ImportError:
-    has_csv_reader = False
+# A resize is applied once resizing pauses for this long, so dragging the
+# window edge redraws each graph once instead of at every step
+RESIZE_DEBOUNCE_MS = 120
+
+# Rows selected in the table beyond this many are highlighted as an evenly spaced sample
+MAX_HIGHLIGHTED_POINTS = 10000
+
+class GraphCanvas(FigureCanvas):
+    """
+    Canvas that redraws once a resize pauses, can drop its render buffer
+    while its graph is parked, and records each full redraw as a timing span
+    """
+    
+    def __init__(self, figure):
+        super().__init__(figure)
+        self.suspended = False
+        self.pending_resize = None
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_DEBOUNCE_MS)
+        self.resize_timer.timeout.connect(self.apply_resize)
+    
+    def resizeEvent(self, event):
+        if event.oldSize().isEmpty():
+            # First layout: size the figure now so the first draw is right
+            super().resizeEvent(event)
+            return
+        # Qt reuses the event object, so keep a copy
+        self.pending_resize = QResizeEvent(event.size(), event.oldSize())
+        self.resize_timer.start()
+    
+    def apply_resize(self):
+        """Resize the figure to the latest widget size and redraw"""
+        self.resize_timer.stop()
+        event, self.pending_resize = self.pending_resize, None
+        if event is not None:
+            super().resizeEvent(event)
+    
+    def suspend(self):
+        """Stop drawing and free the Agg render buffer until resume()"""
+        self.suspended = True
+        if hasattr(self, 'renderer'):
+            del self.renderer
+            self._lastKey = None
+    
+    def resume(self):
+        self.suspended = False
+        # Apply a resize that happened while hidden right away rather than debounced
+        self.apply_resize()
+    
+    def draw(self):
+        if self.suspended:
+            # An idle draw that was already queued when the graph was parked
+            return
+        with span('canvas.draw'):
+            super().draw()
 
 class GraphView(QFrame):  # Changed to QFrame for better styling
-    def __init__(self, data):
+    def __init__(self, data, schema=None, column_cache=None):
         super().__init__()
         self.data = data
         
+        # Column kinds and converted columns are computed once per load and
+        # shared between views; a standalone view gets its own
+        if column_cache is None:
+            column_cache = ColumnConversionCache(data, schema)
+        self.column_cache = column_cache
+        self.schema = column_cache.schema
+        
+        # Retained artists, rebuilt only when the plot type changes
+        self.ax = None
+        self.plot_kind = None
+        self.line = None
+        self.scatter = None
+        self.smooth_line = None
+        self.band = None
+        self.data_bounds = None
+        self.labels = None
+        self.background = None
+        
+        # Full-resolution series behind the decimated line, for re-decimation on zoom
+        self.full_x = None
+        self.full_y = None
+        self.x_sorted = True
+        self.index_key = None
+        self.smooth_x = None
+        self.smooth_y = None
+        
+        # Time-bucket aggregation of a datetime line plot: the TimeResampler,
+        # the method, and the bucket size in ns (None to pick it from the view)
+        self.resampler = None
+        self.resample_method = None
+        self.bucket_ns = None
+        
+        # Multi-series graphs: the prepared series, and per axes the
+        # (axes, raw collection, smoothed collection, series indices) drawing them
+        self.series = None
+        self.series_artists = []
+        
+        # Rows selected in the table, marked on every axes, and what each axes plots:
+        # (x column, x conversion, [(axes, y columns)])
+        self.highlighted_rows = None
+        self.highlight_columns = None
+        self.highlight_artists = {}
+        
+        # (from, to) texts of the X range the graph is limited to, or None for
+        # every row, and the (lo, hi) range the current plot was drawn with
+        self.x_range = None
+        self.applied_range = None
+        
+        # A parked view is scrolled out of sight: its canvas is replaced by a
+        # snapshot and renders wait until it is shown again
+        self.parked = False
+        self.stale = False
+        
+        # Writes the graph to a file in the background
+        self.exporter = None
+        
         # Set up the figure with a fixed size
-        self.figure = plt.figure(figsize=(10, 5))
-        self.canvas = FigureCanvas(self.figure)
+        # Not created through pyplot, which would keep every figure alive
+        # after its graph is removed
+        self.figure = Figure(figsize=(10, 5))
+        self.canvas = GraphCanvas(self.figure)
         
         # Ensure the canvas maintains its size
         self.canvas.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.canvas.setMinimumHeight(300)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        
+        # Coalesces control changes into one render per frame, with the data
+        # work done on a pool thread
+        self.scheduler = RenderScheduler(self.snapshot, self.prepare_plot, self.apply_plot, self)
         
         self.initUI()
         
@@ -60,44 +189,81 @@ class GraphView(QFrame):  # Changed to QFrame for better styling
         x_label = QLabel("X-axis:")
         self.x_combo = QComboBox()
         self.x_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.x_combo.addItems(self.data.columns)
-        self.x_combo.currentIndexChanged.connect(self.update_graph)
+        self.x_combo.addItems(self.schema.plottable_x_columns())
         
         # Y-axis dropdown
         y_label = QLabel("Y-axis:")
         self.y_combo = QComboBox()
         self.y_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.y_combo.addItems(self.data.columns)
+        y_columns = self.schema.plottable_y_columns()
+        self.y_combo.addItems(y_columns)
         
-        # Select second column by default for Y-axis if available
-        if len(self.data.columns) > 1:
+        # Select a different column than the X-axis by default if available
+        if len(y_columns) > 1 and y_columns[0] == self.x_combo.currentText():
             self.y_combo.setCurrentIndex(1)
-            
-        self.y_combo.currentIndexChanged.connect(self.update_graph)
+        
+        # Extra Y columns drawn on the same graph, and how they are laid out
+        self.extra_y_button = QToolButton()
+        self.extra_y_button.setText("More Y")
+        self.extra_y_button.setToolTip("Plot more Y columns against the same X-axis")
+        self.extra_y_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        self.extra_y_menu = QMenu(self.extra_y_button)
+        for col in y_columns:
+            action = self.extra_y_menu.addAction(col)
+            action.setCheckable(True)
+        self.extra_y_button.setMenu(self.extra_y_menu)
+        
+        self.layout_combo = QComboBox()
+        self.layout_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.layout_combo.addItems(MULTI_SERIES_LAYOUTS)
+        self.layout_combo.setEnabled(False)
         
         # Add checkbox for treating time as numeric
         self.treat_as_numeric_checkbox = QCheckBox("Treat as Numeric")
         self.treat_as_numeric_checkbox.setChecked(True)  # Default to treating as numeric
-        self.treat_as_numeric_checkbox.stateChanged.connect(self.update_graph)
         
         # Add checkbox for smoothing the curve
         self.smooth_curve_checkbox = QCheckBox("Smooth Curve")
         self.smooth_curve_checkbox.setChecked(False)  # Disabled by default
-        self.smooth_curve_checkbox.stateChanged.connect(self.update_graph)
+        
+        # Smoothing method and its window, only used while smoothing is on
+        self.smooth_method_combo = QComboBox()
+        self.smooth_method_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.smooth_method_combo.addItems(SMOOTHING_METHODS)
+        self.smooth_method_combo.setEnabled(False)
+        
+        self.smooth_window_spin = QSpinBox()
+        self.smooth_window_spin.setRange(3, 100001)
+        self.smooth_window_spin.setValue(DEFAULT_WINDOW)
+        self.smooth_window_spin.setPrefix("Window: ")
+        self.smooth_window_spin.setToolTip("Smoothing window in points (span for EMA, knot spacing for Spline)")
+        self.smooth_window_spin.setEnabled(False)
+        
+        # Decimation method for large series
+        decimation_label = QLabel("Decimation:")
+        self.decimation_combo = QComboBox()
+        self.decimation_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.decimation_combo.addItems(DECIMATION_METHODS)
         
         # Add controls to layout
         control_layout.addWidget(x_label)
         control_layout.addWidget(self.x_combo)
         control_layout.addWidget(y_label)
         control_layout.addWidget(self.y_combo)
+        control_layout.addWidget(self.extra_y_button)
+        control_layout.addWidget(self.layout_combo)
         control_layout.addWidget(self.treat_as_numeric_checkbox)
         control_layout.addWidget(self.smooth_curve_checkbox)
+        control_layout.addWidget(self.smooth_method_combo)
+        control_layout.addWidget(self.smooth_window_spin)
+        control_layout.addWidget(decimation_label)
+        control_layout.addWidget(self.decimation_combo)
         
         # Save button
-        save_button = QPushButton("Save Graph")
-        save_button.setMaximumWidth(120)
-        save_button.clicked.connect(self.save_graph)
-        control_layout.addWidget(save_button)
+        self.save_button = QPushButton("Save Graph")
+        self.save_button.setMaximumWidth(120)
+        self.save_button.clicked.connect(self.save_graph)
+        control_layout.addWidget(self.save_button)
         
         # Remove button
         remove_button = QPushButton("Remove")
@@ -108,18 +274,143 @@ class GraphView(QFrame):  # Changed to QFrame for better styling
         # Add stretch to push controls to the left
         control_layout.addStretch()
         
+        # Limit the graph to a range of X values, e.g. a time window
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("X range:"))
+        self.range_from_edit = QLineEdit()
+        self.range_from_edit.setPlaceholderText("From (number or date)")
+        self.range_from_edit.setMaximumWidth(180)
+        self.range_from_edit.returnPressed.connect(self.apply_range)
+        range_layout.addWidget(self.range_from_edit)
+        range_layout.addWidget(QLabel("to"))
+        self.range_to_edit = QLineEdit()
+        self.range_to_edit.setPlaceholderText("To (number or date)")
+        self.range_to_edit.setMaximumWidth(180)
+        self.range_to_edit.returnPressed.connect(self.apply_range)
+        range_layout.addWidget(self.range_to_edit)
+        
+        range_button = QPushButton("Apply Range")
+        range_button.clicked.connect(self.apply_range)
+        range_layout.addWidget(range_button)
+        clear_range_button = QPushButton("Clear Range")
+        clear_range_button.clicked.connect(self.clear_range)
+        range_layout.addWidget(clear_range_button)
+        
+        # Aggregate datetime series into time buckets
+        resample_label = QLabel("Resample:")
+        self.resample_combo = QComboBox()
+        self.resample_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.resample_combo.addItems(RESAMPLE_METHODS)
+        self.resample_combo.setToolTip("Aggregate a date X-axis into time buckets (single Y column, no smoothing)")
+        self.bucket_combo = QComboBox()
+        self.bucket_combo.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.bucket_combo.addItems([AUTO_BUCKET] + [name for name, _ in BUCKET_SIZES])
+        self.bucket_combo.setToolTip("Bucket size; Auto picks one from the visible time span")
+        self.bucket_combo.setEnabled(False)
+        self.bucket_label = QLabel()
+        range_layout.addWidget(resample_label)
+        range_layout.addWidget(self.resample_combo)
+        range_layout.addWidget(self.bucket_combo)
+        range_layout.addWidget(self.bucket_label)
+        range_layout.addStretch()
+        
         # Add navigation toolbar
         self.toolbar = NavigationToolbar(self.canvas, self)
         self.toolbar.setMaximumHeight(35)
         
         # Add widgets to main layout
         main_layout.addLayout(control_layout)
+        main_layout.addLayout(range_layout)
         main_layout.addWidget(self.toolbar)
         main_layout.addWidget(self.canvas)
         
+        # Stands in for the canvas while the view is parked
+        self.placeholder = QLabel()
+        self.placeholder.setScaledContents(True)
+        self.placeholder.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.placeholder.setVisible(False)
+        main_layout.addWidget(self.placeholder)
+        
+        # Connect signals only once every control has its default, so setting
+        # up the widgets doesn't trigger renders of half-initialised state
+        self.x_combo.currentIndexChanged.connect(self.clear_range)
+        self.x_combo.currentIndexChanged.connect(self.request_update)
+        self.y_combo.currentIndexChanged.connect(self.request_update)
+        self.extra_y_menu.triggered.connect(self.on_extra_y_changed)
+        self.layout_combo.currentIndexChanged.connect(self.request_update)
+        self.treat_as_numeric_checkbox.stateChanged.connect(self.request_update)
+        self.smooth_curve_checkbox.stateChanged.connect(self.request_update)
+        self.smooth_curve_checkbox.toggled.connect(self.smooth_method_combo.setEnabled)
+        self.smooth_curve_checkbox.toggled.connect(self.smooth_window_spin.setEnabled)
+        self.smooth_method_combo.currentIndexChanged.connect(self.request_update)
+        self.smooth_window_spin.valueChanged.connect(self.request_update)
+        self.decimation_combo.currentIndexChanged.connect(self.on_decimation_changed)
+        self.resample_combo.currentIndexChanged.connect(self.update_resample_controls)
+        self.resample_combo.currentIndexChanged.connect(self.request_update)
+        self.bucket_combo.currentIndexChanged.connect(self.request_update)
+        self.x_combo.currentIndexChanged.connect(self.update_resample_controls)
+        self.smooth_curve_checkbox.toggled.connect(self.update_resample_controls)
+        self.extra_y_menu.triggered.connect(self.update_resample_controls)
+        self.update_resample_controls()
+        
         # Generate initial graph
-        self.update_graph()
+        self.request_update()
+
+    def set_data(self, data):
+        """Replace the plotted data, keeping the current column selections"""
+        self.data = data
+        if self.schema.data is not data:
+            self.schema.set_data(data)
+        if self.column_cache.data is not data:
+            self.column_cache.reset(data, self.schema)
+        self.request_update()
 
+    def extra_y_columns(self):
+        """Checked extra Y columns, leaving out the one already on the Y-axis"""
+        y_col = self.y_combo.currentText()
+        return [action.text() for action in self.extra_y_menu.actions()
+                if action.isChecked() and action.text() != y_col]
+    
+    def update_resample_controls(self):
+        """Resampling applies to a single, unsmoothed Y column against a date X-axis"""
+        # The sampled schema is enough to offer the controls; the full column
+        # is confirmed when the plot is prepared, off the GUI thread
+        enabled = (self.schema.profile(self.x_combo.currentText()).kind == DATETIME_KIND
+                   and not self.smooth_curve_checkbox.isChecked() and not self.extra_y_columns())
+        self.resample_combo.setEnabled(enabled)
+        self.bucket_combo.setEnabled(enabled and self.resample_combo.currentText() != RESAMPLE_OFF)
+    
+    def on_extra_y_changed(self):
+        self.layout_combo.setEnabled(bool(self.extra_y_columns()))
+        self.request_update()
+    
+    def apply_range(self):
+        """Limit the graph to the X range typed in the range fields"""
+        texts = (self.range_from_edit.text().strip(), self.range_to_edit.text().strip())
+        if not any(texts):
+            self.clear_range()
+            return
+        x_conversion, _ = plot_pipeline.x_conversion_for(self.column_cache, self.x_combo.currentText(),
+                                                         self.treat_as_numeric_checkbox.isChecked())
+        try:
+            if x_conversion is None:
+                raise ValueError("the X-axis must be numeric or dates")
+            plot_pipeline.parse_range(texts, x_conversion)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Invalid range: {str(e)}")
+            return
+        if texts != self.x_range:
+            self.x_range = texts
+            self.request_update()
+    
+    def clear_range(self):
+        """Show every row again"""
+        self.range_from_edit.clear()
+        self.range_to_edit.clear()
+        if self.x_range is not None:
+            self.x_range = None
+            self.request_update()
+    
     def sizeHint(self):
         # Provide a reasonable default size
         return QSize(900, 400)
@@ -128,151 +419,588 @@ class GraphView(QFrame):  # Changed to QFrame for better styling
         # Provide a minimum size to prevent shrinking too much
         return QSize(800, 350)
     
-    def is_likely_time_column(self, col_name):
-        """Check if a column is likely to be a time column based on name"""
-        time_patterns = ['time', 'timestamp', 'date', 'hour', 'minute', 'second']
-        return any(pattern in col_name.lower() for pattern in time_patterns)
+    def smooth_data(self, x_data, y_data, method='savgol', window=DEFAULT_WINDOW):
+        """Smooth data with one of the smoothing methods, see plot_pipeline.smooth_data"""
+        return plot_pipeline.smooth_data(x_data, y_data, method, window)
         
-    def smooth_data(self, x_data, y_data, method='savgol'):
-        """Smooth data using either Savitzky-Golay filter or cubic spline interpolation"""
-        # Make sure we're working with numeric data
-        x_data_numeric = pd.to_numeric(x_data, errors='coerce').dropna().to_numpy()
-        y_data_numeric = pd.to_numeric(y_data, errors='coerce').dropna().to_numpy()
+    def target_points(self, ax):
+        """Number of points worth drawing: about two per horizontal pixel"""
+        return max(200, 2 * int(ax.bbox.width))
+    
+    def build_axes(self, plot_kind):
+        """
+        Create the axes and the artists for a type of plot
         
-        # Make sure we have enough data points for smoothing
-        if len(x_data_numeric) < 5 or len(y_data_numeric) < 5:
-            return x_data, y_data  # Return original data if not enough points
+        This is the only place the figure is cleared. Every other update reuses
+        the artists, so it only runs when the plot type changes.
         
-        # Get only finite values
-        valid_indices = np.isfinite(x_data_numeric) & np.isfinite(y_data_numeric)
-        x_valid = x_data_numeric[valid_indices]
-        y_valid = y_data_numeric[valid_indices]
+        Args:
+            plot_kind (tuple): ('line' | 'smooth' | 'categorical', is_datetime), or
+                ('multi', is_datetime, layout, y columns, smooth)
+        """
+        self.figure.clear()
+        self.plot_kind = plot_kind
+        self.line = None
+        self.scatter = None
+        self.smooth_line = None
+        self.band = None
+        self.series_artists = []
+        self.highlight_columns = None
+        self.highlight_artists = {}
+        self.data_bounds = None
+        self.labels = None
+        self.background = None
         
-        # Sort by x values (important for interpolation)
-        sort_indices = np.argsort(x_valid)
-        x_sorted = x_valid[sort_indices]
-        y_sorted = y_valid[sort_indices]
+        style, is_datetime = plot_kind[:2]
+        if style == 'multi':
+            self.build_series_axes(*plot_kind[1:])
+            return
+        self.ax = self.figure.add_subplot(111)
         
-        try:
-            if method == 'savgol':
-                # Savitzky-Golay filter (good for noisy data)
-                # Window size must be odd and less than data length
-                window_length = min(11, len(y_sorted) - (len(y_sorted) % 2) - 1)
-                if window_length > 2:  # Need at least window_length > polyorder
-                    y_smooth = signal.savgol_filter(y_sorted, window_length, 3)
-                    return x_sorted, y_smooth
-            else:
-                # Cubic spline interpolation (smooth curve through points)
-                # Create more points for a smoother curve
-                x_new = np.linspace(min(x_sorted), max(x_sorted), num=min(1000, len(x_sorted)*5))
-                # Create the interpolation function
-                spline = interpolate.interp1d(x_sorted, y_sorted, kind='cubic', bounds_error=False)
-                # Apply the interpolation function to the new x points
-                y_new = spline(x_new)
-                return x_new, y_new
-        except Exception as e:
-            print(f"Error smoothing data: {e}")
-            
-        # Return original data if smoothing fails
-        return x_data, y_data
+        # Data artists are animated: a full draw leaves them out of the cached
+        # background, so data-only updates can be blitted on top of it
+        if style == 'line':
+            self.line, = self.ax.plot([], [], '-', markersize=4, animated=True)
+            # Min/max range of each time bucket while resampling, empty otherwise
+            self.band = PolyCollection([], facecolors='C0', edgecolors='none', alpha=0.3, animated=True)
+            self.ax.add_collection(self.band, autolim=False)
+        elif style == 'smooth':
+            self.scatter = self.ax.scatter([], [], s=15, alpha=0.5, label='Original Data', animated=True)
+            self.smooth_line, = self.ax.plot([], [], '-', lw=2, label='Smoothed', animated=True)
+            self.ax.legend()
         
-    def update_graph(self):
-        # Clear the figure
-        self.figure.clear()
+        if is_datetime:
+            self.ax.xaxis_date()
         
-        try:
-            # Get selected columns
-            x_col = self.x_combo.currentText()
-            y_col = self.y_combo.currentText()
-            
-            # Create plot
-            ax = self.figure.add_subplot(111)
-            
-            # Get data for plotting
-            x_data = self.data[x_col]
-            y_data = self.data[y_col]
-            
-            # Check if we should try to parse as datetime
-            parse_as_datetime = False
+        # Add grid
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        
+        # Zooming or panning re-decimates just the visible range
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+    
+    def build_series_axes(self, is_datetime, layout, y_cols, smooth):
+        """
+        Create the axes for several Y columns, with one LineCollection per axes
+        
+        Each axes draws all of its series as a single artist (and their smoothed
+        curves as a second one), so blitting costs the same few draw calls
+        however many columns are plotted.
+        """
+        axes, groups = layout_axes(self.figure, layout, len(y_cols))
+        self.ax = axes[0]
+        
+        for ax, indices in zip(axes, groups):
+            colors = [f'C{i % 10}' for i in indices]
+            raw = LineCollection([], colors=colors, linewidths=1, alpha=0.35 if smooth else 1.0,
+                                 animated=True)
+            ax.add_collection(raw, autolim=False)
+            smooth_collection = None
+            if smooth:
+                smooth_collection = LineCollection([], colors=colors, linewidths=2, animated=True)
+                ax.add_collection(smooth_collection, autolim=False)
+            self.series_artists.append((ax, raw, smooth_collection, indices))
             
-            # Only parse as datetime if the checkbox is unchecked and column name suggests time/date
-            if not self.treat_as_numeric_checkbox.isChecked():
-                if has_csv_reader and x_col in CSVReader.detect_datetime_columns(self.data):
-                    parse_as_datetime = True
-                else:
-                    # Try to detect if this is a datetime column
-                    try:
-                        if self.is_likely_time_column(x_col):
-                            test_parse = pd.to_datetime(self.data[x_col])
-                            parse_as_datetime = True
-                    except:
-                        parse_as_datetime = False
+            if is_datetime:
+                ax.xaxis_date()
+            if ax is self.ax or layout == SMALL_MULTIPLES:
+                ax.grid(True, linestyle='--', alpha=0.7)
+            if layout == SMALL_MULTIPLES:
+                ax.label_outer()
+        
+        if layout != SMALL_MULTIPLES:
+            # Collections have no per-series labels, so the legend uses stand-in lines
+            handles = [Line2D([], [], color=f'C{i % 10}', label=col) for i, col in enumerate(y_cols)]
+            self.ax.legend(handles=handles)
+        
+        # Shared X-axes change together, so one callback re-decimates every series
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+    
+    def data_artists(self):
+        artists = [a for a in (self.band, self.line, self.scatter, self.smooth_line) if a is not None]
+        for _, raw, smooth_collection, _ in self.series_artists:
+            artists.append(raw)
+            if smooth_collection is not None:
+                artists.append(smooth_collection)
+        artists.extend(self.highlight_artists.values())
+        return artists
+    
+    def has_series(self):
+        """Whether full-resolution data is loaded for re-decimation"""
+        return (self.full_x is not None or self.series is not None) and bool(self.data_artists())
+    
+    def on_draw(self, event):
+        """After a full draw, cache the background and draw the data on top of it"""
+        if self.ax is None or event.canvas is not self.canvas or self.canvas.is_saving():
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.data_artists():
+            self.ax.draw_artist(artist)
+    
+    def blit(self):
+        """Redraw only the data artists over the cached background"""
+        with span('blit'):
+            self.canvas.restore_region(self.background)
+            for artist in self.data_artists():
+                self.ax.draw_artist(artist)
+            self.canvas.blit(self.figure.bbox)
+    
+    def on_xlim_changed(self, ax):
+        """Recompute the decimated line for the new visible x-range"""
+        if not self.has_series():
+            return
+        self.update_decimated(*ax.get_xlim())
+    
+    def visible_decimated(self, x, y, x_sorted, lo=None, hi=None, index_key=None):
+        """
+        Decimate the part of a series between lo and hi
+        
+        The visible points are found by binary search: on x itself when it is
+        sorted, else on the series' sorted index (built on the first zoom and
+        cached) when it has one.
+        """
+        target = self.target_points(self.ax)
+        
+        if lo is not None and len(x) > target:
+            if x_sorted:
+                # Keep one point either side so the line runs off the edges of the axes
+                start = max(0, np.searchsorted(x, lo, side='left') - 1)
+                stop = min(len(x), np.searchsorted(x, hi, side='right') + 1)
+                x, y = x[start:stop], y[start:stop]
+            elif index_key is not None:
+                rows = get_sorted_index(self.column_cache, index_key, x).rows_between(lo, hi)
+                x, y = x[rows], y[rows]
+            else:
+                visible = (x >= lo) & (x <= hi)
+                x, y = x[visible], y[visible]
+        
+        return decimate(x, y, target, self.decimation_combo.currentText(), x_sorted)
+    
+    def on_decimation_changed(self):
+        """Switching decimation method only needs the existing arrays re-decimated"""
+        if not self.has_series():
+            self.request_update()
+            return
+        self.update_decimated(*self.ax.get_xlim())
+        if self.background is None:
+            self.canvas.draw_idle()
+        else:
+            self.blit()
+    
+    def update_decimated(self, lo=None, hi=None):
+        """Point the data artists at the decimated points between lo and hi"""
+        with span('decimate'):
+            if self.series_artists:
+                self.update_decimated_series(lo, hi)
+                return
+            if self.resampler is not None:
+                self.update_resampled(lo, hi)
+                return
+            x, y = self.visible_decimated(self.full_x, self.full_y, self.x_sorted, lo, hi, self.index_key)
+            if self.band is not None:
+                self.band.set_verts([])
+            if self.line is not None:
+                self.line.set_data(x, y)
+            if self.scatter is not None:
+                self.scatter.set_offsets(np.column_stack((x, y)))
+            if self.smooth_line is not None:
+                # The smoothed curve comes back sorted by x
+                self.smooth_line.set_data(*self.visible_decimated(self.smooth_x, self.smooth_y, True, lo, hi))
+    
+    def update_resampled(self, lo=None, hi=None):
+        """Point the line, and the band if shown, at the time buckets between lo and hi"""
+        if self.bucket_ns is not None:
+            size = self.bucket_ns
+        else:
+            # Sized so there is about one bucket per pixel of the visible span
+            span_lo, span_hi = (lo, hi) if lo is not None else self.data_bounds[:2]
+            size = self.resampler.auto_size(span_lo, span_hi, max(1, self.target_points(self.ax) // 2))
+            self.bucket_label.setText(f"({bucket_name(size)})")
+        with span('resample', method=self.resample_method, bucket=bucket_name(size)):
+            x, y, band = self.resampler.points(self.resample_method, size, lo, hi)
+        self.line.set_data(x, y)
+        if band is None or not len(x):
+            self.band.set_verts([])
+        else:
+            low, high = band
+            self.band.set_verts([np.column_stack((np.r_[x, x[::-1]], np.r_[low, high[::-1]]))])
+    
+    def update_decimated_series(self, lo=None, hi=None):
+        """Set the segments of every series collection to its decimated points"""
+        for _, raw, smooth_collection, indices in self.series_artists:
+            series = [self.series[i] for i in indices]
+            raw.set_segments([np.column_stack(self.visible_decimated(s['full_x'], s['full_y'], s['x_sorted'],
+                                                                     lo, hi, s['index_key']))
+                              for s in series])
+            if smooth_collection is not None:
+                smooth_collection.set_segments([np.column_stack(self.visible_decimated(s['smooth_x'], s['smooth_y'], True, lo, hi))
+                                                for s in series])
+    
+    def snapshot(self):
+        """Capture the widget state a render depends on; runs on the GUI thread"""
+        return {
+            'data': self.data,
+            'column_cache': self.column_cache,
+            'x_col': self.x_combo.currentText(),
+            'y_col': self.y_combo.currentText(),
+            'treat_as_numeric': self.treat_as_numeric_checkbox.isChecked(),
+            'smooth': self.smooth_curve_checkbox.isChecked(),
+            'smooth_method': self.smooth_method_combo.currentText(),
+            'smooth_window': self.smooth_window_spin.value(),
+            'extra_y_cols': self.extra_y_columns(),
+            'layout': self.layout_combo.currentText(),
+            'x_range': self.x_range,
+            'resample': self.resample_combo.currentText() if self.resample_combo.isEnabled() else RESAMPLE_OFF,
+            'bucket': self.bucket_combo.currentText(),
+            'target_buckets': self.target_points(self.ax) // 2 if self.ax is not None else None,
+        }
+    
+    def prepare_plot(self, spec):
+        """
+        Convert, clean and smooth the data for a render
+        
+        Doesn't touch any widget or artist, so the render scheduler can run it
+        off the GUI thread. The batch renderer uses the same function.
+        
+        Args:
+            spec (dict): Widget state from snapshot()
             
-            # Parse as datetime if needed
-            is_datetime = False
-            if parse_as_datetime:
-                try:
-                    x_data = pd.to_datetime(self.data[x_col])
-                    is_datetime = True
-                except:
-                    pass
+        Returns:
+            dict: Arrays and flags for apply_plot()
+        """
+        return plot_pipeline.prepare_plot(spec)
+    
+    def apply_plot(self, prepared):
+        """Push prepared data into the retained artists and redraw; GUI thread only"""
+        with span('apply_plot', x=prepared['x_col'], y=prepared['y_col']):
+            is_datetime = prepared['is_datetime']
+            if prepared['style'] == 'multi':
+                y_cols = tuple(series['y_col'] for series in prepared['series'])
+                plot_kind = ('multi', is_datetime, prepared['layout'], y_cols, prepared['smooth'])
+            else:
+                plot_kind = (prepared['style'], is_datetime)
+            rebuilt = plot_kind != self.plot_kind or plot_kind[0] == 'categorical'
+            if rebuilt:
+                with span('build_axes'):
+                    self.build_axes(plot_kind)
+        
+            if prepared['style'] in ('multi', 'categorical'):
+                self.resampler = None
+                self.resample_method = None
+                self.bucket_label.setText("")
             
-            # Apply smoothing if checkbox is checked
-            if self.smooth_curve_checkbox.isChecked():
-                try:
-                    # For datetime, convert to numeric timestamps first
-                    if is_datetime:
-                        x_numeric = x_data.astype(np.int64) // 10**9  # Convert to Unix timestamp
-                        x_smooth, y_smooth = self.smooth_data(x_numeric, y_data)
-                        # Plot original data as points
-                        ax.scatter(x_data, y_data, s=15, alpha=0.5, label='Original Data')
-                        # Plot smoothed data as line
-                        if isinstance(x_smooth[0], (int, float)):
-                            # Convert back to datetime for plotting
-                            x_smooth_dt = pd.to_datetime(x_smooth, unit='s')
-                            ax.plot(x_smooth_dt, y_smooth, '-', lw=2, label='Smoothed')
-                        else:
-                            ax.plot(x_data, y_smooth, '-', lw=2, label='Smoothed')
-                        ax.legend()
-                    else:
-                        # For regular numeric data
-                        x_smooth, y_smooth = self.smooth_data(x_data, y_data)
-                        # Plot original data as points
-                        ax.scatter(x_data, y_data, s=15, alpha=0.5, label='Original Data')
-                        # Plot smoothed data as line
-                        ax.plot(x_smooth, y_smooth, '-', lw=2, label='Smoothed')
-                        ax.legend()
-                except Exception as e:
-                    print(f"Error applying smoothing: {e}")
-                    # Fall back to regular plotting if smoothing fails
-                    ax.plot(x_data, y_data, '-o', markersize=4)
+            if prepared['style'] == 'multi':
+                self.full_x = None
+                self.full_y = None
+                self.series = prepared['series']
+                self.highlight_columns = (prepared['x_col'], prepared['x_conversion'],
+                                          [(ax, [self.series[i]['y_col'] for i in indices])
+                                           for ax, _, _, indices in self.series_artists])
+                # The columns are part of the plot kind, so an unchanged kind is the same series
+                same_series = not rebuilt and prepared['x_range'] == self.applied_range
+                keep_view = same_series and not self.ax.get_autoscalex_on()
+                limits_changed = self.update_series_limits(keep_view)
+                labels_changed = self.set_series_labels(prepared['x_col'], y_cols, prepared['layout'])
+            elif prepared['style'] == 'categorical':
+                self.series = None
+                self.highlight_columns = None
+                self.full_x = None
+                self.full_y = None
+                self.ax.plot(prepared['x_data'], prepared['y_data'], '-o', markersize=4)
+                limits_changed = True
             else:
-                # Regular plotting without smoothing
-                ax.plot(x_data, y_data, '-o', markersize=4)
+                self.series = None
+                self.highlight_columns = (prepared['x_col'], prepared['x_conversion'],
+                                          [(self.ax, [prepared['y_col']])])
+                self.full_x = prepared['full_x']
+                self.full_y = prepared['full_y']
+                self.x_sorted = prepared['x_sorted']
+                self.index_key = prepared['index_key']
+                resample = prepared.get('resample')
+                same_resampling = resample == self.resample_method
+                self.resampler = prepared.get('resampler') if resample else None
+                self.resample_method = resample
+                self.bucket_ns = prepared.get('bucket_ns')
+                if self.resampler is None or self.bucket_ns is not None:
+                    self.bucket_label.setText("")
+                if self.smooth_line is not None:
+                    self.smooth_x = prepared['smooth_x']
+                    self.smooth_y = prepared['smooth_y']
+                if self.line is not None:
+                    self.line.set_marker('o' if len(self.full_x) <= MARKER_LIMIT else 'None')
             
-            ax.set_xlabel(x_col)
-            ax.set_ylabel(y_col)
-            ax.set_title(f"{y_col} vs {x_col}")
+                # A user zoom on the same series (e.g. while following a live file)
+                # survives new data; anything else, including a new X range,
+                # autoscales to the new extent
+                same_series = (not rebuilt and (prepared['x_col'], prepared['y_col']) == self.labels
+                               and prepared['x_range'] == self.applied_range and same_resampling)
+                keep_view = same_series and not self.ax.get_autoscalex_on()
+                limits_changed = self.update_limits(prepared['bounds'], keep_view)
+        
+            if prepared['style'] != 'multi':
+                x_col = prepared['x_col']
+                y_col = prepared['y_col']
+                labels = (x_col, y_col)
+                y_label = axis_label(y_col, prepared['resample']) if prepared.get('resample') else y_col
+                labels_changed = labels != self.labels or y_label != self.ax.get_ylabel()
+                if labels_changed:
+                    self.labels = labels
+                    self.ax.set_xlabel(x_col)
+                    self.ax.set_ylabel(y_label)
+                    self.ax.set_title(f"{y_col} vs {x_col}")
+        
+            self.applied_range = prepared['x_range']
             
             if is_datetime:
                 self.figure.autofmt_xdate()
             
-            # Add grid
-            ax.grid(True, linestyle='--', alpha=0.7)
-            
-            # Show the plot
-            self.canvas.draw()
+            self.update_highlight()
+        
+            if self.parked:
+                # Drawn when the view is unparked
+                return
             
-        except Exception as e:
-            print(f"Error updating graph: {str(e)}")
+            # Show the plot: a full redraw only if something besides the data
+            # changed, otherwise blit the data artists over the cached background
+            if rebuilt or limits_changed or labels_changed or self.background is None:
+                self.canvas.draw_idle()
+            else:
+                self.blit()
+    
+    def update_limits(self, bounds, keep_view=False):
+        """
+        Decimate for the view and autoscale if the data's extent changed
+        
+        Args:
+            bounds (tuple): (xmin, xmax, ymin, ymax) of the data, None if empty
+            keep_view (bool): Keep the current limits even if the extent changed
+        
+        Returns:
+            bool: Whether the axes limits had to be recomputed
+        """
+        if bounds == self.data_bounds or keep_view:
+            self.data_bounds = bounds
+            # Keep the current (possibly zoomed) view, just re-decimate within it
+            self.update_decimated(*self.ax.get_xlim())
+            return False
+        
+        self.data_bounds = bounds
+        self.update_decimated()
+        if bounds is not None:
+            # Autoscale to the full data, not just the decimated points
+            self.ax.relim()
+            self.ax.update_datalim([(bounds[0], bounds[2]), (bounds[1], bounds[3])])
+            self.ax.set_autoscale_on(True)
+            self.ax.autoscale_view()
+        return True
+    
+    def update_series_limits(self, keep_view=False):
+        """
+        update_limits() for a multi-series graph: each axes autoscales to the
+        series it draws, and every axes to the X extent of all of them
+        
+        Returns:
+            bool: Whether the axes limits had to be recomputed
+        """
+        series_bounds = [s['bounds'] for s in self.series if s['bounds'] is not None]
+        bounds = []
+        for _, _, _, indices in self.series_artists:
+            group = [self.series[i]['bounds'] for i in indices if self.series[i]['bounds'] is not None]
+            if not group:
+                bounds.append(None)
+                continue
+            bounds.append((min(b[0] for b in series_bounds), max(b[1] for b in series_bounds),
+                           min(b[2] for b in group), max(b[3] for b in group)))
+        
+        if bounds == self.data_bounds or keep_view:
+            self.data_bounds = bounds
+            self.update_decimated(*self.ax.get_xlim())
+            return False
+        
+        self.data_bounds = bounds
+        self.update_decimated()
+        for (ax, _, _, _), axes_bounds in zip(self.series_artists, bounds):
+            if axes_bounds is None:
+                continue
+            ax.relim()
+            ax.update_datalim([(axes_bounds[0], axes_bounds[2]), (axes_bounds[1], axes_bounds[3])])
+            ax.set_autoscale_on(True)
+            ax.autoscale_view()
+        return True
+    
+    def set_series_labels(self, x_col, y_cols, layout):
+        """
+        Label the axes of a multi-series graph
+        
+        Returns:
+            bool: Whether the labels changed
+        """
+        labels = (x_col, y_cols)
+        if labels == self.labels:
+            return False
+        self.labels = labels
+        
+        axes = [ax for ax, _, _, _ in self.series_artists]
+        axes[-1 if layout == SMALL_MULTIPLES else 0].set_xlabel(x_col)
+        if layout == SMALL_MULTIPLES:
+            for ax, y_col in zip(axes, y_cols):
+                ax.set_ylabel(y_col)
+        elif layout == SECONDARY_AXIS:
+            axes[0].set_ylabel(y_cols[0])
+            axes[1].set_ylabel(", ".join(y_cols[1:]))
+        else:
+            axes[0].set_ylabel(", ".join(y_cols))
+        self.ax.set_title(f"{', '.join(y_cols)} vs {x_col}")
+        return True
+    
+    def set_highlighted_rows(self, rows):
+        """
+        Mark rows of the data on the graph, e.g. the rows selected in the table
+        
+        Args:
+            rows (numpy.ndarray): Row numbers, or None to clear the highlight
+        """
+        self.highlighted_rows = rows if rows is not None and len(rows) else None
+        if self.highlight_columns is None and not self.highlight_artists:
+            return
+        self.update_highlight()
+        if self.parked:
+            return
+        if self.background is None:
+            self.canvas.draw_idle()
+        else:
+            self.blit()
+    
+    def update_highlight(self):
+        """Point the highlight markers of each axes at the highlighted rows"""
+        rows = self.highlighted_rows
+        if rows is None or self.highlight_columns is None:
+            for artist in self.highlight_artists.values():
+                artist.set_data([], [])
+            return
+        
+        x_col, x_conversion, targets = self.highlight_columns
+        x_values = self.column_cache.get(x_col, x_conversion)
+        rows = rows[rows < len(x_values)]
+        if len(rows) > MAX_HIGHLIGHTED_POINTS:
+            rows = rows[np.linspace(0, len(rows) - 1, MAX_HIGHLIGHTED_POINTS).astype(np.int64)]
+        
+        for ax, y_cols in targets:
+            x = np.concatenate([x_values[rows]] * len(y_cols))
+            y = np.concatenate([self.column_cache.get(y_col, NUMERIC)[rows] for y_col in y_cols])
+            valid = np.isfinite(x) & np.isfinite(y)
+            artist = self.highlight_artists.get(ax)
+            if artist is None:
+                # Animated like the data, so it is blitted rather than baked into the background
+                artist, = ax.plot([], [], 'o', markersize=7, markerfacecolor='none', markeredgecolor='red',
+                                  markeredgewidth=1.5, zorder=5, animated=True)
+                self.highlight_artists[ax] = artist
+            artist.set_data(x[valid], y[valid])
+    
+    def request_update(self):
+        """Schedule a redraw; repeated calls within a frame cost one render"""
+        if self.parked:
+            # Rendered when scrolled back into view
+            self.stale = True
+            return
+        self.scheduler.request()
+    
+    def park(self):
+        """Swap the live canvas for a half-resolution snapshot and free its render buffers"""
+        if self.parked:
+            return
+        self.parked = True
+        
+        snapshot = self.canvas.grab()
+        self.placeholder.setPixmap(snapshot.scaled(snapshot.size() / 2,
+                                                   Qt.AspectRatioMode.IgnoreAspectRatio,
+                                                   Qt.TransformationMode.SmoothTransformation))
+        self.placeholder.setMinimumHeight(self.canvas.height())
+        self.placeholder.setVisible(True)
+        self.canvas.setVisible(False)
+        
+        self.background = None
+        self.canvas.suspend()
+    
+    def unpark(self):
+        """Bring the live canvas back, catching up on anything that changed while parked"""
+        if not self.parked:
+            return
+        self.parked = False
+        
+        self.canvas.setVisible(True)
+        self.placeholder.setVisible(False)
+        self.placeholder.clear()
+        self.placeholder.setMinimumHeight(0)
+        
+        self.canvas.resume()
+        if self.stale:
+            self.stale = False
+            self.scheduler.request()
+        else:
+            self.canvas.draw_idle()
+    
+    def update_graph(self):
+        """Redraw immediately on the calling thread"""
+        with span('update_graph'):
+            try:
+                self.apply_plot(self.prepare_plot(self.snapshot()))
+            except Exception as e:
+                print(f"Error updating graph: {str(e)}")
+    
+    def export_spec(self):
+        """
+        Everything needed to draw this graph again off the GUI thread: the
+        render spec plus the decimation method, figure size and the limits
+        of each axes, so a zoomed view is exported as shown
+        """
+        spec = self.snapshot()
+        spec['decimation'] = self.decimation_combo.currentText()
+        spec['figsize'] = tuple(self.figure.get_size_inches())
+        spec['limits'] = None
+        # The drawn limits only apply while they belong to the current settings;
+        # otherwise, or when not zoomed, the export autoscales on its own
+        current = not (self.stale or self.scheduler.in_flight or self.scheduler.timer.isActive())
+        if current and self.has_series() and not self.ax.get_autoscalex_on():
+            axes = [ax for ax, _, _, _ in self.series_artists] or [self.ax]
+            spec['limits'] = [ax.get_xlim() + ax.get_ylim() for ax in axes]
+        return spec
     
     def save_graph(self):
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Graph", "", 
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Save Graph", "", 
                                                  "PNG (*.png);;JPEG (*.jpg);;PDF (*.pdf);;SVG (*.svg)")
-        if file_path:
-            self.figure.savefig(file_path, dpi=300, bbox_inches='tight')
+        if not file_path or self.exporter is not None:
+            return
+        
+        fmt = os.path.splitext(file_path)[1].lower().lstrip('.').replace('jpeg', 'jpg')
+        if fmt not in EXPORT_FORMATS:
+            # No extension typed: use the chosen file type's
+            fmt = selected_filter.split()[0].lower().replace('jpeg', 'jpg')
+            file_path += '.' + fmt
+        
+        # Rendered and written on a worker thread, so a dense graph doesn't freeze the window
+        self.exporter = GraphExporter([self.export_spec()], file_path, fmt, parent=self)
+        self.exporter.finished.connect(self.on_export_finished)
+        self.exporter.cancelled.connect(self.on_export_finished)
+        self.save_button.setEnabled(False)
+        self.save_button.setText("Saving...")
+        self.exporter.start()
+    
+    def on_export_finished(self, written=None, errors=None):
+        self.exporter = None
+        self.save_button.setEnabled(True)
+        self.save_button.setText("Save Graph")
+        if errors:
+            QMessageBox.critical(self, "Error", f"Failed to save graph: {errors[0]}")
     
     def remove_graph(self):
+        if self.exporter is not None:
+            # Abandon a save in progress; the application owns the exporter
+            # until its thread has finished and it deletes itself
+            self.exporter.detach()
+            self.exporter.cancel()
+            self.exporter.setParent(QApplication.instance())
+            self.exporter = None
+        
         # Remove this widget from parent layout
         parent = self.parent()
         parent.layout().removeWidget(self)
@@ -0,0 +1,213 @@
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+
+
+# Bytes read per block while scanning for row offsets
+SCAN_BLOCK_BYTES = 16 * 1024 ** 2
+
+NEWLINE = ord('\n')
+QUOTE = ord('"')
+
+# Bytes that don't make a line a row; pandas skips lines with nothing else
+NON_BLANK = np.ones(256, dtype=bool)
+NON_BLANK[[ord(' '), ord('\t'), ord('\r'), NEWLINE]] = False
+
+# Lines starting with whitespace are checked one by one up to this many per
+# block, and with one pass over the whole block beyond it
+MAX_LINES_CHECKED = 1000
+
+
+def non_blank_lines(data, starts, stops):
+    """
+    Whether each line data[start:stop] has a byte that isn't whitespace
+
+    Lines are contiguous, each stop being the next line's start less its
+    newline. Most lines start with a value, so only the first byte is read.
+    """
+    non_empty = starts < stops
+    result = np.zeros(len(starts), dtype=bool)
+    result[non_empty] = NON_BLANK[data[starts[non_empty]]]
+    check = np.flatnonzero(non_empty & ~result)
+    if len(check) > MAX_LINES_CHECKED:
+        counts = np.add.reduceat(NON_BLANK[data], starts[non_empty], dtype=np.int64)
+        result[non_empty] = counts > 0
+    else:
+        for i in check:
+            result[i] = NON_BLANK[data[starts[i]:stops[i]]].any()
+    return result
+
+
+class LineScanner:
+    """
+    Finds where the lines of a CSV file start, reading it a block at a time
+
+    Lines are split the way pandas reads rows: a newline inside a quoted
+    field doesn't end one, and lines with nothing but whitespace are skipped.
+    """
+
+    def __init__(self, position=0):
+        self.position = position      # File offset of the next block; must start a line
+        self.quotes = 0               # Quote characters so far; an odd count means a field is open
+        self.open_start = position    # Start of the line not yet ended, just past the last newline
+        self.open_non_blank = False   # Whether it has anything but whitespace so far
+
+    def feed(self, block):
+        """
+        Scan the next block of the file
+
+        Returns:
+            numpy.ndarray: File offsets (int64) of the lines that aren't blank
+            and end in this block
+        """
+        data = np.frombuffer(block, dtype=np.uint8)
+        newlines = np.flatnonzero(data == NEWLINE)
+        quote_positions = np.flatnonzero(data == QUOTE)
+        # A newline ends a line unless it is inside a quoted field
+        if len(quote_positions) or self.quotes % 2:
+            ends = newlines[(self.quotes + np.searchsorted(quote_positions, newlines)) % 2 == 0]
+            self.quotes += len(quote_positions)
+        else:
+            ends = newlines
+
+        # The lines ending in this block, then the one left open; the first
+        # continues the line the previous block left open
+        non_blank = non_blank_lines(data, np.concatenate(([0], ends + 1)),
+                                    np.concatenate((ends, [len(data)])))
+        non_blank[0] |= self.open_non_blank
+        starts = np.empty(0, dtype=np.int64)
+        if len(ends):
+            begins = np.concatenate(([self.open_start], self.position + ends[:-1] + 1)).astype(np.int64)
+            starts = begins[non_blank[:-1]]
+            self.open_start = self.position + int(ends[-1]) + 1
+        self.open_non_blank = bool(non_blank[-1])
+        self.position += len(block)
+        return starts
+
+    def finish(self):
+        """The offset of a last line without a newline after it, if it isn't blank"""
+        if self.open_non_blank:
+            return np.array([self.open_start], dtype=np.int64)
+        return np.empty(0, dtype=np.int64)
+
+
+class LazyCSVDataset:
+    """
+    A CSV file whose columns are parsed only when first used
+
+    Opening scans just the header and the byte offset of every row, which
+    gives the row count without tokenizing the file. A column is parsed the
+    first time it is indexed, in a pass over the file that converts only
+    that column; numeric columns are then kept in a memory-mapped file so the
+    OS can page them out, and resident memory grows with the columns
+    actually viewed rather than the file's width.
+
+    It supports the parts of the DataFrame interface the viewer uses:
+    columns, len(), [column] and head().
+
+    Rows are counted the way pandas reads them: blank lines are skipped and
+    newlines inside quoted fields don't end a row.
+    """
+
+    def __init__(self, file_path, storage_dir=None):
+        self.file_path = file_path
+        self.columns = pd.Index(pd.read_csv(file_path, nrows=0).columns)
+        self.row_offsets = np.empty(0, dtype=np.int64)
+
+        # Memory-mapped column files live here and are removed with the dataset
+        self.storage_dir = tempfile.mkdtemp(prefix="landmark-lazy-", dir=storage_dir)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.storage_dir, True)
+
+        self.loaded = {}
+        self.mapped = set()
+        self.lock = threading.Lock()
+
+    def scan(self, progress=None, is_cancelled=None):
+        """
+        Find the byte offset of every data row
+
+        Args:
+            progress: Called with (bytes scanned, total bytes) after each block
+            is_cancelled: Called after each block; stop scanning if it returns True
+
+        Returns:
+            bool: True if the whole file was scanned
+        """
+        total_bytes = os.path.getsize(self.file_path)
+        line_starts = []
+        scanner = LineScanner()
+        with open(self.file_path, 'rb') as f:
+            while True:
+                block = f.read(SCAN_BLOCK_BYTES)
+                if not block:
+                    break
+                line_starts.append(scanner.feed(block))
+                if progress:
+                    progress(scanner.position, total_bytes)
+                if is_cancelled and is_cancelled():
+                    return False
+        line_starts.append(scanner.finish())
+        
+        # The first line that isn't blank is the header
+        self.row_offsets = np.concatenate(line_starts)[1:]
+        return True
+
+    def __len__(self):
+        return len(self.row_offsets)
+
+    def __getitem__(self, col):
+        with self.lock:
+            series = self.loaded.get(col)
+            if series is None:
+                series = self.load_column(col)
+                self.loaded[col] = series
+            return series
+
+    def is_loaded(self, col):
+        """Whether a column has been parsed, so indexing it won't read the file"""
+        return col in self.loaded
+
+    def load_column(self, col):
+        """Parse one column from the file, memory-mapping it if it's numeric"""
+        series = pd.read_csv(self.file_path, usecols=[col])[col]
+        if (not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+                or series.empty):
+            return series
+
+        path = os.path.join(self.storage_dir, f"col_{self.columns.get_loc(col):05d}.dat")
+        values = series.to_numpy()
+        mapped = np.memmap(path, dtype=values.dtype, mode='w+', shape=values.shape)
+        mapped[:] = values
+        mapped.flush()
+        del mapped
+
+        # Reopen read-only so the pages are clean and can be dropped under memory pressure
+        mapped = np.memmap(path, dtype=values.dtype, mode='r', shape=values.shape)
+        self.mapped.add(col)
+        return pd.Series(mapped, name=col, copy=False)
+
+    def head(self, n=5):
+        return pd.read_csv(self.file_path, nrows=n)
+
+    def close(self):
+        """Forget loaded columns and delete their memory-mapped files"""
+        with self.lock:
+            self.loaded.clear()
+            self.mapped.clear()
+        self._finalizer()
+
+    def resident_bytes(self):
+        """Bytes of parsed column data held in memory rather than in mapped files"""
+        total = 0
+        for col, series in self.loaded.items():
+            if col not in self.mapped:
+                total += series.memory_usage(deep=True, index=False)
+        return total
+
+    def summary(self):
+        return (f"{len(self.loaded)} of {len(self.columns)} columns parsed, "
+                f"{self.resident_bytes() / 1024 ** 2:.0f} MB resident")
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from csv_cache import get_default_cache
+from csv_source import ENGINE_AUTO, file_stem, read_frame
+from schema_profiler import SchemaProfiler, DATETIME
+from perf_trace import span
+
+
+# Largest time difference matched when aligning, in seconds for datetime columns
+DEFAULT_TOLERANCE = 1.0
+
+# How often a multi-file load checks whether it was cancelled, in seconds
+CANCEL_POLL_SECONDS = 0.1
+
+# Temporary name of the merge key while aligning
+KEY_COLUMN = '__align_key__'
+
+
+def load_data(file_path, use_cache=True, engine=ENGINE_AUTO):
+    """
+    Read and validate a CSV file, going through the columnar cache
+
+    Safe to run in a worker process. Compressed files are decompressed as
+    they are parsed, with the given engine of csv_source.PARSE_ENGINES.
+
+    Raises:
+        ValueError: If the file can't be graphed
+    """
+    # Imported here because LandMarkCSVReader pulls in the Qt widgets
+    from LandMarkCSVReader import CSVReader
+
+    cache = get_default_cache() if use_cache else None
+    key = cache.key_for(file_path) if cache else None
+    data = cache.load(file_path, key) if cache else None
+    if data is not None:
+        return data
+
+    data, report = read_frame(file_path, engine)
+    parse_seconds = report['seconds']
+
+    error = CSVReader.validate(data)
+    if error:
+        raise ValueError(error)
+    if cache:
+        cache.store(file_path, data, parse_seconds, key)
+    return data
+
+
+def load_files(file_paths, use_cache=True, max_workers=None, on_loaded=None, engine=ENGINE_AUTO,
+               is_cancelled=None):
+    """
+    Load several CSV files at once, each in its own worker process
+
+    Args:
+        file_paths (list): CSV files
+        use_cache (bool): Read and write the parsed-file cache
+        max_workers (int): Worker processes (default: one per CPU, at most one per file)
+        on_loaded: Called with each file's path as it finishes, loaded or not
+        engine (str): Parse engine, one of csv_source.PARSE_ENGINES
+        is_cancelled: Polled while waiting; once it returns True, files not
+            yet started are dropped and only those already parsing finish
+
+    Returns:
+        tuple: ({path: DataFrame}, {path: error message})
+    """
+    frames = {}
+    errors = {}
+    workers = min(len(file_paths), max_workers or os.cpu_count() or 1)
+
+    # Spawned rather than forked: the viewer has Qt and pool threads running,
+    # which a forked child would inherit in an unknown state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(load_data, file_path, use_cache, engine): file_path for file_path in file_paths}
+        pending = set(futures)
+        while pending:
+            if is_cancelled and is_cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+            done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = futures[future]
+                try:
+                    frames[file_path] = future.result()
+                except Exception as e:
+                    errors[file_path] = f"Failed to open CSV file: {str(e)}"
+                if on_loaded:
+                    on_loaded(file_path)
+    return frames, errors
+
+
+def unique_stems(files):
+    """File names without extensions, numbered where files in different folders share a name"""
+    stems = []
+    seen = {}
+    for file_path in files:
+        stem = file_stem(file_path)
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        stems.append(stem if count == 0 else f"{stem}_{count + 1}")
+    return stems
+
+
+def default_time_column(schema):
+    """The first datetime column, else the first column usable as an X-axis"""
+    columns = schema.columns_of_kind(DATETIME)
+    return columns[0] if columns else schema.plottable_x_columns()[0]
+
+
+def time_keys(data, col):
+    """
+    A column as merge keys
+
+    Returns:
+        tuple: (pandas.Series of datetime64[ns] for date columns or float64
+        otherwise, whether the keys are datetimes)
+    """
+    schema = SchemaProfiler.profile(data)
+    if schema.kind(col) == DATETIME:
+        parsed = schema.to_datetime(col)
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_convert(None)
+        return parsed.astype('datetime64[ns]'), True
+    return pd.to_numeric(data[col], errors='coerce').astype('float64'), False
+
+
+def align_datasets(datasets, tolerance=DEFAULT_TOLERANCE):
+    """
+    Join datasets on their time columns with a nearest-key merge-asof
+
+    Every row of the first dataset is kept, and each other dataset adds the
+    values of its row nearest in time, or missing values if none is within
+    the tolerance. Keys are sorted once (skipped if already in order) and
+    matched in a single linear pass, so no union of timestamps is built.
+
+    Args:
+        datasets (list): (name, DataFrame, time column) tuples, the first being the base
+        tolerance (float): Largest time difference matched; seconds for datetime
+            columns, the columns' own units otherwise
+
+    Returns:
+        pandas.DataFrame: The base's time column, then every dataset's columns
+        named "name: column"
+
+    Raises:
+        ValueError: If some time columns are dates and others aren't
+    """
+    with span('align_datasets', datasets=len(datasets)):
+        merged = None
+        keys_are_dates = None
+        for name, data, time_col in datasets:
+            keys, is_datetime = time_keys(data, time_col)
+            if keys_are_dates is None:
+                keys_are_dates = is_datetime
+            elif is_datetime != keys_are_dates:
+                raise ValueError(f"{name}: time column '{time_col}' must be a "
+                                 f"{'date' if keys_are_dates else 'number'} like the first file's")
+
+            frame = data.add_prefix(f"{name}: ")
+            frame[KEY_COLUMN] = keys.to_numpy()
+            frame = frame[frame[KEY_COLUMN].notna()]
+            if not frame[KEY_COLUMN].is_monotonic_increasing:
+                frame = frame.sort_values(KEY_COLUMN, kind='stable')
+
+            if merged is None:
+                merged = frame
+                continue
+            with span('merge_asof', dataset=name, rows=len(frame)):
+                merged = pd.merge_asof(merged, frame, on=KEY_COLUMN, direction='nearest',
+                                       tolerance=pd.Timedelta(seconds=tolerance) if keys_are_dates else tolerance)
+
+        # The parsed keys replace the base's time column, first as in the file
+        base_name, _, base_time_col = datasets[0]
+        time_name = f"{base_name}: {base_time_col}"
+        merged = merged.drop(columns=[time_name]).rename(columns={KEY_COLUMN: time_name})
+        columns = [time_name] + [col for col in merged.columns if col != time_name]
+        return merged[columns].reset_index(drop=True)
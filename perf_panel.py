@@ -0,0 +1,128 @@
+from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QLabel,
+                             QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox)
+from PyQt6.QtCore import QTimer
+
+from perf_trace import tracer
+
+
+# How often the panel checks for newly finished operations
+REFRESH_INTERVAL_MS = 500
+
+
+def format_delta(delta):
+    if delta is None:
+        return ""
+    return f"{delta / 1024 ** 2:+.1f}"
+
+
+class PerfPanel(QFrame):
+    """Shows recent operations with per-phase timings and memory deltas"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.shown_version = -1
+        self.initUI()
+
+        # Spans finish on worker threads too, so poll rather than take callbacks
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def initUI(self):
+        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Sunken)
+        self.setMaximumHeight(260)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        controls = QHBoxLayout()
+        self.record_checkbox = QCheckBox("Record timings")
+        self.record_checkbox.setChecked(tracer.enabled)
+        self.record_checkbox.toggled.connect(self.set_recording)
+        controls.addWidget(self.record_checkbox)
+
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        controls.addWidget(clear_button)
+
+        export_button = QPushButton("Export Trace...")
+        export_button.setToolTip("Save the recorded spans for chrome://tracing or ui.perfetto.dev")
+        export_button.clicked.connect(self.export_trace)
+        controls.addWidget(export_button)
+
+        controls.addStretch()
+        self.summary_label = QLabel()
+        controls.addWidget(self.summary_label)
+        layout.addLayout(controls)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Operation", "Time (ms)", "Memory (MB)", "Details"])
+        self.tree.setColumnWidth(0, 260)
+        layout.addWidget(self.tree)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def set_recording(self, enabled):
+        tracer.enabled = enabled
+
+    def clear(self):
+        tracer.clear()
+        self.refresh()
+
+    def refresh(self):
+        if tracer.version == self.shown_version:
+            return
+        self.shown_version = tracer.version
+
+        operations = tracer.recent_operations()
+        self.tree.clear()
+        # Newest first
+        for operation in reversed(operations):
+            item = self.make_item(operation.name, [operation])
+            self.tree.addTopLevelItem(item)
+        self.summary_label.setText(f"{len(operations)} operations")
+
+    def make_item(self, name, spans):
+        """
+        Tree item for one span, or for same-named sibling spans combined
+        (e.g. one row for every parsed chunk)
+        """
+        seconds = sum(s.seconds for s in spans)
+        deltas = [s.memory_delta for s in spans if s.memory_delta is not None]
+        delta = sum(deltas) if deltas else None
+
+        if len(spans) == 1:
+            details = ", ".join(f"{key}={value}" for key, value in spans[0].args.items())
+        else:
+            details = f"{len(spans)} calls"
+        if spans[0].parent is None:
+            details = f"{details} [{spans[0].thread_name}]".strip()
+
+        item = QTreeWidgetItem([name if len(spans) == 1 else f"{name} x{len(spans)}",
+                                f"{seconds * 1000:.1f}", format_delta(delta), details])
+
+        # Group the children of every span in this row by name, in first-seen order
+        groups = {}
+        for s in spans:
+            for child in s.children:
+                groups.setdefault(child.name, []).append(child)
+        for child_name, children in groups.items():
+            item.addChild(self.make_item(child_name, children))
+        return item
+
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "landmark-trace.json",
+                                                   "Trace (*.json)")
+        if not file_path:
+            return
+        try:
+            tracer.export_chrome_trace(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export trace: {str(e)}")
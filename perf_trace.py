@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Finished top-level operations kept for the performance panel
+MAX_OPERATIONS = 50
+
+# Spans kept for trace export; the oldest are dropped first
+MAX_EVENTS = 200000
+
+# Set to 1 to record from startup, e.g. for the batch renderer
+TRACE_ENV_VAR = 'LANDMARK_TRACE'
+
+
+def current_rss():
+    """Resident memory of this process in bytes, or None if it can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+class _NullSpan:
+    """Returned while tracing is off, so a disabled span costs one attribute check"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed phase; spans opened while another is open on the same thread become its children"""
+
+    __slots__ = ('tracer', 'name', 'args', 'parent', 'children', 'thread_id', 'thread_name',
+                 'start', 'end', 'rss_start', 'rss_end')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.parent = None
+        self.children = []
+        self.rss_start = None
+        self.rss_end = None
+
+    def __enter__(self):
+        self.tracer.begin(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.end(self)
+        return False
+
+    @property
+    def seconds(self):
+        return (self.end - self.start) / 1e9
+
+    @property
+    def memory_delta(self):
+        """Change in process RSS over the span in bytes; other threads contribute too"""
+        if self.rss_start is None or self.rss_end is None:
+            return None
+        return self.rss_end - self.rss_start
+
+
+class Tracer:
+    """
+    Records timing spans for the performance panel and trace export
+
+    Wrap a phase in `with span('name', detail=value):`. While tracing is
+    disabled that returns a shared no-op object, so instrumented hot paths
+    cost almost nothing. Top-level spans are kept as operations for the
+    panel, and every span is kept as a Chrome trace event.
+    """
+
+    def __init__(self, max_operations=MAX_OPERATIONS, max_events=MAX_EVENTS):
+        self.enabled = os.environ.get(TRACE_ENV_VAR) == '1'
+        self.operations = deque(maxlen=max_operations)
+        self.events = deque(maxlen=max_events)
+        self.thread_names = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter_ns()
+        self.version = 0   # Bumped whenever an operation finishes, so viewers know to refresh
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def begin(self, span):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        span.parent = stack[-1] if stack else None
+        stack.append(span)
+        thread = threading.current_thread()
+        span.thread_id = thread.ident
+        span.thread_name = thread.name
+        span.rss_start = current_rss()
+        span.start = time.perf_counter_ns()
+
+    def end(self, span):
+        span.end = time.perf_counter_ns()
+        span.rss_end = current_rss()
+        stack = self.local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+
+        event = {
+            'name': span.name,
+            'ph': 'X',
+            'ts': (span.start - self.origin) / 1000,
+            'dur': (span.end - span.start) / 1000,
+            'pid': os.getpid(),
+            'tid': span.thread_id,
+        }
+        args = dict(span.args)
+        if span.memory_delta is not None:
+            args['rss_delta_mb'] = round(span.memory_delta / 1024 ** 2, 3)
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+
+        with self.lock:
+            self.events.append(event)
+            self.thread_names[span.thread_id] = span.thread_name
+            if span.parent is None:
+                self.operations.append(span)
+                self.version += 1
+            else:
+                span.parent.children.append(span)
+
+    def recent_operations(self):
+        """Finished top-level spans, oldest first"""
+        with self.lock:
+            return list(self.operations)
+
+    def clear(self):
+        with self.lock:
+            self.operations.clear()
+            self.events.clear()
+            self.version += 1
+
+    def export_chrome_trace(self, file_path):
+        """
+        Write the recorded spans in the Chrome trace event format
+
+        The file opens in chrome://tracing, Perfetto (ui.perfetto.dev) and
+        other trace viewers.
+
+        Args:
+            file_path (str): JSON file to write
+        """
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+
+        pid = os.getpid()
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'Landmark CSV Viewer'}}]
+        for tid, name in thread_names.items():
+            metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+
+        with open(file_path, 'w') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+
+
+# The process-wide tracer used by every instrumented module
+tracer = Tracer()
+
+
+def span(name, **args):
+    """Time a phase: `with span('parse', rows=n):`"""
+    return tracer.span(name, **args)
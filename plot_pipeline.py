@@ -0,0 +1,323 @@
+import numpy as np
+import pandas as pd
+
+from decimation import is_sorted
+from schema_profiler import NUMERIC as NUMERIC_KIND
+from column_cache import NUMERIC, EPOCH_SECONDS, DATE_NUMBER, SECONDS_PER_DAY
+from sorted_index import SortedIndex, get_sorted_index
+from smoothing import SAVGOL, SPLINE, DEFAULT_WINDOW, align, sort_pair, smooth
+from resampling import RESAMPLE_OFF, TimeResampler, bucket_size
+from perf_trace import span
+
+
+# The Qt-free part of drawing a graph: column conversion, cleaning and
+# smoothing. GraphView runs it on a pool thread and the batch renderer runs
+# it in worker processes, so both draw exactly the same data.
+
+# Series with more points than this are drawn without per-point markers
+MARKER_LIMIT = 5000
+
+# Buckets per plot when resampling picks the bucket size: about one per pixel
+DEFAULT_TARGET_BUCKETS = 1000
+
+# How a graph with several Y columns lays them out
+OVERLAY = 'Overlay'
+SECONDARY_AXIS = 'Secondary Axis'
+SMALL_MULTIPLES = 'Small Multiples'
+MULTI_SERIES_LAYOUTS = [OVERLAY, SECONDARY_AXIS, SMALL_MULTIPLES]
+
+
+def smooth_data(x_data, y_data, method='savgol', window=DEFAULT_WINDOW):
+    """
+    Smooth a series that may be unsorted or have missing values
+
+    Args:
+        x_data: X values, anything pandas can coerce to numbers
+        y_data: Matching Y values
+        method (str): One of smoothing.SMOOTHING_METHODS; 'savgol' and
+            'spline' are accepted for older callers
+        window (int): Window size in points
+
+    Returns:
+        tuple: (x, y) of the smoothed curve
+    """
+    method = {'savgol': SAVGOL, 'spline': SPLINE}.get(method, method)
+    with span('smooth_data', method=method, points=len(y_data)):
+        x, y = sort_pair(*align(x_data, y_data))
+        return smooth(x, y, method, window)
+
+
+def prepare_plot(spec):
+    """
+    Convert, clean and smooth the data for a render
+
+    Args:
+        spec (dict): data, column_cache, x_col, y_col, treat_as_numeric, smooth
+            and optionally smooth_method, smooth_window, extra_y_cols, layout
+            and x_range, the (from, to) texts of the X range to plot, resample
+            and bucket (a resampling method and bucket size name) and
+            target_buckets
+
+    Returns:
+        dict: Arrays and flags describing the plot. 'style' is 'line', 'smooth',
+        'multi' or 'categorical'; categorical plots carry the raw x_data and
+        y_data, line and smooth plots full_x, full_y, x_sorted, bounds and,
+        when smoothed, smooth_x and smooth_y. Multi-series plots carry a list
+        of those per Y column in 'series', plus 'layout' and 'smooth'. Plots
+        limited to an X range carry it as 'x_range', (lo, hi) in axis units.
+        Resampled line plots carry 'resample', 'bucket_ns' (None for
+        automatic) and a 'resampler', and their bounds are the aggregated ones
+    """
+    with span('prepare_plot', x=spec['x_col'], y=spec['y_col']):
+        return _prepare_plot(spec)
+
+
+def _prepare_plot(spec):
+    data = spec['data']
+    column_cache = spec['column_cache']
+    x_col = spec['x_col']
+    y_col = spec['y_col']
+
+    x_conversion, is_datetime = x_conversion_for(column_cache, x_col, spec['treat_as_numeric'])
+    y_numeric = column_cache.schema.kind(y_col) == NUMERIC_KIND
+
+    prepared = {'x_col': x_col, 'y_col': y_col, 'x_conversion': x_conversion, 'is_datetime': is_datetime,
+                'x_range': None}
+
+    if x_conversion is None or not y_numeric:
+        # Categorical data, let matplotlib handle it as before
+        prepared['style'] = 'categorical'
+        prepared['x_data'] = data[x_col]
+        prepared['y_data'] = data[y_col]
+        return prepared
+
+    # Extra series need numeric values too; the X column is converted once
+    # through the column cache and shared by all of them
+    y_cols = [y_col] + [col for col in spec.get('extra_y_cols', ())
+                        if col != y_col and column_cache.schema.kind(col) == NUMERIC_KIND]
+    x_range = parse_range(spec.get('x_range') or ('', ''), x_conversion)
+    if x_range == (None, None):
+        x_range = None
+    prepared['x_range'] = x_range
+    series = [prepare_series(column_cache, x_col, x_conversion, col, spec, x_range) for col in y_cols]
+
+    if len(series) > 1:
+        prepared['style'] = 'multi'
+        prepared['layout'] = spec.get('layout', OVERLAY)
+        prepared['smooth'] = spec['smooth']
+        prepared['series'] = series
+        return prepared
+
+    prepared.update(series[0])
+    prepared['style'] = 'smooth' if spec['smooth'] else 'line'
+    prepared['resample'] = None
+    method = spec.get('resample', RESAMPLE_OFF)
+    if prepared['style'] == 'line' and method != RESAMPLE_OFF and x_conversion in (EPOCH_SECONDS, DATE_NUMBER):
+        prepare_resampling(prepared, column_cache, method, bucket_size(spec.get('bucket')),
+                           spec.get('target_buckets') or DEFAULT_TARGET_BUCKETS)
+    return prepared
+
+
+def prepare_resampling(prepared, column_cache, method, bucket_ns, target_buckets):
+    """
+    Set up time-bucket aggregation of a line plot's series
+
+    The level for the whole series is aggregated here, off the GUI thread,
+    both to autoscale to the aggregated values and so it is already cached
+    when the view is first drawn.
+    """
+    x, y = prepared['full_x'], prepared['full_y']
+    key = prepared['index_key']
+    if not prepared['x_sorted']:
+        pair = (prepared['x_col'], prepared['x_conversion'], prepared['y_col'])
+        if key is None:
+            x, y = sort_pair(x, y)
+        else:
+            x, y = column_cache.get_derived(('sorted',) + pair, lambda: sort_pair(x, y))
+    resampler = TimeResampler(x, y, prepared['x_conversion'], column_cache, key)
+
+    prepared['resample'] = method
+    prepared['bucket_ns'] = bucket_ns
+    prepared['resampler'] = resampler
+    if prepared['bounds'] is not None:
+        xmin, xmax = prepared['bounds'][:2]
+        size = bucket_ns or resampler.auto_size(xmin, xmax, target_buckets)
+        with span('resample', method=method, rows=len(x)):
+            _, values, band = resampler.points(method, size)
+        low, high = band if band is not None else (values, values)
+        prepared['bounds'] = (xmin, xmax, low.min(), high.max())
+
+
+def x_conversion_for(column_cache, x_col, treat_as_numeric):
+    """
+    How an X column is converted for plotting
+
+    Returns:
+        tuple: (conversion, or None if the column is plotted as categories,
+        whether the axis shows dates)
+    """
+    # Parse as datetime if the schema says it's a date, using the detected format.
+    # "Treat as Numeric" plots dates as seconds since the epoch instead
+    if column_cache.is_datetime(x_col):
+        if treat_as_numeric:
+            return EPOCH_SECONDS, False
+        return DATE_NUMBER, True
+    if column_cache.schema.kind(x_col) == NUMERIC_KIND:
+        return NUMERIC, False
+    return None, False
+
+
+def parse_range_bound(text, x_conversion):
+    """
+    Read one end of an X range typed by the user, in the axis's units
+
+    Numbers are taken as they are. On a date axis a date such as
+    "2024-01-01 12:00" is accepted too.
+
+    Returns:
+        float or None: The bound, or None if the text is empty
+
+    Raises:
+        ValueError: If the text isn't a number, or a date on a date axis
+    """
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        if x_conversion not in (EPOCH_SECONDS, DATE_NUMBER):
+            raise ValueError(f"'{text}' is not a number")
+    try:
+        seconds = pd.Timestamp(text).timestamp()
+    except ValueError:
+        raise ValueError(f"'{text}' is not a number or a date")
+    return seconds / SECONDS_PER_DAY if x_conversion == DATE_NUMBER else seconds
+
+
+def parse_range(texts, x_conversion):
+    """
+    Read the (from, to) texts of an X range
+
+    Returns:
+        tuple: (lo, hi), either None where its text is empty
+
+    Raises:
+        ValueError: If a bound can't be read or the range is reversed
+    """
+    lo, hi = (parse_range_bound(text, x_conversion) for text in texts)
+    if lo is not None and hi is not None and lo > hi:
+        raise ValueError("the start of the range is after its end")
+    return lo, hi
+
+
+def window_pair(column_cache, key, x, y, x_sorted, lo, hi):
+    """
+    The points of a cleaned pair with lo <= x <= hi, found by binary search
+
+    Sorted X is searched directly and sliced without copying; otherwise the
+    pair's sorted index is built, or reused from the column cache.
+
+    Returns:
+        tuple: (x, y) of the points in the window, in row order
+    """
+    if x_sorted:
+        start, stop = SortedIndex(x, None).positions(lo, hi)
+        return x[start:stop], y[start:stop]
+    rows = get_sorted_index(column_cache, key, x).rows_between(lo, hi)
+    return x[rows], y[rows]
+
+
+def prepare_series(column_cache, x_col, x_conversion, y_col, spec, x_range=None):
+    """
+    Clean, and if asked smooth, one Y column against a converted X column
+
+    Args:
+        x_range (tuple): Only keep the points with x in (lo, hi), either bound
+            None for open-ended; None for every point
+
+    Returns:
+        dict: y_col, full_x, full_y, x_sorted, bounds, index_key (the cache key
+        of the series' sorted index, None when limited to a range) and, when
+        smoothed, smooth_x and smooth_y
+    """
+    # The cleaned pair is cached, so other views of the same columns and
+    # redraws that only change smoothing or decimation skip this work
+    pair = (x_col, x_conversion, y_col)
+    full_x, full_y, x_sorted, bounds = column_cache.get_derived(
+        ('pair',) + pair,
+        lambda: clean_pair(column_cache.get(x_col, x_conversion), column_cache.get(y_col, NUMERIC)))
+    index_key = ('pair',) + pair
+    if x_range is not None:
+        with span('window', rows=len(full_x)):
+            full_x, full_y = window_pair(column_cache, index_key, full_x, full_y, x_sorted, *x_range)
+        x_sorted = x_sorted or is_sorted(full_x)
+        bounds = bounds_of(full_x, full_y)
+        # The window is a new array, not the one the index was built over
+        index_key = None
+    series = {'y_col': y_col, 'full_x': full_x, 'full_y': full_y, 'x_sorted': x_sorted, 'bounds': bounds,
+              'index_key': index_key}
+
+    if spec['smooth']:
+        method = spec.get('smooth_method', SAVGOL)
+        window = spec.get('smooth_window', DEFAULT_WINDOW)
+
+        def smooth_pair():
+            # Sorting is shared by every method and window
+            if x_sorted:
+                sorted_x, sorted_y = full_x, full_y
+            else:
+                sorted_x, sorted_y = column_cache.get_derived(('sorted',) + pair, lambda: sort_pair(full_x, full_y))
+            return smooth(sorted_x, sorted_y, method, window)
+
+        # Cached by method and window, so toggling smoothing back on is instant
+        smooth_x, smooth_y = column_cache.get_derived(('smooth',) + pair + (method, window), smooth_pair)
+        smooth_x = np.asarray(smooth_x, dtype=np.float64)
+        smooth_y = np.asarray(smooth_y, dtype=np.float64)
+        if x_range is not None:
+            # Smoothed over every point, then cropped, so the window has no edge effects
+            start, stop = SortedIndex(smooth_x, None).positions(*x_range)
+            smooth_x, smooth_y = smooth_x[start:stop], smooth_y[start:stop]
+        series['smooth_x'] = smooth_x
+        series['smooth_y'] = smooth_y
+    return series
+
+
+def clean_pair(x_values, y_values):
+    """
+    Drop rows where x or y is missing, keeping the pairs aligned
+
+    Returns:
+        tuple: (x, y, whether x is sorted, (xmin, xmax, ymin, ymax) or None if empty)
+    """
+    # In follow mode rows can arrive between fetching x and y
+    rows = min(len(x_values), len(y_values))
+    x_values = x_values[:rows]
+    y_values = y_values[:rows]
+
+    with span('clean', rows=rows):
+        valid = np.isfinite(x_values) & np.isfinite(y_values)
+        if valid.all():
+            # Nothing to drop: share the cached columns instead of copying them,
+            # which matters when many series share one X column
+            full_x, full_y = x_values, y_values
+        else:
+            full_x = x_values[valid]
+            full_y = y_values[valid]
+        return full_x, full_y, is_sorted(full_x), bounds_of(full_x, full_y)
+
+
+def bounds_of(x, y):
+    """(xmin, xmax, ymin, ymax) of a cleaned pair, or None if it is empty"""
+    if not len(x):
+        return None
+    return (x.min(), x.max(), y.min(), y.max())
+
+
+def default_columns(schema):
+    """The X and Y columns a new graph starts with, as GraphView picks them"""
+    x_columns = schema.plottable_x_columns()
+    y_columns = schema.plottable_y_columns()
+    x_col = x_columns[0]
+    y_col = y_columns[1] if y_columns[0] == x_col and len(y_columns) > 1 else y_columns[0]
+    return x_col, y_col
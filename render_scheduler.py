@@ -0,0 +1,105 @@
+import threading
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+# Requests arriving within one frame at 60 Hz are coalesced into a single render
+FRAME_INTERVAL_MS = 16
+
+
+class _PrepareSignals(QObject):
+    """Carries a finished prepare step from the thread pool back to the GUI thread"""
+
+    done = pyqtSignal(object, object)  # (prepared result, exception or None)
+
+
+class _PrepareTask(QRunnable):
+    """Runs the slow, Qt-free part of a render on a pool thread"""
+
+    def __init__(self, prepare, spec, signals):
+        super().__init__()
+        self.prepare = prepare
+        self.spec = spec
+        self.signals = signals
+
+    def run(self):
+        threading.current_thread().name = "Render pool"
+        try:
+            result, error = self.prepare(self.spec), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            self.signals.done.emit(result, error)
+        except RuntimeError:
+            # The view was deleted while we were working
+            pass
+
+
+class RenderScheduler(QObject):
+    """
+    Coalesces render requests for one view
+
+    Every request within a frame collapses into one render. A render runs in
+    three steps: snapshot() reads the widget state on the GUI thread,
+    prepare(spec) does the slow data work on a pool thread, and
+    apply(result) updates the artists back on the GUI thread. Only one
+    prepare runs per view at a time; if newer requests arrive meanwhile, its
+    result is dropped and the latest state is rendered instead.
+    """
+
+    def __init__(self, snapshot, prepare, apply, parent=None, interval_ms=FRAME_INTERVAL_MS):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.prepare = prepare
+        self.apply = apply
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.dispatch)
+
+        self.signals = _PrepareSignals(self)
+        self.signals.done.connect(self.on_prepared)
+
+        self.in_flight = False
+        self.pending = False
+
+        # Counters for diagnosing redraw storms
+        self.requested = 0
+        self.rendered = 0
+        self.skipped = 0
+
+    def request(self):
+        """Ask for a render; cheap to call any number of times per frame"""
+        self.requested += 1
+        if self.timer.isActive():
+            # Folded into the render already scheduled for this frame
+            self.skipped += 1
+        else:
+            self.timer.start()
+
+    def dispatch(self):
+        if self.in_flight:
+            # Render the latest state once the current prepare finishes
+            self.pending = True
+            return
+        self.in_flight = True
+        task = _PrepareTask(self.prepare, self.snapshot(), self.signals)
+        QThreadPool.globalInstance().start(task)
+
+    def on_prepared(self, result, error):
+        self.in_flight = False
+        if self.pending:
+            # A newer request arrived while this one was being prepared
+            self.pending = False
+            self.skipped += 1
+            self.dispatch()
+            return
+
+        if error is not None:
+            print(f"Error updating graph: {str(error)}")
+            return
+        self.rendered += 1
+        self.apply(result)
+
+    def summary(self):
+        return f"{self.rendered} renders, {self.skipped} skipped of {self.requested} requests"
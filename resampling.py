@@ -0,0 +1,200 @@
+import numpy as np
+
+from column_cache import DATE_NUMBER
+from perf_trace import span
+
+
+# How a datetime series is aggregated into time buckets
+RESAMPLE_OFF = 'Off'
+MEAN = 'Mean'
+MIN_MAX_BAND = 'Min/Max Band'
+LAST = 'Last'
+COUNT = 'Count'
+RESAMPLE_METHODS = [RESAMPLE_OFF, MEAN, MIN_MAX_BAND, LAST, COUNT]
+
+NS_PER_MS = 10 ** 6
+NS_PER_SECOND = 10 ** 9
+NS_PER_DAY = 86400 * NS_PER_SECOND
+
+# Bucket sizes in nanoseconds. Each divides the next, so a coarser level can
+# always be rolled up from any finer one instead of from the raw points
+AUTO_BUCKET = 'Auto'
+BUCKET_SIZES = [
+    ('1 ms', NS_PER_MS),
+    ('10 ms', 10 * NS_PER_MS),
+    ('100 ms', 100 * NS_PER_MS),
+    ('1 s', NS_PER_SECOND),
+    ('5 s', 5 * NS_PER_SECOND),
+    ('10 s', 10 * NS_PER_SECOND),
+    ('30 s', 30 * NS_PER_SECOND),
+    ('1 min', 60 * NS_PER_SECOND),
+    ('5 min', 300 * NS_PER_SECOND),
+    ('15 min', 900 * NS_PER_SECOND),
+    ('30 min', 1800 * NS_PER_SECOND),
+    ('1 h', 3600 * NS_PER_SECOND),
+    ('3 h', 3 * 3600 * NS_PER_SECOND),
+    ('6 h', 6 * 3600 * NS_PER_SECOND),
+    ('12 h', 12 * 3600 * NS_PER_SECOND),
+    ('1 day', NS_PER_DAY),
+    ('7 days', 7 * NS_PER_DAY),
+]
+BUCKET_NS = [size for _, size in BUCKET_SIZES]
+
+# A view with at most this many raw points is aggregated directly; wider views
+# read the cached whole-series level instead
+DIRECT_AGGREGATION_ROWS = 200000
+
+
+def bucket_name(size):
+    """Label of a bucket size in nanoseconds"""
+    return dict((ns, name) for name, ns in BUCKET_SIZES)[size]
+
+
+def bucket_size(name):
+    """Bucket size in nanoseconds for a label, None for Auto"""
+    return dict(BUCKET_SIZES).get(name)
+
+
+def axis_label(y_col, method):
+    """Y-axis label of a resampled column"""
+    if method == COUNT:
+        return f"Count of {y_col}"
+    return f"{y_col} ({method.lower()})"
+
+
+def empty_level():
+    return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+            np.empty(0), np.empty(0), np.empty(0), np.empty(0))
+
+
+def group_starts(ids):
+    """Start of each run of equal ids in a sorted array, and the end of each run"""
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    return starts, np.r_[starts[1:], len(ids)]
+
+
+def aggregate(ns, y, size):
+    """
+    Aggregate points with sorted int64 nanosecond times into buckets
+
+    Each point's bucket is its time floor-divided by the bucket size, so the
+    buckets are found in one vectorised pass and every statistic is a
+    reduceat over the runs of equal bucket numbers.
+
+    Returns:
+        tuple: A level: (bucket numbers, counts, sums, minima, maxima, last values)
+    """
+    if not len(ns):
+        return empty_level()
+    ids = ns // size
+    starts, ends = group_starts(ids)
+    return (ids[starts], ends - starts, np.add.reduceat(y, starts), np.minimum.reduceat(y, starts),
+            np.maximum.reduceat(y, starts), y[ends - 1])
+
+
+def roll_up(level, factor):
+    """Merge the buckets of a level into buckets `factor` times as long"""
+    ids, counts, sums, minima, maxima, lasts = level
+    if not len(ids):
+        return level
+    ids = ids // factor
+    starts, ends = group_starts(ids)
+    return (ids[starts], np.add.reduceat(counts, starts), np.add.reduceat(sums, starts),
+            np.minimum.reduceat(minima, starts), np.maximum.reduceat(maxima, starts), lasts[ends - 1])
+
+
+class TimeResampler:
+    """
+    Time-bucket aggregation of one sorted datetime series
+
+    Whole-series levels, one per bucket size, are kept with the column
+    cache's derived values. A level is rolled up from the nearest finer level
+    already cached, so zooming out over a long recording touches each point
+    once and then only merges buckets. Zoomed-in views with few enough
+    points are aggregated directly from the visible slice.
+    """
+
+    def __init__(self, x, y, x_conversion, column_cache=None, key=None):
+        """
+        Args:
+            x (numpy.ndarray): Sorted times in the axis' units (days since the
+                epoch for DATE_NUMBER, seconds otherwise)
+            y (numpy.ndarray): Values, without missing ones
+            x_conversion (str): The column cache conversion of x
+            column_cache (ColumnConversionCache): Where levels are cached, or None
+            key (tuple): Identifies the series in the cache, or None not to cache
+        """
+        self.x = x
+        self.y = y
+        self.unit_ns = NS_PER_DAY if x_conversion == DATE_NUMBER else NS_PER_SECOND
+        self.column_cache = column_cache if key is not None else None
+        self.key = key
+        self.ns = self.derived(('epoch_ns',), lambda: np.round(x * self.unit_ns).astype(np.int64))
+
+    def derived(self, prefix, compute):
+        if self.column_cache is None:
+            return compute()
+        return self.column_cache.get_derived(prefix + self.key, compute)
+
+    def to_ns(self, value):
+        return int(round(value * self.unit_ns))
+
+    def auto_size(self, lo, hi, target_buckets):
+        """The smallest bucket size giving at most target_buckets buckets between lo and hi"""
+        span_ns = max(0, self.to_ns(hi) - self.to_ns(lo))
+        for size in BUCKET_NS:
+            if span_ns <= size * target_buckets:
+                return size
+        return BUCKET_NS[-1]
+
+    def level(self, size):
+        """Buckets of one size over the whole series"""
+        def compute():
+            with span('resample.level', bucket=bucket_name(size), rows=len(self.ns)):
+                if self.column_cache is not None:
+                    for finer in reversed(BUCKET_NS[:BUCKET_NS.index(size)]):
+                        cached = self.column_cache.peek_derived(('buckets', finer) + self.key)
+                        if cached is not None:
+                            return roll_up(cached, size // finer)
+                return aggregate(self.ns, self.y, size)
+        return self.derived(('buckets', size), compute)
+
+    def buckets(self, size, lo=None, hi=None):
+        """
+        Buckets of one size between lo and hi, plus one either side so the
+        line runs off the edges of the axes
+
+        Returns:
+            tuple: A level, see aggregate()
+        """
+        if lo is None:
+            return self.level(size)
+        lo_ns = self.to_ns(lo) - size
+        hi_ns = self.to_ns(hi) + size
+        start = np.searchsorted(self.ns, lo_ns, side='left')
+        stop = np.searchsorted(self.ns, hi_ns, side='right')
+        if stop - start <= DIRECT_AGGREGATION_ROWS:
+            return aggregate(self.ns[start:stop], self.y[start:stop], size)
+        level = self.level(size)
+        first = np.searchsorted(level[0], lo_ns // size, side='left')
+        last = np.searchsorted(level[0], hi_ns // size, side='right')
+        return tuple(values[first:last] for values in level)
+
+    def points(self, method, size, lo=None, hi=None):
+        """
+        The series aggregated for drawing, at the centre of each bucket
+
+        Returns:
+            tuple: (x, y, band), band being (minima, maxima) for MIN_MAX_BAND
+            and None otherwise
+        """
+        ids, counts, sums, minima, maxima, lasts = self.buckets(size, lo, hi)
+        x = (ids * size + size // 2) / self.unit_ns
+        if method == COUNT:
+            return x, counts.astype(np.float64), None
+        if method == LAST:
+            return x, lasts, None
+        means = sums / counts
+        if method == MIN_MAX_BAND:
+            return x, means, (minima, maxima)
+        return x, means, None
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+
+# Column kinds inferred by the profiler
+NUMERIC = 'numeric'
+DATETIME = 'datetime'
+CATEGORICAL = 'categorical'
+TEXT = 'text'
+
+# Explicit formats are much faster to parse than letting pandas guess per value
+DATETIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%d/%m/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y',
+    '%H:%M:%S',
+    '%H:%M:%S.%f',
+]
+
+# Share of non-null values that must parse for a column to keep its kind
+CONFIRM_THRESHOLD = 0.95
+
+# Values tried against every candidate format before checking the whole sample
+PROBE_SIZE = 20
+
+
+class ColumnProfile:
+    """The inferred kind of a single column"""
+
+    def __init__(self, name, kind, datetime_format=None):
+        self.name = name
+        self.kind = kind
+        self.datetime_format = datetime_format  # None means let pandas infer it
+        self.confirmed = False
+
+    def __repr__(self):
+        return f"ColumnProfile({self.name!r}, {self.kind!r}, {self.datetime_format!r})"
+
+
+class DatasetSchema:
+    """Column kinds for a loaded dataset, shared by all graph views"""
+
+    def __init__(self, data, profiles):
+        self.data = data
+        self.profiles = profiles
+
+    def set_data(self, data):
+        """Point the schema at the full data once loading finishes"""
+        self.data = data
+        for profile in self.profiles.values():
+            profile.confirmed = False
+
+    def profile(self, col):
+        return self.profiles[col]
+
+    def kind(self, col):
+        return self.confirm(col).kind
+
+    def columns_of_kind(self, *kinds):
+        """Columns whose sampled kind is one of kinds, in file order"""
+        return [name for name, profile in self.profiles.items() if profile.kind in kinds]
+
+    def plottable_x_columns(self):
+        columns = self.columns_of_kind(NUMERIC, DATETIME)
+        return columns if columns else list(self.profiles)
+
+    def plottable_y_columns(self):
+        columns = self.columns_of_kind(NUMERIC)
+        return columns if columns else list(self.profiles)
+
+    def is_datetime(self, col):
+        return self.kind(col) == DATETIME
+
+    def to_datetime(self, col, start=0):
+        """Parse a datetime column with its detected format, from row start onwards"""
+        profile = self.profiles[col]
+        series = self.data[col]
+        if start:
+            series = series.iloc[start:]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series
+        return pd.to_datetime(series, format=profile.datetime_format or 'mixed', errors='coerce')
+
+    def confirm(self, col, parsed=None):
+        """
+        Check a sampled kind against the whole column, the first time it is used
+
+        Args:
+            col (str): Column name
+            parsed: The column already parsed as datetimes, to avoid parsing it again
+
+        Returns:
+            ColumnProfile: The profile, downgraded to text if the full column
+            doesn't match what the sample suggested
+        """
+        profile = self.profiles[col]
+        if profile.confirmed:
+            return profile
+
+        if profile.kind == DATETIME:
+            series = self.data[col]
+            non_null = series.notna().sum()
+            if parsed is None:
+                parsed = self.to_datetime(col)
+            if non_null and pd.notna(parsed).sum() / non_null < CONFIRM_THRESHOLD:
+                profile.kind = TEXT
+                profile.datetime_format = None
+
+        profile.confirmed = True
+        return profile
+
+
+class SchemaProfiler:
+    """Infers column kinds from a sample of rows"""
+
+    @staticmethod
+    def profile(data, sample_size=1000):
+        """
+        Profile every column of a dataset from its first rows
+
+        Args:
+            data (pandas.DataFrame): The CSV data
+            sample_size (int): Number of rows to inspect
+
+        Returns:
+            DatasetSchema: Inferred kinds, confirmed lazily per column on use
+        """
+        sample = data.head(sample_size)
+        profiles = {}
+        for col in sample.columns:
+            profiles[col] = SchemaProfiler.profile_column(col, sample[col])
+        return DatasetSchema(data, profiles)
+
+    @staticmethod
+    def profile_column(name, sample):
+        """Infer the kind of one column from its sampled values"""
+        if pd.api.types.is_numeric_dtype(sample.dtype):
+            return ColumnProfile(name, NUMERIC)
+        if pd.api.types.is_datetime64_any_dtype(sample.dtype):
+            return ColumnProfile(name, DATETIME)
+
+        values = sample.dropna()
+        if values.empty:
+            return ColumnProfile(name, TEXT)
+
+        if pd.to_numeric(values, errors='coerce').notna().all():
+            return ColumnProfile(name, NUMERIC)
+
+        datetime_format = SchemaProfiler.detect_datetime_format(values)
+        if datetime_format is not False:
+            return ColumnProfile(name, DATETIME, datetime_format)
+
+        # Few distinct values relative to the sample means categorical
+        if values.nunique() <= max(20, len(values) // 20):
+            return ColumnProfile(name, CATEGORICAL)
+        return ColumnProfile(name, TEXT)
+
+    @staticmethod
+    def detect_datetime_format(values):
+        """
+        Find the datetime format that parses a sample of strings
+
+        Returns:
+            str, None or False: The matching format, None if pandas can infer
+            it but no fixed format matches, or False if the values aren't dates
+        """
+        values = values.astype(str)
+        probe = values.iloc[:PROBE_SIZE]
+
+        for fmt in DATETIME_FORMATS:
+            if pd.to_datetime(probe, format=fmt, errors='coerce').notna().all():
+                # Confirm on the rest of the sample with just this format
+                if pd.to_datetime(values, format=fmt, errors='coerce').notna().all():
+                    return fmt
+
+        # Values like plain words or numbers-with-units won't parse at all
+        if not probe.str.contains(r'\d', regex=True).all():
+            return False
+        try:
+            parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+        except (TypeError, ValueError):
+            return False
+        if np.mean(parsed.notna()) >= CONFIRM_THRESHOLD:
+            return None
+        return False
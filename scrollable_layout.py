@@ -1,8 +1,21 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QSizePolicy
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer, QEvent
+
+# Graphs within this many viewport heights of the visible area stay live,
+# so scrolling a little doesn't show snapshots
+LIVE_MARGIN = 0.5
+
+# Scrolling and layout changes are settled before graphs are parked or unparked
+VISIBILITY_DEBOUNCE_MS = 50
 
 class ScrollableGraphContainer(QScrollArea):
-    """A custom scrollable container for graph views that prevents width shrinking"""
+    """
+    A custom scrollable container for graph views that prevents width shrinking
+    
+    Only graphs near the visible area are kept live. Widgets with park() and
+    unpark() methods, like GraphView, are parked when scrolled out of view,
+    so the number of graphs doesn't set the cost of drawing or resizing.
+    """
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -25,6 +38,15 @@ class ScrollableGraphContainer(QScrollArea):
         # Set the container as the scroll area widget
         self.setWidget(self.container)
         
+        self.visibility_timer = QTimer(self)
+        self.visibility_timer.setSingleShot(True)
+        self.visibility_timer.setInterval(VISIBILITY_DEBOUNCE_MS)
+        self.visibility_timer.timeout.connect(self.update_visibility)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_visibility_update)
+        
+        # Adding or removing a graph resizes the container
+        self.container.installEventFilter(self)
+        
     def add_widget(self, widget):
         """Add a widget to the layout"""
         self.layout.addWidget(widget)
@@ -52,3 +74,29 @@ class ScrollableGraphContainer(QScrollArea):
         # Update container width to match viewport width
         min_width = self.viewport().width() - 30
         self.container.setMinimumWidth(min_width)
+        self.schedule_visibility_update()
+    
+    def eventFilter(self, watched, event):
+        if watched is self.container and event.type() == QEvent.Type.Resize:
+            self.schedule_visibility_update()
+        return super().eventFilter(watched, event)
+    
+    def schedule_visibility_update(self):
+        self.visibility_timer.start()
+    
+    def update_visibility(self):
+        """Unpark the graphs near the viewport and park the rest"""
+        height = self.viewport().height()
+        margin = int(height * LIVE_MARGIN)
+        top = self.verticalScrollBar().value() - margin
+        bottom = self.verticalScrollBar().value() + height + margin
+        
+        for i in range(self.layout.count()):
+            widget = self.layout.itemAt(i).widget()
+            if widget is None or not hasattr(widget, 'park'):
+                continue
+            geometry = widget.geometry()
+            if geometry.bottom() >= top and geometry.top() <= bottom:
+                widget.unpark()
+            else:
+                widget.park()
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+# SciPy is imported by the methods that need it rather than here: it is the
+# slowest import of the viewer and is only used once a curve is smoothed
+
+from decimation import is_sorted
+from perf_trace import span
+
+
+# Smoothing methods offered in the GraphView combo
+SAVGOL = 'Savitzky-Golay'
+ROLLING_MEAN = 'Rolling Mean'
+ROLLING_MEDIAN = 'Rolling Median'
+EMA = 'EMA'
+LOWESS = 'LOWESS'
+SPLINE = 'Spline'
+SMOOTHING_METHODS = [SAVGOL, ROLLING_MEAN, ROLLING_MEDIAN, EMA, LOWESS, SPLINE]
+
+# Window in points; for EMA it is the span, for the spline the spacing of its knots
+DEFAULT_WINDOW = 11
+
+# Savitzky-Golay windows longer than this are convolved with an FFT
+SAVGOL_FFT_WINDOW = 101
+
+# LOWESS fits a local line at this many points and interpolates in between
+LOWESS_ANCHORS = 500
+
+# Neighbourhood values processed per LOWESS batch, bounding its memory use
+LOWESS_BATCH_VALUES = 2 * 1024 ** 2
+
+# Series with fewer unique x values than this are splined onto a finer grid
+SPLINE_GRID_POINTS = 1000
+
+
+def align(x_data, y_data):
+    """
+    Coerce x and y to floats and drop every pair where either is missing
+
+    Dropping NaNs from each column separately would shift the pairs out of
+    step, so the mask is shared.
+
+    Returns:
+        tuple: (x, y) float64 arrays of equal length
+    """
+    x = pd.to_numeric(pd.Series(x_data), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.to_numeric(pd.Series(y_data), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = min(len(x), len(y))
+    x, y = x[:rows], y[:rows]
+    valid = np.isfinite(x) & np.isfinite(y)
+    return x[valid], y[valid]
+
+
+def sort_pair(x, y):
+    """Order a pair by x, skipping the sort when x already is (the usual case for time series)"""
+    if is_sorted(x):
+        return x, y
+    order = np.argsort(x, kind='stable')
+    return x[order], y[order]
+
+
+def smooth(x, y, method=SAVGOL, window=DEFAULT_WINDOW):
+    """
+    Smooth a series sorted by x with no missing values
+
+    Windows are counted in points, so they assume roughly even x spacing.
+
+    Args:
+        x (numpy.ndarray): Sorted x values
+        y (numpy.ndarray): Matching y values
+        method (str): One of SMOOTHING_METHODS
+        window (int): Window size in points
+
+    Returns:
+        tuple: (x, y) of the smoothed curve, or the input if it can't be smoothed
+    """
+    n = len(x)
+    if n < 5:
+        return x, y
+    window = max(3, min(int(window), n))
+
+    with span('smooth', method=method, window=window, points=n):
+        try:
+            if method == SAVGOL:
+                # The window must be odd, and longer than the polynomial order
+                if window % 2 == 0:
+                    window = window + 1 if window < n else window - 1
+                return x, savgol(y, window, min(3, window - 1))
+            if method == ROLLING_MEAN:
+                return x, pd.Series(y).rolling(window, center=True, min_periods=1).mean().to_numpy()
+            if method == ROLLING_MEDIAN:
+                return x, pd.Series(y).rolling(window, center=True, min_periods=1).median().to_numpy()
+            if method == EMA:
+                return x, pd.Series(y).ewm(span=window, adjust=False).mean().to_numpy()
+            if method == LOWESS:
+                return lowess(x, y, window)
+            if method == SPLINE:
+                return spline(x, y, window)
+            raise ValueError(f"Unknown smoothing method: {method}")
+        except Exception as e:
+            print(f"Error smoothing data: {e}")
+            return x, y
+
+
+def savgol(y, window, polyorder):
+    """
+    Savitzky-Golay filter, equivalent to signal.savgol_filter(mode='interp')
+
+    savgol_filter convolves directly, which is slow for long windows, so
+    those are convolved with an FFT and the edges fitted the same way.
+    """
+    from scipy import signal
+
+    if window <= SAVGOL_FFT_WINDOW:
+        return signal.savgol_filter(y, window, polyorder)
+
+    smoothed = signal.oaconvolve(y, signal.savgol_coeffs(window, polyorder), mode='same')
+
+    # The first and last half-windows take a polynomial fitted to the first and last window
+    half = window // 2
+    positions = np.arange(window)
+    for fit_rows, edge in ((slice(0, window), slice(0, half)),
+                           (slice(len(y) - window, len(y)), slice(window - half, window))):
+        polynomial = np.polynomial.Polynomial.fit(positions, y[fit_rows], polyorder)
+        smoothed[fit_rows][edge] = polynomial(positions[edge])
+    return smoothed
+
+
+def lowess(x, y, window, anchors=LOWESS_ANCHORS):
+    """
+    Locally weighted linear regression with tricube weights
+
+    A weighted line is fitted around at most `anchors` evenly spaced points,
+    each over its `window` neighbouring points, and the curve is linearly
+    interpolated between them. This keeps the cost at anchors * window
+    rather than n * window. There are no robustness iterations.
+    """
+    n = len(x)
+    positions = np.unique(np.linspace(0, n - 1, min(n, anchors)).round().astype(np.int64))
+    anchor_x = x[positions]
+    anchor_y = np.empty(len(positions))
+    offsets = np.arange(window)
+
+    batch = max(1, LOWESS_BATCH_VALUES // window)
+    for begin in range(0, len(positions), batch):
+        pos = positions[begin:begin + batch]
+        starts = np.clip(pos - window // 2, 0, n - window)
+        neighbours = starts[:, None] + offsets[None, :]
+
+        # Centre each neighbourhood on its anchor so the intercept is the fitted value
+        dx = x[neighbours] - x[pos][:, None]
+        ny = y[neighbours]
+        distance = np.abs(dx)
+        bandwidth = distance.max(axis=1, keepdims=True)
+        bandwidth[bandwidth == 0] = 1.0
+        weights = np.clip(1 - (distance / bandwidth) ** 3, 0, None) ** 3
+
+        sw = weights.sum(axis=1)
+        sx = (weights * dx).sum(axis=1)
+        sy = (weights * ny).sum(axis=1)
+        sxx = (weights * dx * dx).sum(axis=1)
+        sxy = (weights * dx * ny).sum(axis=1)
+
+        denominator = sw * sxx - sx * sx
+        flat = np.abs(denominator) < 1e-12
+        slope = np.where(flat, 0.0, (sw * sxy - sx * sy) / np.where(flat, 1.0, denominator))
+        anchor_y[begin:begin + batch] = (sy - slope * sx) / np.where(sw == 0, 1.0, sw)
+
+    return x, np.interp(x, anchor_x, anchor_y)
+
+
+def spline(x, y, window):
+    """
+    Least-squares cubic spline with a knot every `window` unique x values
+
+    Repeated x values are averaged first. Short series are evaluated on a
+    finer grid so the curve looks smooth between the points, long ones at
+    their own x values.
+    """
+    from scipy import interpolate
+
+    unique_x, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+    if len(unique_x) < 4:
+        return x, y
+    mean_y = np.bincount(inverse, weights=y) / counts
+
+    step = max(4, window)
+    knots = unique_x[step:-step:step] if len(unique_x) > 2 * step else unique_x[:0]
+    fitted = interpolate.LSQUnivariateSpline(unique_x, mean_y, knots, k=3)
+
+    if len(unique_x) < SPLINE_GRID_POINTS:
+        grid = np.linspace(unique_x[0], unique_x[-1], num=min(SPLINE_GRID_POINTS, len(unique_x) * 5))
+        return grid, fitted(grid)
+    return unique_x, fitted(unique_x)
@@ -0,0 +1,110 @@
+import numpy as np
+
+from decimation import is_sorted
+from perf_trace import span
+
+
+class SortedIndex:
+    """
+    A column's values in ascending order, with the row each one came from
+
+    The rows with values in a range are found with two binary searches,
+    O(log n), and read out in O(k) for k matching rows. Missing (NaN)
+    values are left out. A column that is already sorted is its own index,
+    so building it costs one pass and no extra memory.
+    """
+
+    def __init__(self, values, rows):
+        """
+        Args:
+            values (numpy.ndarray): Sorted float64 values
+            rows (numpy.ndarray): Source row of each value, or None if the
+                values are the column itself
+        """
+        self.values = values
+        self.rows = rows
+
+    @staticmethod
+    def build(column):
+        """
+        Sort a column
+
+        Returns:
+            tuple: (sorted values, source rows or None), the arguments of SortedIndex()
+        """
+        column = np.asarray(column, dtype=np.float64)
+        with span('sorted_index.build', rows=len(column)):
+            valid = np.count_nonzero(~np.isnan(column))
+            if valid == len(column) and is_sorted(column):
+                return column, None
+            # NaNs sort to the end, where they are cut off
+            rows = np.argsort(column, kind='stable')[:valid]
+            return column[rows], rows
+
+    def __len__(self):
+        return len(self.values)
+
+    def positions(self, lo=None, hi=None, include_lo=True, include_hi=True):
+        """
+        Positions in the sorted values of the range lo..hi
+
+        Args:
+            lo (float): Lower bound, or None for no lower bound
+            hi (float): Upper bound, or None for no upper bound
+            include_lo (bool): Whether values equal to lo are in the range
+            include_hi (bool): Whether values equal to hi are in the range
+
+        Returns:
+            tuple: (start, stop) slice of the sorted values
+        """
+        start = 0 if lo is None else int(np.searchsorted(self.values, lo, side='left' if include_lo else 'right'))
+        stop = len(self.values) if hi is None else int(np.searchsorted(self.values, hi, side='right' if include_hi else 'left'))
+        return start, max(start, stop)
+
+    def rows_between(self, lo=None, hi=None, include_lo=True, include_hi=True):
+        """
+        Source rows with values in the range lo..hi, in row order
+
+        Returns:
+            numpy.ndarray: int64 row numbers
+        """
+        start, stop = self.positions(lo, hi, include_lo, include_hi)
+        if self.rows is None:
+            return np.arange(start, stop, dtype=np.int64)
+        # Sorting k row numbers puts them back in file order, so lines are
+        # still drawn in the order the rows were recorded
+        return np.sort(self.rows[start:stop])
+
+    def value_range(self, lo=None, hi=None):
+        """
+        Smallest and largest value in the range lo..hi
+
+        Returns:
+            tuple: (min, max), or None if no value is in the range
+        """
+        start, stop = self.positions(lo, hi)
+        if start == stop:
+            return None
+        return float(self.values[start]), float(self.values[stop - 1])
+
+
+def get_sorted_index(column_cache, key, column):
+    """
+    The sorted index of a column, built on first use
+
+    Indexes are kept with the column cache's derived values, so every view of
+    the same column shares one and it is rebuilt once the dataset grows. The
+    array's length is part of the key: a view still holding the arrays from
+    before rows were appended gets an index of those, rather than one that
+    would be taken as current for the grown dataset.
+
+    Args:
+        column_cache (ColumnConversionCache): Cache holding the index
+        key (tuple): Identifies the indexed array, e.g. ('pair', x_col, x_conversion, y_col)
+        column (numpy.ndarray): The values to index, used only if the index isn't cached
+
+    Returns:
+        SortedIndex: The index
+    """
+    key = ('sorted_index', len(column)) + key
+    return SortedIndex(*column_cache.get_derived(key, lambda: SortedIndex.build(column)))
@@ -0,0 +1,233 @@
+import os
+import threading
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar,
+                             QTableWidget, QTableWidgetItem, QAbstractItemView, QSplitter)
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+
+from column_stats import QUANTILES, StatsCache, compute_file_stats
+
+
+HEADERS = ["Column", "Count", "Missing", "Min", "Max", "Mean", "Std"] + [f"P{q * 100:g}" for q in QUANTILES]
+
+
+def format_number(value):
+    if value is None:
+        return ""
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.6g}"
+
+
+class StatsWorker(QObject):
+    """Computes, or loads the cached, column statistics of a file on a worker thread"""
+
+    progress = pyqtSignal(int)              # Percent of the file's bytes read
+    finished = pyqtSignal(object, bool)     # Statistics, and whether they came from the cache
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, cache, use_cached=True):
+        super().__init__()
+        self.file_path = file_path
+        self.cache = cache
+        self.use_cached = use_cached
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def run(self):
+        threading.current_thread().name = "Column stats"
+        try:
+            stats = self.cache.load(self.file_path) if self.use_cached else None
+            if stats is not None:
+                self.finished.emit(stats, True)
+                return
+
+            stats = compute_file_stats(self.file_path, progress=self.report,
+                                       is_cancelled=lambda: self._cancel_requested)
+            if stats is None:
+                self.cancelled.emit()
+                return
+            self.cache.store(self.file_path, stats)
+            self.finished.emit(stats, False)
+        except Exception as e:
+            self.failed.emit(f"Failed to compute column statistics: {str(e)}")
+
+    def report(self, bytes_read, total_bytes):
+        self.progress.emit(int(100 * bytes_read / total_bytes) if total_bytes else 100)
+
+
+class StatsPanel(QWidget):
+    """
+    Per-column summaries and a histogram for the open file
+
+    Statistics are computed in one streaming pass over the file the first
+    time the panel is shown for it, then come from the statistics cache.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.file_path = None
+        self.stats = None
+        self.thread = None
+        self.worker = None
+        self.cache = StatsCache()
+        # The histogram's figure, created when the first one is drawn so
+        # matplotlib isn't imported while the window opens
+        self.figure = None
+        self.canvas = None
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        controls = QHBoxLayout()
+        self.status_label = QLabel("Open a CSV file to see its column statistics.")
+        controls.addWidget(self.status_label)
+        controls.addStretch()
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(250)
+        self.progress_bar.setVisible(False)
+        controls.addWidget(self.progress_bar)
+
+        self.recompute_button = QPushButton("Recompute")
+        self.recompute_button.setToolTip("Read the file again instead of using the saved statistics")
+        self.recompute_button.setEnabled(False)
+        self.recompute_button.clicked.connect(lambda: self.start(use_cached=False))
+        controls.addWidget(self.recompute_button)
+        layout.addLayout(controls)
+
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.currentCellChanged.connect(self.show_histogram)
+        self.splitter.addWidget(self.table)
+        layout.addWidget(self.splitter)
+
+    def ensure_canvas(self):
+        """Create the histogram of the selected column below the table"""
+        if self.canvas is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+
+        self.figure = Figure(figsize=(8, 2.5))
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.setMinimumHeight(180)
+        self.splitter.addWidget(self.canvas)
+
+    def set_file(self, file_path):
+        """Show the statistics of a newly opened file, computing them once the panel is visible"""
+        if file_path == self.file_path:
+            return
+        self.stop()
+        self.file_path = file_path
+        self.stats = None
+        self.table.setRowCount(0)
+        if self.canvas is not None:
+            self.figure.clear()
+            self.canvas.draw_idle()
+        self.recompute_button.setEnabled(file_path is not None)
+        if file_path is None:
+            self.status_label.setText("Open a CSV file to see its column statistics.")
+        elif self.isVisible():
+            self.start()
+        else:
+            self.status_label.setText(f"Statistics for {os.path.basename(file_path)} are computed when shown.")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.file_path is not None and self.stats is None and self.worker is None:
+            self.start()
+
+    def start(self, use_cached=True):
+        if self.file_path is None:
+            return
+        self.stop()
+
+        self.thread = QThread(self)
+        self.worker = StatsWorker(self.file_path, self.cache, use_cached)
+        self.worker.moveToThread(self.thread)
+        self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.thread.quit)
+
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.failed.connect(self.thread.quit)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.thread.deleteLater)
+
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.recompute_button.setEnabled(False)
+        self.status_label.setText(f"Computing statistics for {os.path.basename(self.file_path)}...")
+        self.thread.start()
+
+    def stop(self):
+        """Cancel a running computation; its results are ignored"""
+        if self.worker is not None:
+            for sig in (self.worker.progress, self.worker.finished, self.worker.failed):
+                sig.disconnect()
+            # Still quit the thread once the worker notices
+            self.worker.finished.connect(self.thread.quit)
+            self.worker.failed.connect(self.thread.quit)
+            self.worker.cancel()
+        self.worker = None
+        self.thread = None
+        self.progress_bar.setVisible(False)
+
+    def on_finished(self, stats, cached):
+        self.worker = None
+        self.thread = None
+        self.stats = stats
+        self.progress_bar.setVisible(False)
+        self.recompute_button.setEnabled(True)
+        source = "saved" if cached else "computed"
+        self.status_label.setText(f"{len(stats)} numeric columns of {os.path.basename(self.file_path)} ({source})")
+
+        self.table.setRowCount(len(stats))
+        for row, (col, summary) in enumerate(stats.items()):
+            quantiles = [summary['quantiles'].get(str(q)) for q in QUANTILES]
+            values = [summary['count'], summary['missing'], summary['min'], summary['max'],
+                      summary['mean'], summary['std']] + quantiles
+            self.table.setItem(row, 0, QTableWidgetItem(col))
+            for column, value in enumerate(values, start=1):
+                item = QTableWidgetItem(format_number(value))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+        if stats:
+            self.table.selectRow(0)
+
+    def on_failed(self, message):
+        self.worker = None
+        self.thread = None
+        self.progress_bar.setVisible(False)
+        self.recompute_button.setEnabled(True)
+        self.status_label.setText(message)
+
+    def show_histogram(self, row, *_):
+        if self.stats is None:
+            return
+        self.ensure_canvas()
+        self.figure.clear()
+        if 0 <= row < self.table.rowCount():
+            col = self.table.item(row, 0).text()
+            histogram = self.stats[col]['histogram']
+            ax = self.figure.add_subplot(111)
+            if histogram is not None:
+                ax.stairs(histogram['counts'], histogram['edges'], fill=True)
+            ax.set_title(f"{col} (approximate)")
+            ax.grid(True, linestyle='--', alpha=0.7)
+            self.figure.tight_layout()
+        self.canvas.draw_idle()
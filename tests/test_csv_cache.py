@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+from csv_cache import CSVCache
+
+
+def write_csv(path, rows):
+    pd.DataFrame({'x': range(rows), 'name': [f"r{i}" for i in range(rows)]}).to_csv(path, index=False)
+
+
+def test_cached_data_round_trips(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_csv(path, 10)
+    cache = CSVCache(str(tmp_path / 'cache'))
+    key = cache.key_for(str(path))
+    data = pd.read_csv(path)
+    cache.store(str(path), data, 1.0, key)
+
+    loaded = cache.load(str(path))
+    assert loaded is not None
+    pd.testing.assert_frame_equal(loaded, data, check_dtype=False)
+    assert cache.stats.hits == 1
+
+
+def test_file_growing_during_parse_is_not_cached_under_new_key(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_csv(path, 10)
+    cache = CSVCache(str(tmp_path / 'cache'))
+    key = cache.key_for(str(path))
+    data = pd.read_csv(path)
+
+    # Rows appended after the parse, before the result is stored
+    with open(path, 'a') as f:
+        f.write("10,r10\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+    cache.store(str(path), data, 1.0, key)
+
+    assert cache.load(str(path)) is None
+
+
+def test_damaged_entry_is_a_miss(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_csv(path, 1000)
+    cache = CSVCache(str(tmp_path / 'cache'))
+    cache.store(str(path), pd.read_csv(path), 1.0, cache.key_for(str(path)))
+
+    # Truncate the pickled text column, as a crash or full disk might
+    (entry,) = [e[0] for e in cache.entries()]
+    column = os.path.join(entry, 'col_00001.npy')
+    with open(column, 'r+b') as f:
+        f.truncate(os.path.getsize(column) // 2)
+
+    assert cache.load(str(path)) is None
+    assert cache.stats.misses == 1
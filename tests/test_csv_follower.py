@@ -0,0 +1,74 @@
+import pandas as pd
+
+from csv_follower import CSVFollower, GrowingFrame, find_rows_end
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, newline='') as f:
+        f.write(text)
+
+
+def follow(path, qapp):
+    """A follower over the rows the file has now, as the viewer starts one"""
+    data = pd.read_csv(path)
+    frame = GrowingFrame(data)
+    return CSVFollower(str(path), frame, find_rows_end(str(path), len(data))), frame
+
+
+def test_find_rows_end_counts_rows_like_pandas(tmp_path):
+    path = tmp_path / 'data.csv'
+    write(path, 'a,b\n1,2\n\n3,4\n"x\ny",5\n6,7\n')
+    assert len(pd.read_csv(path)) == 4
+    assert find_rows_end(str(path), 4) == 25
+    # The third row starts after the blank line and spans two lines
+    assert find_rows_end(str(path), 2) == 13
+    assert find_rows_end(str(path), 3) == 21
+
+
+def test_find_rows_end_without_final_newline(tmp_path):
+    path = tmp_path / 'data.csv'
+    write(path, 'a,b\n1,2\n3,4')
+    assert find_rows_end(str(path), 2) == 11
+
+
+def test_read_new_rows_appends_each_row_once(tmp_path, qapp):
+    path = tmp_path / 'data.csv'
+    write(path, 'a,b\n1,2\n\n3,4\n"x\ny",5\n6,7\n')
+    follower, frame = follow(path, qapp)
+
+    write(path, '8,9\n\n"p\nq",10\n', mode='a')
+    follower.read_new_rows()
+    follower.read_new_rows()
+
+    expected = pd.read_csv(path)
+    assert len(frame) == len(expected) == 6
+    assert frame['a'].tolist() == expected['a'].tolist()
+    assert frame['b'].tolist() == expected['b'].tolist()
+
+
+def test_read_new_rows_waits_for_a_quoted_field_to_close(tmp_path, qapp):
+    path = tmp_path / 'data.csv'
+    write(path, 'a,b\n1,2\n')
+    follower, frame = follow(path, qapp)
+
+    write(path, '"x\n', mode='a')
+    follower.read_new_rows()
+    assert len(frame) == 1
+
+    write(path, 'y",5\n', mode='a')
+    follower.read_new_rows()
+    assert len(frame) == 2
+    assert frame['a'].iloc[-1] == 'x\ny'
+    assert frame['b'].iloc[-1] == 5
+
+
+def test_read_new_rows_skips_blank_lines(tmp_path, qapp):
+    path = tmp_path / 'data.csv'
+    write(path, 'a,b\n1,2\n')
+    follower, frame = follow(path, qapp)
+
+    write(path, '\n  \n', mode='a')
+    follower.read_new_rows()
+    write(path, '3,4\n', mode='a')
+    follower.read_new_rows()
+    assert frame['a'].tolist() == [1, 3]
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+import lazy_dataset
+from lazy_dataset import LazyCSVDataset
+
+CASES = [
+    'a,b\n1,2\n3,4\n',
+    'a,b\n1,2\n3,4',
+    'a,b\n\n1,2\n\n\n3,4\n\n',
+    'a,b\n1,2\n   \n\t\n3,4\n',
+    'a,b\r\n1,2\r\n\r\n3,4\r\n',
+    'a,b\n"x\ny",2\n"p\n\nq",4\n5,6\n',
+    'a,b\n"say ""hi""\n there",1\n2,3\n',
+    '\n\na,b\n1,2\n',
+]
+
+
+@pytest.mark.parametrize('text', CASES)
+@pytest.mark.parametrize('block_bytes', [1, 3, 7, 1024])
+def test_rows_match_pandas(tmp_path, monkeypatch, text, block_bytes):
+    # Small blocks put line ends, quotes and blank lines on block boundaries
+    monkeypatch.setattr(lazy_dataset, 'SCAN_BLOCK_BYTES', block_bytes)
+    path = tmp_path / 'data.csv'
+    path.write_bytes(text.encode())
+    expected = pd.read_csv(path)
+
+    data = LazyCSVDataset(str(path))
+    assert data.scan()
+    assert len(data) == len(expected)
+    for col in expected.columns:
+        assert len(data[col]) == len(data)
+    data.close()
+
+
+def test_row_offsets_point_at_each_row(tmp_path):
+    text = 'a,b\n1,2\n\n"x\ny",4\n5,6\n'
+    path = tmp_path / 'data.csv'
+    path.write_bytes(text.encode())
+    data = LazyCSVDataset(str(path))
+    data.scan()
+    assert [text[offset:].split(',')[0] for offset in data.row_offsets] == ['1', '"x\ny"', '5']
+    data.close()
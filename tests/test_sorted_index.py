@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from column_cache import ColumnConversionCache, NUMERIC
+from csv_follower import GrowingFrame
+from schema_profiler import SchemaProfiler
+from sorted_index import SortedIndex, get_sorted_index
+
+
+def test_rows_between_matches_a_scan():
+    rng = np.random.default_rng(0)
+    column = rng.uniform(0, 100, 1000)
+    column[::7] = np.nan
+    index = SortedIndex(*SortedIndex.build(column))
+    for lo, hi in [(10, 20), (None, 5), (95, None), (50, 50), (200, 300)]:
+        expected = np.flatnonzero((column >= (lo if lo is not None else -np.inf))
+                                  & (column <= (hi if hi is not None else np.inf)))
+        assert np.array_equal(index.rows_between(lo, hi), expected)
+
+
+def test_sorted_column_is_its_own_index():
+    column = np.arange(10, dtype=np.float64)
+    values, rows = SortedIndex.build(column)
+    assert rows is None
+    assert np.array_equal(SortedIndex(values, rows).rows_between(3, 5), [3, 4, 5])
+
+
+def test_index_of_stale_array_is_not_cached_as_current():
+    frame = GrowingFrame(pd.DataFrame({'x': [5.0, 1.0, 3.0]}))
+    cache = ColumnConversionCache(frame, SchemaProfiler.profile(frame))
+    stale = cache.get('x', NUMERIC)
+
+    frame.append(pd.DataFrame({'x': [2.0, 4.0]}))
+    # A view zooming with the arrays it had before the rows were appended
+    assert get_sorted_index(cache, ('x', NUMERIC), stale).rows_between(0, 10).tolist() == [0, 1, 2]
+
+    current = cache.get('x', NUMERIC)
+    index = get_sorted_index(cache, ('x', NUMERIC), current)
+    assert index.rows_between(0, 10).tolist() == [0, 1, 2, 3, 4]
@@ -0,0 +1,9 @@
+from benchmark import DEFAULT_STARTUP_BUDGET, measure_startup
+
+
+def test_window_is_shown_within_the_startup_budget():
+    startup = measure_startup(repeat=3)
+    assert 'error' not in startup, startup.get('error')
+    # matplotlib and SciPy are deferred until the window is up
+    assert startup['loaded_before_window'] == []
+    assert startup['median_s'] <= DEFAULT_STARTUP_BUDGET